@@ -1,5 +1,9 @@
 """AI package - Simplified version."""
 
 from .grok_client import GrokClient
+from .async_grok_client import AsyncGrokClient
+from .router import TieredRouter
+from .response_cache import ResponseCache
+from .history_manager import HistoryManager
 
-__all__ = ['GrokClient']
\ No newline at end of file
+__all__ = ['GrokClient', 'AsyncGrokClient', 'TieredRouter', 'ResponseCache', 'HistoryManager']
\ No newline at end of file
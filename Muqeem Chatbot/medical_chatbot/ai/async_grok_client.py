@@ -0,0 +1,413 @@
+"""Asyncio Grok client for serving many chat sessions from one process."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+import aiohttp
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.model_config import ModelConfig
+from ai.grok_client import RETRY_STATUSES, backoff_delay, stream_delta
+from ai.history_manager import HistoryManager, estimate_tokens
+
+
+# Failures where the request never reached the model and can be resent
+RETRYABLE_ERRORS = (
+    aiohttp.ClientConnectorError,
+    aiohttp.ServerDisconnectedError,
+    # connect phase only (aiohttp >= 3.10); its parent ServerTimeoutError
+    # also covers read timeouts of requests the server may be processing
+    aiohttp.ConnectionTimeoutError,
+)
+
+
+class TokenBucket:
+    """
+    Async token bucket: refills at ``rate`` tokens per second up to ``capacity``.
+
+    Waiters are served one at a time in arrival order, so a large request
+    can't be starved by a stream of small ones.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the bucket (starts full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (the allowed burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Wait until ``tokens`` are available and take them.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            ValueError: If ``tokens`` exceeds the capacity (it could never be granted)
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Request needs {tokens:.0f} tokens, more than the "
+                             f"limit of {self.capacity:.0f}")
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.tokens < tokens:
+                delay = (tokens - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= tokens
+        return waited
+
+
+class AsyncGrokClient:
+    """
+    Async counterpart of GrokClient for many concurrent conversations.
+
+    Histories are kept per session id, requests share one aiohttp
+    connection pool, a semaphore caps requests in flight, and optional
+    token buckets keep requests and tokens per minute under the
+    provider's quota. Cancelling the task that awaits chat() (or calling
+    cancel(session_id)) aborts the HTTP request and frees its slot.
+
+    Usage:
+        async with AsyncGrokClient() as client:
+            reply = await client.chat("session-1", "What is asthma?")
+    """
+
+    def __init__(self, max_concurrency: int = None, requests_per_minute: float = None,
+                 tokens_per_minute: float = None, max_sessions: int = None):
+        """
+        Initialize the client (the HTTP session is created by connect()).
+
+        Args:
+            max_concurrency: Requests in flight at once (default: ModelConfig)
+            requests_per_minute: Request quota, 0 for none (default: ModelConfig)
+            tokens_per_minute: Estimated token quota, 0 for none (default: ModelConfig)
+            max_sessions: Conversations kept before the least recently used
+                is forgotten (default: ModelConfig)
+        """
+        self.api_key = ModelConfig.OPENROUTER_API_KEY
+        self.model = ModelConfig.GROK_MODEL
+        self.url = f"{ModelConfig.OPENROUTER_BASE_URL}/chat/completions"
+        self.max_concurrency = max_concurrency or ModelConfig.LLM_MAX_CONCURRENCY
+        self.max_sessions = max_sessions or ModelConfig.LLM_MAX_SESSIONS
+
+        rpm = ModelConfig.LLM_RATE_LIMIT_RPM if requests_per_minute is None else requests_per_minute
+        tpm = ModelConfig.LLM_RATE_LIMIT_TPM if tokens_per_minute is None else tokens_per_minute
+        self.request_bucket = TokenBucket(rpm / 60, max(1.0, rpm / 60)) if rpm else None
+        # a whole minute's quota, so one request may use up to the full TPM
+        self.token_bucket = TokenBucket(tpm / 60, tpm) if tpm else None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.base_payload = {
+            "model": self.model,
+            "temperature": ModelConfig.TEMPERATURE,
+            "max_tokens": ModelConfig.MAX_TOKENS,
+            "top_p": ModelConfig.TOP_P,
+        }
+        if ModelConfig.GROK_REASONING_ENABLED:
+            self.base_payload["reasoning"] = {"enabled": True}
+
+        self.session = None
+        self._connect_lock = asyncio.Lock()
+        self._histories = OrderedDict()     # session id -> HistoryManager
+        self._session_locks = {}            # session id -> asyncio.Lock
+        self._inflight = {}                 # session id -> task awaiting the LLM
+        self._stats = {'requests': 0, 'retries': 0, 'errors': 0, 'cancelled': 0,
+                       'in_flight': 0, 'waiting': 0, 'rate_limited_s': 0.0}
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # ============ CONNECTION MANAGEMENT ============
+
+    async def connect(self):
+        """Create the HTTP session if it does not exist yet."""
+        async with self._connect_lock:
+            if self.session is None:
+                self.session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                    timeout=aiohttp.ClientTimeout(
+                        total=None,
+                        connect=ModelConfig.HTTP_CONNECT_TIMEOUT,
+                        sock_read=ModelConfig.HTTP_READ_TIMEOUT,
+                    ),
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                        "HTTP-Referer": "https://github.com/medical-chatbot",
+                        "X-Title": "Medical AI Chatbot"
+                    },
+                )
+        return self.session
+
+    async def close(self):
+        """Cancel requests in flight and close the HTTP session."""
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # ============ SESSIONS ============
+
+    def get_history(self, session_id: str) -> List[Dict]:
+        """Messages of a conversation (empty for an unknown session)."""
+        history = self._histories.get(session_id)
+        return list(history.messages) if history else []
+
+    def reset_conversation(self, session_id: str):
+        """Forget a conversation."""
+        self._histories.pop(session_id, None)
+        self._session_locks.pop(session_id, None)
+
+    def cancel(self, session_id: str) -> bool:
+        """
+        Cancel the request in flight for a session (e.g. the user disconnected).
+
+        Returns:
+            True if a request was cancelled
+        """
+        task = self._inflight.get(session_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def _session_lock(self, session_id: str) -> asyncio.Lock:
+        # one request per conversation at a time, so replies land in the
+        # history in the order the messages were sent
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = self._session_locks[session_id] = asyncio.Lock()
+        return lock
+
+    def _build_messages(self, session_id: str, user_message: str, system_prompt: str = None) -> list:
+        history = self._histories.get(session_id) or HistoryManager()
+        return history.build(user_message, system_prompt)
+
+    def _remember(self, session_id: str, user_message: str, content: str):
+        history = self._histories.pop(session_id, None) or HistoryManager()
+        history.add_exchange(user_message, content)
+        self._histories[session_id] = history
+        while len(self._histories) > self.max_sessions:
+            old_id, _ = self._histories.popitem(last=False)
+            lock = self._session_locks.get(old_id)
+            if lock is not None and not lock.locked():
+                del self._session_locks[old_id]
+
+    # ============ REQUESTS ============
+
+    async def _throttle(self, messages: list):
+        """Wait for the rate limiters (requests, then estimated tokens)."""
+        waited = 0.0
+        if self.request_bucket is not None:
+            waited += await self.request_bucket.acquire(1)
+        if self.token_bucket is not None:
+            # estimated prompt, plus the reply budget
+            prompt_tokens = sum(estimate_tokens(m['content']) for m in messages)
+            waited += await self.token_bucket.acquire(prompt_tokens + ModelConfig.MAX_TOKENS)
+        self._stats['rate_limited_s'] += waited
+
+    async def _open(self, payload: dict) -> aiohttp.ClientResponse:
+        """POST a chat completion, retrying rate limits, 5xx and failed connects."""
+        session = self.session or await self.connect()
+        body = json.dumps(payload)
+        attempt = 0
+        while True:
+            try:
+                response = await session.post(self.url, data=body)
+            except RETRYABLE_ERRORS:
+                if attempt >= ModelConfig.HTTP_MAX_RETRIES:
+                    raise
+                delay = backoff_delay(attempt)
+            else:
+                if response.status in RETRY_STATUSES and attempt < ModelConfig.HTTP_MAX_RETRIES:
+                    delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+                    await response.read()
+                    response.release()
+                else:
+                    if response.status >= 400:
+                        text = await response.text()
+                        response.release()
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history,
+                            status=response.status, message=text[:200]
+                        )
+                    return response
+            self._stats['retries'] += 1
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _request(self, messages: list, handler, stream: bool = False):
+        """
+        Run ``handler(response)`` for one request under the limits.
+
+        Cancellation at any point releases the concurrency slot; a response
+        whose body was not fully read is closed rather than pooled.
+        """
+        self._stats['waiting'] += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._stats['waiting'] -= 1
+        self._stats['in_flight'] += 1
+        try:
+            await self._throttle(messages)
+            self._stats['requests'] += 1
+            payload = dict(self.base_payload, messages=messages)
+            if stream:
+                payload["stream"] = True
+            response = await self._open(payload)
+            try:
+                return await handler(response)
+            finally:
+                response.release()
+        finally:
+            self._stats['in_flight'] -= 1
+            self._semaphore.release()
+
+    async def chat(self, session_id: str, user_message: str, system_prompt: str = None) -> str:
+        """
+        Send a message in a conversation and get the response.
+
+        Args:
+            session_id: Conversation the message belongs to
+            user_message: The user's message
+            system_prompt: Optional system instructions
+
+        Returns:
+            Grok's response text
+        """
+        async def read_reply(response):
+            data = await response.json(content_type=None)
+            return data['choices'][0]['message'].get('content', '')
+
+        async with self._session_lock(session_id):
+            self._inflight[session_id] = asyncio.current_task()
+            try:
+                messages = self._build_messages(session_id, user_message, system_prompt)
+                content = await self._request(messages, read_reply)
+                self._remember(session_id, user_message, content)
+                return content
+            except asyncio.CancelledError:
+                self._stats['cancelled'] += 1
+                raise
+            except Exception as e:
+                self._stats['errors'] += 1
+                print(f"❌ Error calling Grok API: {e}")
+                return f"I'm having trouble connecting right now. Error: {str(e)}"
+            finally:
+                self._inflight.pop(session_id, None)
+
+    async def chat_stream(self, session_id: str, user_message: str, system_prompt: str = None):
+        """
+        Send a message in a conversation and yield the reply as it is generated.
+
+        The full reply is stored in the session's history when the stream
+        ends; if the consumer stops early or is cancelled, the part already
+        delivered is stored instead.
+
+        Yields:
+            Text deltas of Grok's response
+        """
+        async with self._session_lock(session_id):
+            self._inflight[session_id] = asyncio.current_task()
+            messages = self._build_messages(session_id, user_message, system_prompt)
+            parts = []
+            queue = asyncio.Queue()
+
+            async def pump(response):
+                data = []
+                async for raw in response.content:
+                    line = raw.decode('utf-8').rstrip('\r\n')
+                    if not line:
+                        if data:
+                            await queue.put("\n".join(data))
+                            data = []
+                    elif line.startswith('data:'):
+                        data.append(line[5:].lstrip(' '))
+                if data:
+                    await queue.put("\n".join(data))
+
+            async def produce():
+                try:
+                    await self._request(messages, pump, stream=True)
+                finally:
+                    await queue.put(None)
+
+            producer = asyncio.ensure_future(produce())
+            try:
+                while True:
+                    data = await queue.get()
+                    if data is None:
+                        break
+                    delta = stream_delta(data)
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                await producer
+                self._remember(session_id, user_message, ''.join(parts))
+            except (asyncio.CancelledError, GeneratorExit):
+                self._stats['cancelled'] += 1
+                if parts:
+                    self._remember(session_id, user_message, ''.join(parts))
+                raise
+            except Exception as e:
+                self._stats['errors'] += 1
+                print(f"❌ Error calling Grok API: {e}")
+                yield f"I'm having trouble connecting right now. Error: {str(e)}"
+            finally:
+                if not producer.done():
+                    producer.cancel()
+                self._inflight.pop(session_id, None)
+
+    def get_stats(self) -> Dict:
+        """Request counters, current load and limiter settings."""
+        return dict(self._stats, sessions=len(self._histories),
+                    max_concurrency=self.max_concurrency,
+                    rpm=self.request_bucket.rate * 60 if self.request_bucket else None,
+                    tpm=self.token_bucket.rate * 60 if self.token_bucket else None)
+
+
+# For testing
+if __name__ == '__main__':
+    async def _demo():
+        async with AsyncGrokClient() as client:
+            questions = {
+                'alice': "What are the symptoms of diabetes?",
+                'bob': "How is asthma treated?",
+                'carol': "What specialist treats migraines?",
+            }
+            replies = await asyncio.gather(*(
+                client.chat(session_id, question) for session_id, question in questions.items()
+            ))
+            for (session_id, question), reply in zip(questions.items(), replies):
+                print(f"\n[{session_id}] {question}\n{reply[:200]}")
+            print(f"\nStats: {client.get_stats()}")
+
+    asyncio.run(_demo())
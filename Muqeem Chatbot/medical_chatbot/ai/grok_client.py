@@ -1,24 +1,222 @@
 """Simple Grok API client - No LangChain needed!"""
 
 import os
+import random
 import sys
+import time
 import requests
 import json
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.model_config import ModelConfig
+from ai.http_session import create_session, connection_time_ms
+from ai.response_cache import is_follow_up
+from ai.history_manager import HistoryManager
+
+
+# Responses worth retrying: rate limits and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt: int, retry_after: str = None) -> float:
+    """Seconds to wait before retry ``attempt`` (full jitter, honours Retry-After)."""
+    if retry_after:
+        try:
+            return min(float(retry_after), ModelConfig.HTTP_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(ModelConfig.HTTP_BACKOFF_MAX, ModelConfig.HTTP_BACKOFF_BASE * 2 ** attempt))
+
+
+def stream_delta(data: str):
+    """
+    Text delta carried by one streamed chat completion event.
+    
+    Returns:
+        The content delta, or None for [DONE] and events without content
+    """
+    if data == '[DONE]':
+        return None
+    event = json.loads(data)
+    if 'error' in event:
+        raise RuntimeError(event['error'].get('message', event['error']))
+    choices = event.get('choices') or [{}]
+    return choices[0].get('delta', {}).get('content')
 
 
 class GrokClient:
     """Simple direct API client for Grok."""
     
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, session: requests.Session = None, cache=None):
+        """
+        Initialize the client.
+        
+        Args:
+            verbose: Print request/response progress
+            session: HTTP session to use (a pooled keep-alive session is
+                created from ModelConfig if omitted)
+            cache: ResponseCache answering repeated self-contained
+                questions without an API call (None disables caching)
+        """
         self.verbose = verbose
         self.api_key = ModelConfig.OPENROUTER_API_KEY
         self.model = ModelConfig.GROK_MODEL
         self.base_url = ModelConfig.OPENROUTER_BASE_URL
-        self.conversation_history = []
+        self.url = f"{self.base_url}/chat/completions"
+        # Token-budgeted turns plus a rolling summary of older ones
+        self.history = HistoryManager()
+        
+        # Headers and the fixed part of the payload are built once; the
+        # session keeps connections to the provider open between calls
+        self.session = session or create_session(
+            pool_size=ModelConfig.HTTP_POOL_SIZE,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://github.com/medical-chatbot",
+                "X-Title": "Medical AI Chatbot"
+            }
+        )
+        self.timeout = (ModelConfig.HTTP_CONNECT_TIMEOUT, ModelConfig.HTTP_READ_TIMEOUT)
+        self.base_payload = {
+            "model": self.model,
+            "temperature": ModelConfig.TEMPERATURE,
+            "max_tokens": ModelConfig.MAX_TOKENS,
+            "top_p": ModelConfig.TOP_P,
+        }
+        if ModelConfig.GROK_REASONING_ENABLED:
+            self.base_payload["reasoning"] = {"enabled": True}
+        
+        # Timing breakdown of the most recent call (milliseconds)
+        self.last_timing = None
+        
+        self.cache = cache
+        # Whether the most recent reply came from the cache
+        self.last_cache_hit = False
+        # Error of the most recent call (None if it succeeded); the reply
+        # is then the "trouble connecting" text, not Grok's answer
+        self.last_error = None
+    
+    @property
+    def conversation_history(self) -> list:
+        """Messages kept verbatim (older turns live on in the history summary)."""
+        return self.history.messages
+    
+    @property
+    def last_prompt_tokens(self) -> int:
+        """Estimated prompt tokens of the most recent request."""
+        return self.history.last_report['total'] if self.history.last_report else 0
+    
+    def _open(self, payload: dict):
+        """
+        POST a chat completion, retrying rate limits, 5xx and failed connects.
+        
+        The response is opened with stream=True and returned before its body
+        is read, so streamed completions can be consumed as they arrive.
+        ``last_timing`` gets connect and time-to-first-byte of the final
+        attempt; the caller fills in the totals.
+        
+        Returns:
+            Tuple of (response, perf_counter value when the final attempt started)
+        """
+        body = json.dumps(payload)
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.post(self.url, data=body, timeout=self.timeout, stream=True)
+            except requests.exceptions.ConnectionError:
+                # Includes connect timeouts and keep-alive connections the
+                # server closed. Read timeouts are not retried: the request
+                # may already have been processed (and billed)
+                if attempt >= ModelConfig.HTTP_MAX_RETRIES:
+                    raise
+                delay = backoff_delay(attempt)
+            else:
+                headers_at = time.perf_counter()
+                connect_ms = connection_time_ms(response)
+                if response.status_code in RETRY_STATUSES and attempt < ModelConfig.HTTP_MAX_RETRIES:
+                    delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+                    # read the error body so the connection returns to the pool
+                    response.content
+                else:
+                    self.last_timing = {
+                        "connect_ms": connect_ms,
+                        "ttfb_ms": (headers_at - start) * 1000,
+                        "attempts": attempt + 1,
+                        "reused_connection": connect_ms == 0.0,
+                        "status": response.status_code,
+                        "retry_ms": (start - started) * 1000,
+                    }
+                    if not response.ok:
+                        response.content
+                        response.raise_for_status()
+                    return response, start
+            
+            if self.verbose:
+                print(f"🔁 Retrying in {delay:.2f}s (attempt {attempt + 2})")
+            time.sleep(delay)
+            attempt += 1
+    
+    def _finish_timing(self, start: float):
+        end = time.perf_counter()
+        self.last_timing["total_ms"] = (end - start) * 1000
+        self.last_timing["call_ms"] = self.last_timing["total_ms"] + self.last_timing.pop("retry_ms")
+    
+    def _post(self, payload: dict) -> dict:
+        """POST a chat completion and return the parsed JSON response."""
+        response, start = self._open(payload)
+        content = response.content
+        self._finish_timing(start)
+        return json.loads(content)
+    
+    def _build_messages(self, user_message: str, system_prompt: str = None) -> list:
+        """System prompt, history summary, kept turns and the new user message."""
+        messages = self.history.build(user_message, system_prompt)
+        if self.verbose:
+            print(f"📏 {self.history.format_report()}")
+        return messages
+    
+    def _remember(self, user_message: str, content: str):
+        """Store an exchange; turns over the token budget move into the summary."""
+        self.history.add_exchange(user_message, content)
+    
+    def _cache_lookup(self, user_message: str, system_prompt: str = None):
+        """
+        Check the response cache for a message.
+        
+        Only the opening message of a conversation is looked up or
+        stored: once there is history (kept turns or a summary), even a
+        self-contained-looking question ("What specialist should I
+        see?") may depend on it. Openers too vague to stand alone ("is
+        it serious?") are skipped as well.
+        
+        Returns:
+            Tuple of (whether the reply may be cached, cached reply or None)
+        """
+        self.last_cache_hit = False
+        if self.cache is None:
+            return False, None
+        has_context = self.conversation_history or self.history.summary_lines
+        if has_context or is_follow_up(user_message):
+            self.cache.record_bypass()
+            return False, None
+        cached = self.cache.get(user_message, system_prompt, self.model)
+        if cached is not None:
+            self.last_cache_hit = True
+            self._remember(user_message, cached)
+            if self.verbose:
+                print(f"💾 Cached response: {cached[:50]}...")
+        return True, cached
+    
+    def _print_timing(self, content: str):
+        t = self.last_timing
+        print(f"✅ Response received: {content[:50]}...")
+        first = f" | first token {t['first_token_ms']:.0f} ms" if 'first_token_ms' in t else ""
+        print(f"⏱️  connect {t['connect_ms']:.0f} ms | TTFB {t['ttfb_ms']:.0f} ms{first} | "
+              f"total {t['total_ms']:.0f} ms | attempts {t['attempts']}")
     
     def chat(self, user_message: str, system_prompt: str = None) -> str:
         """
@@ -29,83 +227,145 @@ class GrokClient:
             system_prompt: Optional system instructions
         
         Returns:
-            Grok's response text
+            Grok's response text (an apology if the call failed, see last_error)
         """
+        self.last_error = None
         try:
-            # Build messages
-            messages = []
-            
-            # Add system prompt if provided
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            
-            # Add conversation history
-            messages.extend(self.conversation_history)
+            cacheable, cached = self._cache_lookup(user_message, system_prompt)
+            if cached is not None:
+                return cached
             
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
-            
-            # Prepare request
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/medical-chatbot",
-                "X-Title": "Medical AI Chatbot"
-            }
-            
-            data = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": ModelConfig.TEMPERATURE,
-                "max_tokens": ModelConfig.MAX_TOKENS,
-                "top_p": ModelConfig.TOP_P,
-            }
-            
-            # Add reasoning if enabled
-            if ModelConfig.GROK_REASONING_ENABLED:
-                data["reasoning"] = {"enabled": True}
+            messages = self._build_messages(user_message, system_prompt)
             
             if self.verbose:
                 print(f"\n🤖 Sending to Grok: {user_message[:50]}...")
             
-            # Make API call
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                data=json.dumps(data),
-                timeout=30
-            )
-            
-            response.raise_for_status()
-            response_data = response.json()
+            # Make API call over the pooled session
+            response_data = self._post(dict(self.base_payload, messages=messages))
             
             # Extract response
             assistant_message = response_data['choices'][0]['message']
             content = assistant_message.get('content', '')
             
-            # Store in history
-            self.conversation_history.append({"role": "user", "content": user_message})
-            self.conversation_history.append({"role": "assistant", "content": content})
-            
-            # Keep only last 10 messages (5 exchanges) to avoid token limits
-            if len(self.conversation_history) > 10:
-                self.conversation_history = self.conversation_history[-10:]
+            self._remember(user_message, content)
+            if cacheable:
+                self.cache.put(user_message, content, system_prompt, self.model,
+                               latency_ms=self.last_timing['call_ms'])
             
             if self.verbose:
-                print(f"✅ Response received: {content[:50]}...")
+                self._print_timing(content)
             
             return content
             
         except Exception as e:
+            self.last_error = e
             error_msg = f"Error calling Grok API: {str(e)}"
             print(f"❌ {error_msg}")
             return f"I'm having trouble connecting right now. Error: {str(e)}"
     
+    @staticmethod
+    def _sse_data(response):
+        """
+        Yield the data payload of each server-sent event.
+        
+        Comment lines (": keep-alive") are skipped, and multi-line data
+        fields are joined as the SSE format specifies.
+        """
+        data = []
+        # chunk_size=None hands over each chunk as soon as it arrives
+        for line in response.iter_lines(chunk_size=None, decode_unicode=False):
+            line = line.decode('utf-8')
+            if not line:
+                if data:
+                    yield "\n".join(data)
+                    data = []
+            elif line.startswith('data:'):
+                data.append(line[5:].lstrip(' '))
+        if data:
+            yield "\n".join(data)
+    
+    def chat_stream(self, user_message: str, system_prompt: str = None):
+        """
+        Send a message to Grok and yield the reply as it is generated.
+        
+        The full reply is stored in the conversation history once the
+        stream ends. If the caller stops iterating early, the part that
+        was already delivered is stored instead.
+        
+        Args:
+            user_message: The user's message
+            system_prompt: Optional system instructions
+        
+        Yields:
+            Text deltas of Grok's response (an apology if the call failed,
+            see last_error)
+        """
+        self.last_error = None
+        parts = []
+        response = None
+        completed = abandoned = cacheable = False
+        try:
+            cacheable, cached = self._cache_lookup(user_message, system_prompt)
+            if cached is not None:
+                yield cached
+                return
+            
+            messages = self._build_messages(user_message, system_prompt)
+            
+            if self.verbose:
+                print(f"\n🤖 Streaming from Grok: {user_message[:50]}...")
+            
+            response, start = self._open(dict(self.base_payload, messages=messages, stream=True))
+            for data in self._sse_data(response):
+                # after [DONE], keep reading to the end of the body so the
+                # connection goes back to the pool
+                delta = stream_delta(data)
+                if delta:
+                    if not parts:
+                        self.last_timing['first_token_ms'] = (time.perf_counter() - start) * 1000
+                    parts.append(delta)
+                    yield delta
+            self._finish_timing(start)
+            completed = True
+            
+        except GeneratorExit:
+            abandoned = True
+            raise
+        except Exception as e:
+            self.last_error = e
+            error_msg = f"Error calling Grok API: {str(e)}"
+            print(f"❌ {error_msg}")
+            yield f"I'm having trouble connecting right now. Error: {str(e)}"
+            
+        finally:
+            if response is not None and not completed:
+                # drops the half-read connection instead of reusing it
+                response.close()
+            content = ''.join(parts)
+            # a complete reply, or the part the caller already showed
+            if completed or (abandoned and content):
+                self._remember(user_message, content)
+            if completed and cacheable:
+                self.cache.put(user_message, content, system_prompt, self.model,
+                               latency_ms=self.last_timing['call_ms'])
+            if completed and self.verbose:
+                self._print_timing(content)
+    
     def reset_conversation(self):
         """Clear conversation history."""
-        self.conversation_history = []
+        self.history.clear()
         if self.verbose:
             print("🔄 Conversation history cleared")
+    
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
 
 
 # For testing
@@ -127,4 +387,11 @@ if __name__ == '__main__':
     response = client.chat("What specialist should I see for that?")
     print(f"\nResponse:\n{response}\n")
     
+    # Test 3: Streaming
+    print("\nTEST 3: Streamed answer")
+    print("-"*60)
+    for delta in client.chat_stream("How is asthma treated?"):
+        print(delta, end="", flush=True)
+    print("\n")
+    
     print("✅ All tests passed!")
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""Token-budgeted conversation history with a rolling extractive summary."""
+
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.model_config import ModelConfig
+
+
+# Role/separator tokens chat APIs add around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]+[.!?]?")
+STOP_WORDS = {
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'i', 'you', 'my', 'me',
+    'to', 'of', 'and', 'or', 'in', 'on', 'for', 'with', 'what', 'how', 'do',
+    'does', 'can', 'it', 'this', 'that', 'should', 'about', 'have', 'has',
+}
+
+
+def _piece_tokens(piece: str) -> int:
+    # common words are a single BPE token; long or rare ones split further
+    return 1 + len(piece) // 8
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate BPE token count without a tokenizer.
+
+    Each punctuation mark and each word counts as one token, plus one
+    for every further eight characters of a long word, which tracks
+    GPT/Llama tokenizers closely enough for budgeting English prose.
+    """
+    return sum(_piece_tokens(piece) for piece in TOKEN_PATTERN.findall(text or ''))
+
+
+def message_tokens(message: Dict) -> int:
+    """Estimated tokens of one chat message, including per-message overhead."""
+    return estimate_tokens(message['content']) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_tokens(text: str, limit: int) -> str:
+    """Cut text after roughly ``limit`` tokens (whole words, marked with '…')."""
+    used = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > limit:
+            return text[:match.start()].rstrip() + " …"
+    return text
+
+
+def key_sentence(text: str, query: str = '') -> str:
+    """
+    Sentence of ``text`` that shares the most content words with ``query``
+    (the first sentence on ties or without a query).
+    """
+    sentences = [s.strip() for s in SENTENCE_PATTERN.findall(text) if s.strip()]
+    if not sentences:
+        return ''
+    terms = {w for w in re.findall(r"[a-z]+", query.lower()) if w not in STOP_WORDS}
+    return max(sentences, key=lambda s: (len(terms & set(re.findall(r"[a-z]+", s.lower()))),
+                                         -sentences.index(s)))
+
+
+class HistoryManager:
+    """
+    Conversation history kept under a token budget.
+
+    The oldest exchanges are evicted once the history exceeds
+    ``token_budget`` estimated tokens; each evicted exchange is reduced to
+    one line (the user's question and the reply's most relevant sentence)
+    in a rolling summary, itself capped at ``summary_budget`` tokens and
+    sent as a system message ahead of the kept turns. Messages longer than
+    half the budget are stored truncated.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, summary_budget: Optional[int] = None,
+                 min_messages: Optional[int] = None):
+        """
+        Initialize an empty history.
+
+        Args:
+            token_budget: Estimated tokens of kept messages (default: ModelConfig)
+            summary_budget: Estimated tokens of the rolling summary, 0 disables it
+                (default: ModelConfig)
+            min_messages: Most recent messages kept whatever their size
+                (default: ModelConfig)
+        """
+        self.token_budget = token_budget or ModelConfig.HISTORY_TOKEN_BUDGET
+        self.summary_budget = ModelConfig.HISTORY_SUMMARY_TOKENS if summary_budget is None else summary_budget
+        self.min_messages = ModelConfig.HISTORY_MIN_MESSAGES if min_messages is None else min_messages
+
+        self.messages: List[Dict] = []
+        self.summary_lines: List[str] = []
+        self.tokens = 0
+        self.evicted = 0
+        # Estimated prompt tokens of the last build(), by part
+        self.last_report = None
+
+    def add(self, role: str, content: str):
+        """Append a message, then evict down to the budget."""
+        content = truncate_tokens(content, self.token_budget // 2)
+        message = {"role": role, "content": content}
+        self.messages.append(message)
+        self.tokens += message_tokens(message)
+        self._compact()
+
+    def add_exchange(self, user_message: str, assistant_message: str):
+        """Append a user message and the assistant's reply."""
+        self.add("user", user_message)
+        self.add("assistant", assistant_message)
+
+    def _compact(self):
+        while self.tokens > self.token_budget and len(self.messages) > self.min_messages:
+            first = self.messages.pop(0)
+            self.tokens -= message_tokens(first)
+            self.evicted += 1
+            reply = None
+            if first['role'] == 'user' and self.messages and self.messages[0]['role'] == 'assistant' \
+                    and len(self.messages) > self.min_messages:
+                reply = self.messages.pop(0)
+                self.tokens -= message_tokens(reply)
+                self.evicted += 1
+            self._summarize(first, reply)
+
+    def _summarize(self, first: Dict, reply: Optional[Dict]):
+        if not self.summary_budget:
+            return
+        line_budget = max(8, self.summary_budget // 8)
+        if first['role'] == 'user':
+            line = f"- User: {truncate_tokens(key_sentence(first['content']), line_budget)}"
+            if reply is not None:
+                sentence = key_sentence(reply['content'], first['content'])
+                line += f" / Assistant: {truncate_tokens(sentence, line_budget)}"
+        else:
+            line = f"- Assistant: {truncate_tokens(key_sentence(first['content']), line_budget)}"
+        self.summary_lines.append(line)
+        while len(self.summary_lines) > 1 and \
+                sum(estimate_tokens(l) for l in self.summary_lines) > self.summary_budget:
+            self.summary_lines.pop(0)
+
+    def summary_message(self) -> Optional[Dict]:
+        """System message with the rolling summary, or None if nothing was evicted."""
+        if not self.summary_lines:
+            return None
+        return {"role": "system",
+                "content": "Summary of the earlier conversation:\n" + "\n".join(self.summary_lines)}
+
+    def build(self, user_message: str, system_prompt: Optional[str] = None) -> List[Dict]:
+        """
+        Messages for the next request: system prompt, summary, history, new message.
+
+        Also sets ``last_report`` to the estimated tokens of each part.
+        """
+        messages = []
+        report = {'system': 0, 'summary': 0, 'history': self.tokens, 'message': 0}
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+            report['system'] = message_tokens(messages[-1])
+        summary = self.summary_message()
+        if summary is not None:
+            messages.append(summary)
+            report['summary'] = message_tokens(summary)
+        messages.extend(self.messages)
+        messages.append({"role": "user", "content": user_message})
+        report['message'] = message_tokens(messages[-1])
+        report['total'] = sum(report.values())
+        self.last_report = report
+        return messages
+
+    def clear(self):
+        """Forget the conversation, including the summary."""
+        self.messages = []
+        self.summary_lines = []
+        self.tokens = 0
+        self.evicted = 0
+        self.last_report = None
+
+    def format_report(self) -> str:
+        """One-line breakdown of last_report."""
+        r = self.last_report
+        if r is None:
+            return "no request yet"
+        return (f"prompt ~{r['total']} tokens (system {r['system']}, summary {r['summary']}, "
+                f"history {r['history']}, message {r['message']})")
+
+
+# For testing
+if __name__ == '__main__':
+    print("History Manager Test")
+    print("=" * 60)
+
+    history = HistoryManager(token_budget=90, summary_budget=60)
+    exchanges = [
+        ("What are the symptoms of diabetes?",
+         "Diabetes often causes increased thirst and frequent urination. "
+         "Fatigue and blurred vision are also common. See an Endocrinologist."),
+        ("How is asthma treated?",
+         "Asthma is treated with inhalers. Rescue inhalers relieve attacks quickly, "
+         "while controller inhalers reduce inflammation over time."),
+        ("What specialist treats migraines?",
+         "A Neurologist treats migraines. Keeping a headache diary helps identify triggers."),
+    ]
+    for question, answer in exchanges:
+        history.build(question, "You are a helpful medical assistant.")
+        print(history.format_report())
+        history.add_exchange(question, answer)
+
+    print(f"\nKept {len(history.messages)} messages ({history.tokens} tokens), evicted {history.evicted}")
+    print(history.summary_message()['content'])
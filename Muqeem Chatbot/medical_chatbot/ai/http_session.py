@@ -0,0 +1,87 @@
+"""Pooled HTTP session with per-connection timing for the LLM clients."""
+
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """HTTPConnection that records how long connect() took."""
+
+    connect_ms = 0.0
+    fresh = False
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        self.connect_ms = (time.perf_counter() - start) * 1000
+        self.fresh = True
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """HTTPSConnection that records how long connect() (TCP + TLS) took."""
+
+    connect_ms = 0.0
+    fresh = False
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        self.connect_ms = (time.perf_counter() - start) * 1000
+        self.fresh = True
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools open TimedHTTP(S)Connection objects."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+def create_session(pool_size: int = 10, headers: dict = None) -> requests.Session:
+    """
+    Create a keep-alive session backed by timed connection pools.
+
+    Args:
+        pool_size: Connections kept open per host
+        headers: Headers sent with every request
+
+    Returns:
+        requests.Session (retries are left to the caller)
+    """
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def connection_time_ms(response: requests.Response) -> float:
+    """
+    Connect (TCP + TLS) time paid by this response, 0 if the connection was reused.
+
+    Must be called before the body is read (stream=True), while the
+    connection is still attached to the response.
+    """
+    conn = getattr(response.raw, 'connection', None)
+    if conn is None or not getattr(conn, 'fresh', False):
+        return 0.0
+    conn.fresh = False
+    return conn.connect_ms
@@ -0,0 +1,359 @@
+"""Response cache for LLM answers to self-contained questions."""
+
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.model_config import ModelConfig
+
+
+# Words that make a message depend on the previous turns
+FOLLOW_UP_WORDS = {
+    'it', 'its', 'that', 'this', 'these', 'those', 'they', 'them', 'their',
+    'he', 'she', 'him', 'her', 'his', 'hers', 'there', 'same', 'above',
+    'previous', 'earlier', 'else', 'instead', 'again',
+}
+FOLLOW_UP_STARTS = ('and ', 'but ', 'also ', 'so ', 'what about', 'how about', 'why', 'then ')
+# Politeness that does not change the answer
+FILLER_WORDS = {'please', 'pls', 'hi', 'hello', 'hey', 'thanks', 'thank', 'you', 'kindly'}
+
+
+def normalize_question(text: str) -> str:
+    """
+    Canonical form of a question for exact cache lookups.
+
+    Lowercases, drops punctuation and filler words and collapses
+    whitespace, so "What is diabetes?" and "what is diabetes please"
+    share an entry.
+    """
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    kept = [w for w in words if w not in FILLER_WORDS]
+    return ' '.join(kept or words)
+
+
+def is_follow_up(text: str) -> bool:
+    """
+    Whether a message only makes sense with the conversation before it
+    ("what about for children?", "is it serious?", "why?").
+    """
+    lowered = text.lower().strip()
+    words = re.findall(r"[a-z']+", lowered)
+    if len(words) <= 2:
+        return True
+    if lowered.startswith(FOLLOW_UP_STARTS):
+        return True
+    return any(w in FOLLOW_UP_WORDS for w in words)
+
+
+def prompt_hash(system_prompt: Optional[str]) -> str:
+    """Short digest of a system prompt (changing the prompt invalidates its entries)."""
+    return hashlib.sha256((system_prompt or '').encode('utf-8')).hexdigest()[:16]
+
+
+class ResponseCache:
+    """
+    Cache of LLM replies keyed on (model, system prompt hash, normalized question).
+
+    Entries live in an in-memory LRU backed by a SQLite file, so they
+    survive restarts; both expire after ``ttl`` seconds. With
+    ``semantic=True`` a miss on the exact key falls back to the most
+    similar cached question (cosine similarity of sentence embeddings,
+    same model and prompt) if it scores at least ``similarity``.
+
+    Replies are only correct for questions asked without prior context,
+    so skipping the rest is the caller's job: GrokClient only caches the
+    first message of a conversation, unless is_follow_up() flags it.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, semantic: Optional[bool] = None,
+                 similarity: Optional[float] = None, embedder=None):
+        """
+        Initialize the cache and load unexpired entries from disk.
+
+        Args:
+            path: SQLite file (None for ModelConfig.RESPONSE_CACHE_PATH, '' for memory only)
+            ttl: Seconds an entry stays valid (0 = forever)
+            max_entries: Entries kept before the least recently used is evicted
+            semantic: Enable the embedding-similarity tier
+            similarity: Minimum cosine similarity for a semantic hit
+            embedder: Callable mapping a list of texts to an array of
+                embeddings (defaults to a sentence-transformers model
+                named by ModelConfig.EMBEDDINGS_MODEL)
+        """
+        self.path = ModelConfig.RESPONSE_CACHE_PATH if path is None else path
+        self.ttl = ModelConfig.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or ModelConfig.RESPONSE_CACHE_MAX_ENTRIES
+        self.semantic = ModelConfig.RESPONSE_CACHE_SEMANTIC if semantic is None else semantic
+        self.similarity = ModelConfig.RESPONSE_CACHE_SIMILARITY if similarity is None else similarity
+        self._embedder = embedder
+
+        self._lock = threading.Lock()
+        # key -> dict(partition, question, response, created, latency_ms, embedding)
+        self._entries = OrderedDict()
+        self._matrix = None                 # stacked embeddings for semantic lookups
+        self._matrix_keys = []
+        self._stats = {'lookups': 0, 'exact_hits': 0, 'semantic_hits': 0, 'misses': 0,
+                       'bypassed': 0, 'stores': 0, 'evictions': 0, 'saved_ms': 0.0}
+
+        self._db = None
+        if self.path:
+            self._open_db()
+            self._load()
+
+    # ============ STORAGE ============
+
+    def _open_db(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                partition TEXT NOT NULL,
+                question TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                latency_ms REAL NOT NULL,
+                embedding BLOB
+            )
+        """)
+        self._db.commit()
+
+    def _load(self):
+        """Drop expired rows and load the most recently used ones into memory."""
+        if self.ttl:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        rows = self._db.execute(
+            "SELECT key, partition, question, response, created, latency_ms, embedding "
+            "FROM responses ORDER BY last_used DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        # anything beyond max_entries was evicted while we were down
+        self._db.execute(
+            "DELETE FROM responses WHERE key NOT IN "
+            "(SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)", (self.max_entries,)
+        )
+        self._db.commit()
+        for key, partition, question, response, created, latency_ms, embedding in reversed(rows):
+            self._entries[key] = {
+                'partition': partition, 'question': question, 'response': response,
+                'created': created, 'latency_ms': latency_ms,
+                'embedding': np.frombuffer(embedding, dtype=np.float32) if embedding else None,
+            }
+
+    def _delete(self, keys):
+        if self._db is not None and keys:
+            self._db.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in keys])
+            self._db.commit()
+
+    # ============ EMBEDDINGS ============
+
+    def _embed(self, text: str):
+        """Unit-length embedding of a question, or None if the tier is off."""
+        if not self.semantic:
+            return None
+        if self._embedder is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(ModelConfig.EMBEDDINGS_MODEL, device='cpu')
+                self._embedder = model.encode
+            except Exception as e:
+                print(f"⚠️  Semantic cache disabled, embeddings unavailable: {e}")
+                self.semantic = False
+                return None
+        vector = np.asarray(self._embedder([text]), dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _nearest(self, partition: str, vector):
+        """Key and similarity of the closest cached question in a partition."""
+        if self._matrix is None:
+            keys = [k for k, e in self._entries.items() if e['embedding'] is not None]
+            self._matrix_keys = keys
+            self._matrix = (np.stack([self._entries[k]['embedding'] for k in keys])
+                            if keys else np.empty((0, vector.shape[0]), dtype=np.float32))
+        if not self._matrix_keys:
+            return None, 0.0
+        scores = self._matrix @ vector
+        for i in np.argsort(-scores):
+            key = self._matrix_keys[i]
+            entry = self._entries.get(key)
+            if entry is not None and entry['partition'] == partition:
+                return key, float(scores[i])
+        return None, 0.0
+
+    # ============ LOOKUPS ============
+
+    @staticmethod
+    def _keys(question: str, system_prompt: Optional[str], model: str):
+        partition = f"{model}:{prompt_hash(system_prompt)}"
+        normalized = normalize_question(question)
+        key = hashlib.sha256(f"{partition}\x00{normalized}".encode('utf-8')).hexdigest()
+        return partition, normalized, key
+
+    def _expired(self, entry: Dict) -> bool:
+        return bool(self.ttl) and time.time() - entry['created'] > self.ttl
+
+    def _touch(self, key: str):
+        self._entries.move_to_end(key)
+        if self._db is not None:
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+    def get(self, question: str, system_prompt: Optional[str] = None,
+            model: Optional[str] = None) -> Optional[str]:
+        """
+        Cached reply for a question, or None on a miss.
+
+        Args:
+            question: The user's message
+            system_prompt: System prompt the reply was generated with
+            model: Model name (defaults to ModelConfig.GROK_MODEL)
+
+        Returns:
+            The cached response text, or None
+        """
+        partition, normalized, key = self._keys(question, system_prompt, model or ModelConfig.GROK_MODEL)
+        with self._lock:
+            self._stats['lookups'] += 1
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._touch(key)
+                self._stats['exact_hits'] += 1
+                self._stats['saved_ms'] += entry['latency_ms']
+                return entry['response']
+
+        # embedding runs outside the lock; it is the slow part
+        vector = self._embed(normalized)
+        if vector is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        with self._lock:
+            match, score = self._nearest(partition, vector)
+            entry = self._entries.get(match) if match else None
+            if entry is not None and self._expired(entry):
+                self._remove(match)
+                entry = None
+            if entry is None or score < self.similarity:
+                self._stats['misses'] += 1
+                return None
+            self._touch(match)
+            self._stats['semantic_hits'] += 1
+            self._stats['saved_ms'] += entry['latency_ms']
+            return entry['response']
+
+    def put(self, question: str, response: str, system_prompt: Optional[str] = None,
+            model: Optional[str] = None, latency_ms: float = 0.0):
+        """
+        Store a reply.
+
+        Args:
+            question: The user's message
+            response: The LLM's reply
+            system_prompt: System prompt the reply was generated with
+            model: Model name (defaults to ModelConfig.GROK_MODEL)
+            latency_ms: How long the LLM call took (credited as saved on each hit)
+        """
+        if not response:
+            return
+        partition, normalized, key = self._keys(question, system_prompt, model or ModelConfig.GROK_MODEL)
+        vector = self._embed(normalized)
+        now = time.time()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = {
+                'partition': partition, 'question': normalized, 'response': response,
+                'created': now, 'latency_ms': latency_ms, 'embedding': vector,
+            }
+            self._matrix = None
+            self._stats['stores'] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, partition, normalized, response, now, now, latency_ms,
+                     vector.tobytes() if vector is not None else None)
+                )
+                self._db.commit()
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            if evicted:
+                self._stats['evictions'] += len(evicted)
+                self._delete(evicted)
+
+    def _remove(self, key: str):
+        self._entries.pop(key, None)
+        self._matrix = None
+        self._delete([key])
+
+    def record_bypass(self):
+        """Count a message that skipped the cache (asked in context, or a follow-up)."""
+        with self._lock:
+            self._stats['bypassed'] += 1
+
+    def clear(self):
+        """Remove every entry, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self):
+        """Close the SQLite file."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # ============ METRICS ============
+
+    def stats(self) -> Dict:
+        """Hit/miss counters, hit rate and LLM time saved."""
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        hits = stats['exact_hits'] + stats['semantic_hits']
+        stats['hit_rate'] = hits / stats['lookups'] if stats['lookups'] else 0.0
+        return stats
+
+    def format_stats(self) -> str:
+        """One-line summary of stats()."""
+        s = self.stats()
+        return (f"Cache: {s['exact_hits']} exact + {s['semantic_hits']} similar hits, "
+                f"{s['misses']} misses ({s['hit_rate']:.1%} hit rate), {s['bypassed']} bypassed, "
+                f"{s['entries']} entries, ~{s['saved_ms'] / 1000:.1f} s of LLM time saved")
+
+
+# For testing
+if __name__ == '__main__':
+    print("Response Cache Test")
+    print("=" * 60)
+
+    cache = ResponseCache(path='', semantic=False)
+    cache.put("What is diabetes?", "Diabetes is a chronic condition...", "prompt", latency_ms=1800)
+
+    for question in ["what is diabetes", "What is Diabetes? please", "What is asthma?"]:
+        print(f"{question!r:32} -> {cache.get(question, 'prompt')!r}")
+    for message in ["Is it serious?", "What about children?", "What are the symptoms of asthma?"]:
+        print(f"{message!r:36} follow-up: {is_follow_up(message)}")
+
+    print("\n" + cache.format_stats())
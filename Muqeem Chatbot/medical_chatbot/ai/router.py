@@ -0,0 +1,286 @@
+"""Tiered routing: local intent classifier, then symptom analysis, then the LLM."""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.model_config import ModelConfig
+from models.symptom_analyzer import SymptomAnalyzer
+from ai.history_manager import estimate_tokens
+
+
+TIERS = ('classifier', 'symptoms', 'llm')
+
+
+def load_intent_classifier(path: Optional[str] = None):
+    """
+    Import the HealthMate intent classifier (chatbot.py) from ``path``.
+
+    The directory is appended to sys.path so chatbot.py can import its
+    own helpers (preprocessing, conversation_logger) without shadowing
+    this package's modules.
+
+    Args:
+        path: Directory containing chatbot.py (defaults to
+            ModelConfig.INTENT_CLASSIFIER_PATH)
+
+    Returns:
+        The imported module
+    """
+    path = os.path.abspath(path or ModelConfig.INTENT_CLASSIFIER_PATH)
+    module_file = os.path.join(path, 'chatbot.py')
+    if not os.path.exists(module_file):
+        raise FileNotFoundError(f"Intent classifier not found: {module_file}")
+
+    if path not in sys.path:
+        sys.path.append(path)
+    spec = importlib.util.spec_from_file_location('healthmate_chatbot', module_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TieredRouter:
+    """
+    Answers a message with the cheapest tier that can handle it.
+
+    1. classifier: the local TF-IDF intent model, for the intents listed in
+       ModelConfig.ROUTER_CLASSIFIER_INTENTS, when its confidence clears the
+       intent's calibrated threshold, capped at ROUTER_MAX_THRESHOLD (or
+       ROUTER_MIN_CONFIDENCE if set)
+    2. symptoms: SymptomAnalyzer, when the message names known symptoms
+    3. llm: GrokClient.chat with the system prompt
+
+    Every tier keeps attempt/hit/error counts and latency totals; the LLM
+    tier also estimates tokens and cost, so the share of traffic that
+    never reaches the API is visible.
+    """
+
+    def __init__(self, grok=None, symptom_analyzer: Optional[SymptomAnalyzer] = None,
+                 system_prompt: Optional[str] = None, classifier=None,
+                 classifier_intents=None, min_confidence: Optional[float] = None,
+                 max_threshold: Optional[float] = None):
+        """
+        Initialize the router.
+
+        Args:
+            grok: GrokClient for the last tier (None disables the LLM tier)
+            symptom_analyzer: Analyzer for the second tier (created if omitted)
+            system_prompt: System prompt sent with LLM requests
+            classifier: Imported chatbot.py module; loaded from
+                ModelConfig.INTENT_CLASSIFIER_PATH if omitted and enabled
+            classifier_intents: Intents the classifier may answer
+                (defaults to ModelConfig.ROUTER_CLASSIFIER_INTENTS; '*' = all)
+            min_confidence: Fixed confidence cut-off instead of the model's
+                per-intent thresholds
+            max_threshold: Ceiling on the per-intent thresholds (default:
+                ModelConfig.ROUTER_MAX_THRESHOLD)
+        """
+        self.grok = grok
+        self.symptom_analyzer = symptom_analyzer or SymptomAnalyzer()
+        self.system_prompt = system_prompt
+        self.min_confidence = ModelConfig.ROUTER_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self.max_threshold = ModelConfig.ROUTER_MAX_THRESHOLD if max_threshold is None else max_threshold
+
+        intents = ModelConfig.ROUTER_CLASSIFIER_INTENTS if classifier_intents is None else classifier_intents
+        self.classifier_intents = None if '*' in intents else set(intents)
+
+        self.classifier = classifier
+        if self.classifier is None and ModelConfig.ROUTER_CLASSIFIER_ENABLED:
+            try:
+                self.classifier = load_intent_classifier()
+            except Exception as e:
+                print(f"⚠️  Intent classifier unavailable, routing without it: {e}")
+
+        self._lock = threading.Lock()
+        self._stats = {
+            tier: {'attempts': 0, 'handled': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            for tier in TIERS
+        }
+        self._stats['llm'].update({'est_tokens': 0, 'est_cost': 0.0})
+
+    def warm_up(self) -> bool:
+        """Load the classifier model now instead of on the first message."""
+        if self.classifier is None:
+            return False
+        try:
+            self.classifier.classify_top("hello")
+            return True
+        except Exception as e:
+            print(f"⚠️  Intent classifier failed to load, routing without it: {e}")
+            self.classifier = None
+            return False
+
+    def route(self, user_input: str) -> Dict:
+        """
+        Answer a message, escalating tier by tier.
+
+        Args:
+            user_input: The user's message
+
+        Returns:
+            Dictionary with the response, the tier that produced it and,
+            for the classifier tier, the intent and confidence
+        """
+        result = self._try('classifier', self._classify, user_input)
+        if result is None:
+            result = self._try('symptoms', self._analyze_symptoms, user_input)
+        if result is None:
+            result = self._try('llm', self._ask_llm, user_input)
+        if result is None:
+            result = {'response': "I'm sorry, I can't answer that right now. Please try again later."}
+            result['tier'] = 'none'
+        return result
+
+    def route_stream(self, user_input: str):
+        """
+        Like route(), but yields the reply in pieces: local tiers yield
+        their whole answer at once, the LLM tier streams it as it is
+        generated.
+        
+        Args:
+            user_input: The user's message
+        
+        Yields:
+            Text of the response
+        """
+        result = self._try('classifier', self._classify, user_input)
+        if result is None:
+            result = self._try('symptoms', self._analyze_symptoms, user_input)
+        if result is not None:
+            yield result['response']
+            return
+        if self.grok is None:
+            yield "I'm sorry, I can't answer that right now. Please try again later."
+            return
+        
+        parts = []
+        start = time.perf_counter()
+        try:
+            for delta in self.grok.chat_stream(user_input, system_prompt=self.system_prompt):
+                parts.append(delta)
+                yield delta
+        finally:
+            # the client yields an apology instead of raising when the call fails
+            failed = getattr(self.grok, 'last_error', None) is not None
+            self._record('llm', (time.perf_counter() - start) * 1000, handled=not failed, error=failed)
+            if not failed and not getattr(self.grok, 'last_cache_hit', False):
+                self._count_tokens(''.join(parts))
+    
+    def _record(self, tier: str, elapsed_ms: float, handled: bool, error: bool):
+        with self._lock:
+            stats = self._stats[tier]
+            stats['attempts'] += 1
+            stats['errors'] += error
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            if handled:
+                stats['handled'] += 1
+    
+    def _try(self, tier: str, handler, user_input: str) -> Optional[Dict]:
+        start = time.perf_counter()
+        try:
+            result = handler(user_input)
+            error = False
+        except Exception as e:
+            print(f"❌ Error in {tier} tier: {e}")
+            result, error = None, True
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self._record(tier, elapsed_ms, handled=result is not None, error=error)
+
+        if result is not None:
+            result['tier'] = tier
+            result['latency_ms'] = elapsed_ms
+        return result
+
+    def _classify(self, user_input: str) -> Optional[Dict]:
+        if self.classifier is None:
+            return None
+        top = self.classifier.classify_top(user_input)
+        if self.classifier_intents is not None and top['tag'] not in self.classifier_intents:
+            return None
+        if self.min_confidence is not None:
+            threshold = self.min_confidence
+        else:
+            # a calibration that could not trust an intent may ask for 1.0
+            threshold = min(top['threshold'], self.max_threshold)
+        if top['confidence'] < threshold:
+            return None
+        return {
+            'response': self.classifier.choose_response(top['tag'], top['confidence'], threshold),
+            'intent': top['tag'],
+            'confidence': top['confidence'],
+        }
+
+    def _analyze_symptoms(self, user_input: str) -> Optional[Dict]:
+        analysis = self.symptom_analyzer.analyze_symptoms(user_input)
+        if not analysis['found_matches']:
+            return None
+        return {'response': analysis['recommendation']}
+
+    def _ask_llm(self, user_input: str) -> Optional[Dict]:
+        if self.grok is None:
+            return None
+        response = self.grok.chat(user_input, system_prompt=self.system_prompt)
+        # the client returns an apology instead of raising when the call fails
+        error = getattr(self.grok, 'last_error', None)
+        if error is not None:
+            raise RuntimeError(f"Grok API call failed: {error}")
+        if not getattr(self.grok, 'last_cache_hit', False):
+            self._count_tokens(response)
+        return {'response': response}
+
+    def _count_tokens(self, response: str):
+        # the client's estimate of the prompt it just sent, plus the reply
+        tokens = self.grok.last_prompt_tokens + estimate_tokens(response)
+        with self._lock:
+            self._stats['llm']['est_tokens'] += tokens
+            self._stats['llm']['est_cost'] += tokens / 1000 * ModelConfig.LLM_COST_PER_1K_TOKENS
+
+    def stats(self) -> Dict:
+        """Per-tier counters, with mean latency and share of all messages handled."""
+        with self._lock:
+            snapshot = {tier: dict(values) for tier, values in self._stats.items()}
+        total = snapshot['classifier']['attempts']
+        for values in snapshot.values():
+            values['mean_ms'] = values['total_ms'] / values['attempts'] if values['attempts'] else 0.0
+            values['share'] = values['handled'] / total if total else 0.0
+        return snapshot
+
+    def format_stats(self) -> str:
+        """Human-readable table of stats()."""
+        stats = self.stats()
+        lines = [f"{'tier':<11} {'handled':>8} {'share':>7} {'mean ms':>9} {'max ms':>9} {'errors':>7}"]
+        for tier in TIERS:
+            s = stats[tier]
+            lines.append(f"{tier:<11} {s['handled']:>8} {s['share']:>7.1%} "
+                         f"{s['mean_ms']:>9.1f} {s['max_ms']:>9.1f} {s['errors']:>7}")
+        llm = stats['llm']
+        lines.append(f"LLM: ~{llm['est_tokens']} tokens, est. cost ${llm['est_cost']:.4f}")
+        cache = getattr(self.grok, 'cache', None)
+        if cache is not None:
+            lines.append(cache.format_stats())
+        return "\n".join(lines)
+
+
+# For testing
+if __name__ == '__main__':
+    print("Tiered Router Test (LLM tier disabled)")
+    print("=" * 60)
+
+    router = TieredRouter(grok=None)
+    router.warm_up()
+
+    for message in ["hello", "thanks a lot", "I have chest pain and shortness of breath",
+                    "What is the capital of France?"]:
+        result = router.route(message)
+        print(f"\nUser: {message}")
+        print(f"[{result['tier']}] {result['response'][:80]}")
+
+    print("\n" + router.format_stats())
@@ -1,2 +1,3 @@
 from .database_config import DatabaseConfig
 from .model_config import ModelConfig
+from .schedule_config import ScheduleConfig
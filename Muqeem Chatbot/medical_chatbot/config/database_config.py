@@ -15,6 +15,21 @@ class DatabaseConfig:
     DB_HOST = os.getenv('DB_HOST', 'localhost')
     DB_PORT = os.getenv('DB_PORT', '5432')
     
+    # Connection pool settings
+    POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+    POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+    POOL_MAX_OVERFLOW = int(os.getenv('DB_POOL_MAX_OVERFLOW', '5'))
+    POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+    POOL_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', '30'))
+    
+    # Chat history write-behind settings
+    CHAT_BATCH_SIZE = int(os.getenv('CHAT_BATCH_SIZE', '100'))
+    CHAT_FLUSH_INTERVAL = float(os.getenv('CHAT_FLUSH_INTERVAL', '1'))
+    CHAT_QUEUE_SIZE = int(os.getenv('CHAT_QUEUE_SIZE', '10000'))
+    CHAT_ENQUEUE_TIMEOUT = float(os.getenv('CHAT_ENQUEUE_TIMEOUT', '0.5'))
+    CHAT_WRITE_RETRIES = int(os.getenv('CHAT_WRITE_RETRIES', '2'))
+    CHAT_RETRY_BACKOFF = float(os.getenv('CHAT_RETRY_BACKOFF', '0.5'))
+    
     @classmethod
     def get_connection_string(cls):
         """Get PostgreSQL connection string."""
@@ -30,6 +45,29 @@ class DatabaseConfig:
             'host': cls.DB_HOST,
             'port': cls.DB_PORT
         }
+    
+    @classmethod
+    def get_pool_config(cls):
+        """Get connection pool settings as dictionary."""
+        return {
+            'min_size': cls.POOL_MIN_SIZE,
+            'max_size': cls.POOL_MAX_SIZE,
+            'max_overflow': cls.POOL_MAX_OVERFLOW,
+            'timeout': cls.POOL_TIMEOUT,
+            'health_check_interval': cls.POOL_HEALTH_CHECK_INTERVAL
+        }
+    
+    @classmethod
+    def get_chat_writer_config(cls):
+        """Get chat history write-behind settings as dictionary."""
+        return {
+            'batch_size': cls.CHAT_BATCH_SIZE,
+            'flush_interval': cls.CHAT_FLUSH_INTERVAL,
+            'max_queue_size': cls.CHAT_QUEUE_SIZE,
+            'enqueue_timeout': cls.CHAT_ENQUEUE_TIMEOUT,
+            'write_retries': cls.CHAT_WRITE_RETRIES,
+            'retry_backoff': cls.CHAT_RETRY_BACKOFF
+        }
 
 
 if __name__ == '__main__':
@@ -37,4 +75,5 @@ if __name__ == '__main__':
     print(f"  Host: {DatabaseConfig.DB_HOST}")
     print(f"  Port: {DatabaseConfig.DB_PORT}")
     print(f"  Database: {DatabaseConfig.DB_NAME}")
-    print(f"  User: {DatabaseConfig.DB_USER}")
\ No newline at end of file
+    print(f"  User: {DatabaseConfig.DB_USER}")
+    print(f"  Pool: {DatabaseConfig.POOL_MAX_SIZE} connections (+{DatabaseConfig.POOL_MAX_OVERFLOW} overflow)")
\ No newline at end of file
@@ -29,6 +29,8 @@ class ModelConfig:
     
     # Override with .env if you set it manually
     GROK_MODEL = os.getenv('GROK_MODEL', GROK_MODEL)
+    # e.g. http://127.0.0.1:8089 for scripts/stub_llm_server.py
+    OPENROUTER_BASE_URL = os.getenv('OPENROUTER_BASE_URL', OPENROUTER_BASE_URL).rstrip('/')
     
     # Disable Grok-specific stuff (Llama doesn't need it)
     GROK_REASONING_ENABLED = os.getenv('GROK_REASONING_ENABLED', 'false').lower() == 'true'
@@ -38,6 +40,35 @@ class ModelConfig:
     MAX_TOKENS = int(os.getenv('MAX_TOKENS', '2048'))
     TOP_P = float(os.getenv('TOP_P', '0.95'))
     
+    # HTTP client: keep-alive pool, timeouts (seconds) and retries on 429/5xx
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '60'))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+    HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', '0.5'))
+    HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', '8'))
+    
+    # Async client: requests in flight, provider quotas (0 = unlimited), sessions kept
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '32'))
+    LLM_RATE_LIMIT_RPM = float(os.getenv('LLM_RATE_LIMIT_RPM', '0'))
+    LLM_RATE_LIMIT_TPM = float(os.getenv('LLM_RATE_LIMIT_TPM', '0'))
+    LLM_MAX_SESSIONS = int(os.getenv('LLM_MAX_SESSIONS', '10000'))
+    
+    # Response cache for self-contained questions (TTL in seconds, 0 = forever);
+    # the semantic tier needs sentence-transformers and EMBEDDINGS_MODEL
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_PATH = os.getenv('RESPONSE_CACHE_PATH', './response_cache.sqlite')
+    RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '604800'))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '5000'))
+    RESPONSE_CACHE_SEMANTIC = os.getenv('RESPONSE_CACHE_SEMANTIC', 'false').lower() == 'true'
+    RESPONSE_CACHE_SIMILARITY = float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0.92'))
+    
+    # Conversation history: estimated-token budget for kept turns, for the
+    # rolling summary of evicted turns (0 = no summary), and messages always kept
+    HISTORY_TOKEN_BUDGET = int(os.getenv('HISTORY_TOKEN_BUDGET', '1500'))
+    HISTORY_SUMMARY_TOKENS = int(os.getenv('HISTORY_SUMMARY_TOKENS', '200'))
+    HISTORY_MIN_MESSAGES = int(os.getenv('HISTORY_MIN_MESSAGES', '2'))
+    
     # Embeddings (unchanged, but you can ignore if not using)
     EMBEDDINGS_MODEL = os.getenv('EMBEDDINGS_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
     
@@ -49,6 +80,32 @@ class ModelConfig:
     # Vector database (unchanged)
     CHROMA_PERSIST_DIR = os.getenv('CHROMA_PERSIST_DIR', './chroma_db')
     
+    # Condition catalogue: 'builtin', 'file' (JSON) or 'database'
+    CONDITIONS_SOURCE = os.getenv('CONDITIONS_SOURCE', 'builtin')
+    CONDITIONS_FILE = os.getenv('CONDITIONS_FILE', '')
+    # Seconds between hot-reload checks (0 disables reloading)
+    CONDITIONS_RELOAD_INTERVAL = float(os.getenv('CONDITIONS_RELOAD_INTERVAL', '0'))
+    
+    # Tiered routing: the HealthMate intent classifier (chatbot.py) answers
+    # these intents locally before symptom analysis and the LLM are tried
+    ROUTER_CLASSIFIER_ENABLED = os.getenv('ROUTER_CLASSIFIER_ENABLED', 'true').lower() == 'true'
+    INTENT_CLASSIFIER_PATH = os.getenv(
+        'INTENT_CLASSIFIER_PATH',
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    )
+    ROUTER_CLASSIFIER_INTENTS = [
+        intent.strip() for intent in os.getenv(
+            'ROUTER_CLASSIFIER_INTENTS',
+            'greeting_hello,greeting_hi,greeting_morning,greeting_evening,goodbye,thanks,emergency'
+        ).split(',') if intent.strip()
+    ]
+    # Fixed cut-off; empty uses the classifier's calibrated per-intent thresholds
+    ROUTER_MIN_CONFIDENCE = float(os.getenv('ROUTER_MIN_CONFIDENCE')) if os.getenv('ROUTER_MIN_CONFIDENCE') else None
+    # Ceiling on calibrated thresholds, so no intent is always handed to the LLM
+    ROUTER_MAX_THRESHOLD = float(os.getenv('ROUTER_MAX_THRESHOLD', '0.9'))
+    # For the router's LLM cost estimate (USD per 1K tokens)
+    LLM_COST_PER_1K_TOKENS = float(os.getenv('LLM_COST_PER_1K_TOKENS', '0'))
+    
     @classmethod
     def validate_api_key(cls):
         """Check if API key is set."""
@@ -0,0 +1,89 @@
+"""Appointment schedule configuration."""
+
+import os
+import json
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class ScheduleConfig:
+    """Appointment slot templates per specialist."""
+
+    # Slots offered by any specialist without a template of their own
+    DEFAULT_SLOTS = [
+        '09:00:00', '10:00:00', '11:00:00',
+        '14:00:00', '15:00:00', '16:00:00'
+    ]
+
+    # Specialists shown in the availability calendar
+    SPECIALISTS = [
+        'General Practitioner', 'Allergist', 'Cardiologist', 'Dermatologist',
+        'Endocrinologist', 'Gastroenterologist', 'Neurologist', 'Orthopedist',
+        'Psychiatrist', 'Pulmonologist', 'Rheumatologist'
+    ]
+
+    # Optional JSON file overriding slots per specialist, e.g.
+    # {"Cardiologist": ["08:00", "08:30", "09:00"], "default": ["09:00", "10:00"]}
+    SLOT_TEMPLATES_FILE = os.getenv('SLOT_TEMPLATES_FILE', '')
+
+    # Seconds a cached availability entry stays valid
+    AVAILABILITY_CACHE_TTL = float(os.getenv('AVAILABILITY_CACHE_TTL', '60'))
+
+    # Longest date range served by a single availability query
+    MAX_AVAILABILITY_DAYS = int(os.getenv('MAX_AVAILABILITY_DAYS', '93'))
+
+    _templates = None
+
+    @staticmethod
+    def _normalize_time(value):
+        """Normalize 'HH:MM' or 'HH:MM:SS' to 'HH:MM:SS'."""
+        fmt = '%H:%M:%S' if value.count(':') == 2 else '%H:%M'
+        return datetime.strptime(value, fmt).strftime('%H:%M:%S')
+
+    @classmethod
+    def get_slot_templates(cls):
+        """
+        Get the slot template of every known specialist.
+
+        Returns:
+            Dictionary mapping specialist name to a sorted list of
+            'HH:MM:SS' slot strings
+        """
+        if cls._templates is None:
+            default = list(cls.DEFAULT_SLOTS)
+            overrides = {}
+
+            if cls.SLOT_TEMPLATES_FILE:
+                with open(cls.SLOT_TEMPLATES_FILE, 'r', encoding='utf-8') as f:
+                    overrides = json.load(f)
+                if 'default' in overrides:
+                    default = overrides.pop('default')
+
+            templates = {specialist: default for specialist in cls.SPECIALISTS}
+            templates.update(overrides)
+            cls._templates = {
+                specialist: sorted({cls._normalize_time(slot) for slot in slots})
+                for specialist, slots in templates.items()
+            }
+        return cls._templates
+
+    @classmethod
+    def get_slots(cls, specialist):
+        """Get the slot template for one specialist."""
+        templates = cls.get_slot_templates()
+        if specialist in templates:
+            return templates[specialist]
+        return sorted({cls._normalize_time(slot) for slot in cls.DEFAULT_SLOTS})
+
+    @classmethod
+    def reload(cls):
+        """Forget loaded templates so the next call re-reads the file."""
+        cls._templates = None
+
+
+if __name__ == '__main__':
+    print("Schedule Configuration:")
+    for specialist, slots in ScheduleConfig.get_slot_templates().items():
+        print(f"  {specialist}: {', '.join(slot[:5] for slot in slots)}")
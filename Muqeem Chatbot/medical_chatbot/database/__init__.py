@@ -1,2 +1,3 @@
 from .db_manager import DatabaseManager
+from .async_db_manager import AsyncDatabaseManager
 from .init_db import initialize_database
@@ -0,0 +1,413 @@
+"""Asyncio database manager for serving many chat sessions from one process."""
+
+import asyncio
+import sys
+import os
+
+import asyncpg
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database_config import DatabaseConfig
+from config.schedule_config import ScheduleConfig
+from database.db_manager import (
+    DatabaseManager,
+    parse_date,
+    parse_time,
+    parse_slot_time,
+    date_range,
+    availability_query_params,
+    collect_availability,
+    build_availability_matrix,
+    build_booking_result,
+    build_booking_error,
+    format_appointments,
+    format_available_slots,
+)
+from database.queries import (
+    FIND_PATIENT_ID_SQL,
+    INSERT_PATIENT_SQL,
+    GET_PATIENT_BY_ID_SQL,
+    GET_PATIENT_BY_NAME_SQL,
+    BOOK_APPOINTMENT_SQL,
+    CANCEL_APPOINTMENT_SQL,
+    AVAILABILITY_SQL,
+    INSERT_CHAT_HISTORY_SQL,
+    asyncpg_args,
+    build_patient,
+    view_appointments_query,
+    chat_history_query,
+    chat_history_page_query,
+    chat_history_page_key,
+)
+
+
+class AsyncDatabaseManager:
+    """
+    Async counterpart of DatabaseManager built on asyncpg.
+
+    Exposes the same operations with the same return values, but every
+    method is a coroutine and queries run on a dedicated asyncpg pool, so
+    one event loop can serve many concurrent chat sessions. The SQL comes
+    from database.queries, shared with DatabaseManager.
+
+    Usage:
+        async with AsyncDatabaseManager() as db:
+            print(await db.view_appointments())
+    """
+
+    def __init__(self, min_size=None, max_size=None, timeout=None):
+        """
+        Initialize the manager (the pool is created by connect()).
+
+        Args:
+            min_size: Minimum pooled connections (default: DatabaseConfig)
+            max_size: Maximum pooled connections (default: pool size + overflow)
+            timeout: Seconds to wait for a free connection (default: DatabaseConfig)
+        """
+        self.min_size = DatabaseConfig.POOL_MIN_SIZE if min_size is None else min_size
+        self.max_size = (
+            DatabaseConfig.POOL_MAX_SIZE + DatabaseConfig.POOL_MAX_OVERFLOW
+            if max_size is None else max_size
+        )
+        self.timeout = DatabaseConfig.POOL_TIMEOUT if timeout is None else timeout
+        self.pool = None
+        self._connect_lock = asyncio.Lock()
+        # Shared with DatabaseManager so either side's bookings invalidate it
+        self.availability_cache = DatabaseManager.availability_cache
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # ============ CONNECTION MANAGEMENT ============
+
+    async def connect(self):
+        """Create the connection pool if it does not exist yet."""
+        async with self._connect_lock:
+            if self.pool is None:
+                config = DatabaseConfig.get_config_dict()
+                self.pool = await asyncpg.create_pool(
+                    database=config['dbname'],
+                    user=config['user'],
+                    password=config['password'],
+                    host=config['host'],
+                    port=int(config['port']),
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                )
+        return self.pool
+
+    async def close(self):
+        """Close the connection pool."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def _acquire(self):
+        """Acquire a pooled connection, creating the pool on first use."""
+        pool = self.pool or await self.connect()
+        return pool.acquire(timeout=self.timeout)
+
+    def get_pool_stats(self):
+        """Get basic pool usage figures."""
+        if self.pool is None:
+            return {'open': 0, 'idle': 0, 'in_use': 0, 'max_size': self.max_size}
+        open_count = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        return {
+            'open': open_count,
+            'idle': idle,
+            'in_use': open_count - idle,
+            'max_size': self.max_size,
+        }
+
+    # ============ PATIENT OPERATIONS ============
+
+    @staticmethod
+    async def _get_or_create_patient(conn, full_name, phone=None, email=None, date_of_birth=None):
+        """Return the patient ID for a name, inserting the patient if needed."""
+        patient_id = await conn.fetchval(
+            *asyncpg_args(FIND_PATIENT_ID_SQL, {'full_name': full_name})
+        )
+        if patient_id is not None:
+            return patient_id
+
+        return await conn.fetchval(*asyncpg_args(INSERT_PATIENT_SQL, {
+            'full_name': full_name,
+            'phone': phone,
+            'email': email,
+            'date_of_birth': parse_date(date_of_birth),
+        }))
+
+    async def add_patient(self, full_name, phone=None, email=None, date_of_birth=None):
+        """
+        Add a new patient or return existing patient ID.
+
+        Returns:
+            patient_id or None if error
+        """
+        try:
+            async with await self._acquire() as conn:
+                async with conn.transaction():
+                    return await self._get_or_create_patient(
+                        conn, full_name, phone, email, date_of_birth
+                    )
+        except Exception as e:
+            print(f"Error adding patient: {e}")
+            return None
+
+    async def get_patient(self, patient_id=None, full_name=None):
+        """
+        Get patient information.
+
+        Returns:
+            Dictionary with patient_id, full_name, phone, email,
+            date_of_birth and date_registered, or None if not found
+        """
+        if not patient_id and not full_name:
+            return None
+
+        try:
+            async with await self._acquire() as conn:
+                if patient_id:
+                    row = await conn.fetchrow(
+                        *asyncpg_args(GET_PATIENT_BY_ID_SQL, {'patient_id': patient_id})
+                    )
+                else:
+                    row = await conn.fetchrow(
+                        *asyncpg_args(GET_PATIENT_BY_NAME_SQL, {'full_name': full_name})
+                    )
+            return build_patient(row)
+
+        except Exception as e:
+            print(f"Error getting patient: {e}")
+            return None
+
+    # ============ APPOINTMENT OPERATIONS ============
+
+    async def reserve_appointment(self, patient_name, appointment_date, appointment_time,
+                                  reason, specialist="General Practitioner", notes=None):
+        """
+        Book a new appointment in one round trip and one transaction.
+
+        Returns:
+            Dictionary with 'status' ('booked', 'unavailable' or 'error'),
+            'appointment_id', 'patient_id' and a user-facing 'message'
+        """
+        try:
+            appointment_date = parse_date(appointment_date)
+            appointment_time = parse_time(appointment_time)
+
+            async with await self._acquire() as conn:
+                patient_id, appointment_id = await conn.fetchrow(*asyncpg_args(BOOK_APPOINTMENT_SQL, {
+                    'patient_name': patient_name,
+                    'appointment_date': appointment_date,
+                    'appointment_time': appointment_time,
+                    'reason': reason,
+                    'specialist': specialist,
+                    'notes': notes,
+                }))
+
+            if appointment_id:
+                self.availability_cache.invalidate(appointment_date, specialist)
+
+            return build_booking_result(
+                patient_id, appointment_id, patient_name, specialist,
+                appointment_date, appointment_time, reason
+            )
+
+        except Exception as e:
+            return build_booking_error(e)
+
+    async def book_appointment(self, patient_name, appointment_date, appointment_time,
+                               reason, specialist="General Practitioner", notes=None):
+        """
+        Book a new appointment.
+
+        Returns:
+            Success message or error message
+        """
+        result = await self.reserve_appointment(
+            patient_name, appointment_date, appointment_time,
+            reason, specialist, notes
+        )
+        return result['message']
+
+    async def view_appointments(self, patient_name=None, specialist=None, status='scheduled'):
+        """
+        View appointments with optional filters.
+
+        Returns:
+            Formatted string of appointments
+        """
+        try:
+            query, params = view_appointments_query(patient_name, specialist, status)
+
+            async with await self._acquire() as conn:
+                appointments = await conn.fetch(*asyncpg_args(query, params))
+
+            return format_appointments(appointments)
+
+        except Exception as e:
+            return f"Error viewing appointments: {e}"
+
+    async def cancel_appointment(self, appointment_id):
+        """Cancel an appointment."""
+        try:
+            async with await self._acquire() as conn:
+                result = await conn.fetchrow(
+                    *asyncpg_args(CANCEL_APPOINTMENT_SQL, {'appointment_id': appointment_id})
+                )
+
+            if result:
+                self.availability_cache.invalidate(result[1], result[2])
+                return f"✅ Appointment {appointment_id} has been cancelled."
+            else:
+                return f"❌ Appointment {appointment_id} not found."
+
+        except Exception as e:
+            return f"Error cancelling appointment: {e}"
+
+    async def get_availability(self, start_date, end_date=None, specialists=None):
+        """
+        Get free slots for a range of dates and specialists in one query.
+
+        Returns:
+            Dictionary {date: {specialist: ['HH:MM:SS', ...]}}, or an empty
+            dictionary on error
+        """
+        try:
+            start_date = parse_date(start_date)
+            end_date = parse_date(end_date) if end_date else start_date
+            days = date_range(start_date, end_date)
+            if not specialists:
+                specialists = list(ScheduleConfig.get_slot_templates())
+
+            cache = self.availability_cache
+            cells, missing = cache.get_many(
+                [(day, specialist) for day in days for specialist in specialists]
+            )
+
+            if missing:
+                version = cache.version
+                (span_start, span_end, queried,
+                 template_specialists, template_slots) = availability_query_params(missing)
+
+                async with await self._acquire() as conn:
+                    rows = await conn.fetch(*asyncpg_args(AVAILABILITY_SQL, {
+                        'specialists': template_specialists,
+                        'slots': [parse_slot_time(slot) for slot in template_slots],
+                        'start_date': span_start,
+                        'end_date': span_end,
+                    }))
+
+                fetched = collect_availability(rows, span_start, span_end, queried)
+                cache.set_many(fetched, version)
+                cells.update(fetched)
+
+            return build_availability_matrix(days, specialists, cells)
+
+        except Exception as e:
+            print(f"Error getting availability: {e}")
+            return {}
+
+    async def get_available_slots(self, appointment_date, specialist="General Practitioner"):
+        """
+        Get available time slots for a given date and specialist.
+
+        Returns:
+            Formatted list of available time slots
+        """
+        try:
+            appointment_date = parse_date(appointment_date)
+            availability = await self.get_availability(
+                appointment_date, appointment_date, [specialist]
+            )
+            if not availability:
+                return "Error checking available slots: availability query failed"
+
+            available_slots = availability[appointment_date][specialist]
+            return format_available_slots(appointment_date, specialist, available_slots)
+
+        except Exception as e:
+            return f"Error checking available slots: {e}"
+
+    # ============ CHAT HISTORY OPERATIONS ============
+
+    async def save_chat_history(self, patient_name, user_message, bot_response, session_id=None):
+        """Save chat conversation to database."""
+        try:
+            async with await self._acquire() as conn:
+                async with conn.transaction():
+                    patient_id = await self._get_or_create_patient(conn, patient_name)
+                    await conn.execute(*asyncpg_args(INSERT_CHAT_HISTORY_SQL, {
+                        'patient_id': patient_id,
+                        'user_message': user_message,
+                        'bot_response': bot_response,
+                        'session_id': session_id,
+                    }))
+        except Exception as e:
+            print(f"Error saving chat history: {e}")
+
+    async def get_chat_history(self, patient_name=None, limit=50):
+        """Retrieve chat history as (user_message, bot_response, timestamp) tuples."""
+        try:
+            query, params = chat_history_query(patient_name, limit)
+            async with await self._acquire() as conn:
+                rows = await conn.fetch(*asyncpg_args(query, params))
+            return [tuple(row) for row in rows]
+
+        except Exception as e:
+            print(f"Error getting chat history: {e}")
+            return []
+
+    async def iter_chat_history_chunks(self, patient_id=None, session_id=None, chunk_size=1000,
+                                       after=None, newest_first=True):
+        """
+        Stream chat history in chunks using keyset pagination.
+
+        Same pages as DatabaseManager.iter_chat_history_chunks, each on its
+        own pooled connection; database errors are raised, not printed.
+
+        Yields:
+            Lists of (chat_id, patient_id, session_id, user_message,
+            bot_response, timestamp) tuples
+        """
+        position = tuple(after) if after else None
+
+        while True:
+            query, params = chat_history_page_query(patient_id, session_id, position,
+                                                    chunk_size, newest_first)
+            async with await self._acquire() as conn:
+                rows = [tuple(row) for row in await conn.fetch(*asyncpg_args(query, params))]
+
+            if not rows:
+                return
+
+            yield rows
+
+            if len(rows) < chunk_size:
+                return
+            position = chat_history_page_key(rows[-1])
+
+
+# Test functions
+if __name__ == '__main__':
+    async def _demo():
+        async with AsyncDatabaseManager() as db:
+            # Many sessions can share the same pool concurrently
+            results = await asyncio.gather(
+                db.get_available_slots("2024-12-25"),
+                db.view_appointments(),
+                db.get_chat_history(limit=5),
+            )
+            for result in results:
+                print(result)
+            print(db.get_pool_stats())
+
+    print("Testing Async Database Manager...")
+    asyncio.run(_demo())
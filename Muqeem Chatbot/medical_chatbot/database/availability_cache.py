@@ -0,0 +1,97 @@
+"""In-process cache of free appointment slots."""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class AvailabilityCache:
+    """
+    Thread-safe TTL + LRU cache of free slots keyed by (date, specialist).
+
+    Every invalidation bumps a version number. Readers note the version
+    before querying the database and pass it to set_many(); results from a
+    query that raced with a booking or cancellation are then dropped
+    instead of being cached stale.
+    """
+
+    def __init__(self, ttl=60.0, max_entries=20000):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry stays valid
+            max_entries: Entries kept before the least recently used is evicted
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # (date, specialist) -> (expires_at, slots)
+        self._lock = threading.Lock()
+        self.version = 0
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'stale_writes': 0}
+
+    def get_many(self, keys):
+        """
+        Look up several (date, specialist) keys at once.
+
+        Returns:
+            Tuple of (dict of cached key -> slots, list of missing keys)
+        """
+        now = time.monotonic()
+        found = {}
+        missing = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+                else:
+                    if entry is not None:
+                        del self._entries[key]
+                    missing.append(key)
+            self._stats['hits'] += len(found)
+            self._stats['misses'] += len(missing)
+
+        return found, missing
+
+    def set_many(self, values, version):
+        """
+        Store query results if nothing was invalidated since ``version``.
+
+        Args:
+            values: Dict of (date, specialist) -> list of free slots
+            version: Value of ``self.version`` read before the query ran
+        """
+        expires_at = time.monotonic() + self.ttl
+
+        with self._lock:
+            if version != self.version:
+                self._stats['stale_writes'] += 1
+                return
+
+            for key, slots in values.items():
+                self._entries[key] = (expires_at, tuple(slots))
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, appointment_date, specialist):
+        """Drop the entry for one day and specialist after a booking change."""
+        with self._lock:
+            self.version += 1
+            self._entries.pop((appointment_date, specialist), None)
+            self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            return {'entries': len(self._entries), **self._stats}
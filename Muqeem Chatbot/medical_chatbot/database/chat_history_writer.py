@@ -0,0 +1,309 @@
+"""Write-behind queue that persists chat history in batches."""
+
+import queue
+import threading
+import time
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+
+_STOP = object()
+
+
+class _FlushRequest:
+    """Queue marker asking the writer to flush everything before it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class ChatHistoryWriter:
+    """
+    Buffers chat turns and writes them to chat_history in the background.
+
+    Turns are flushed as one multi-row INSERT when ``batch_size`` turns are
+    waiting or ``flush_interval`` seconds after the first one arrived,
+    whichever comes first. The queue is bounded: when it is full,
+    enqueue() blocks for up to ``enqueue_timeout`` seconds and then drops
+    the turn, so a database outage cannot exhaust memory. A batch whose
+    INSERT fails is retried ``write_retries`` times before its turns are
+    counted as dropped.
+    """
+
+    def __init__(self, connection_factory, batch_size=100, flush_interval=1.0,
+                 max_queue_size=10000, enqueue_timeout=0.5, write_retries=2,
+                 retry_backoff=0.5):
+        """
+        Initialize the writer and start its background thread.
+
+        Args:
+            connection_factory: Callable returning a connection context
+                manager (e.g. DatabaseManager.connection)
+            batch_size: Turns written per INSERT
+            flush_interval: Max seconds a turn waits before being written
+            max_queue_size: Turns buffered before producers are slowed down
+            enqueue_timeout: Seconds a producer waits on a full queue
+            write_retries: Extra attempts for a batch whose INSERT failed
+            retry_backoff: Seconds before the first retry (doubled each time)
+        """
+        self._connection = connection_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.write_retries = write_retries
+        self.retry_backoff = retry_backoff
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        # Guards _closed and _producers; close() waits on it until no
+        # enqueue() is part-way through a put, so nothing lands after _STOP
+        self._state = threading.Condition()
+        self._closed = False
+        self._producers = 0
+
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'retries': 0,
+            'flushes': 0,
+            'max_queue_depth': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+        }
+
+        self._thread = threading.Thread(
+            target=self._run, name='chat-history-writer', daemon=True
+        )
+        self._thread.start()
+
+    # ============ PRODUCER API ============
+
+    def enqueue(self, patient_name, user_message, bot_response, session_id=None):
+        """
+        Buffer one chat turn for writing.
+
+        Returns:
+            True if the turn was queued, False if it was dropped
+        """
+        with self._state:
+            if self._closed:
+                return False
+            self._producers += 1
+
+        item = (patient_name, user_message, bot_response, session_id, datetime.now())
+        try:
+            self._queue.put(item, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+            print("Error saving chat history: write queue is full, message dropped")
+            return False
+        finally:
+            with self._state:
+                self._producers -= 1
+                if not self._producers:
+                    self._state.notify_all()
+
+        with self._lock:
+            self._stats['enqueued'] += 1
+            self._stats['max_queue_depth'] = max(
+                self._stats['max_queue_depth'], self._queue.qsize()
+            )
+        return True
+
+    def flush(self, timeout=None):
+        """
+        Write every turn queued so far and wait for it to finish.
+
+        Args:
+            timeout: Seconds to wait in total, including for room in a
+                full queue (None waits indefinitely)
+
+        Returns:
+            True if the flush completed within the timeout
+        """
+        if self._closed:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        request = _FlushRequest()
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            return False
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        return request.done.wait(remaining)
+
+    def close(self, timeout=10.0):
+        """
+        Flush remaining turns and stop the background thread.
+
+        Args:
+            timeout: Seconds to wait in total for producers, queue space
+                and the final flush
+
+        Returns:
+            True if the writer stopped within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._state:
+            if self._closed:
+                return True
+            self._closed = True
+            # let enqueue() calls already past the check finish their put
+            self._state.wait_for(lambda: not self._producers, timeout)
+        try:
+            self._queue.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Full:
+            print(f"Error saving chat history: writer did not stop, "
+                  f"{self._queue.qsize()} turns still queued")
+            return False
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        return not self._thread.is_alive()
+
+    def stats(self):
+        """
+        Get queue and flush counters.
+
+        Returns:
+            Dictionary with queue depth, written/dropped/failed turns and
+            flush latency figures
+        """
+        with self._lock:
+            flushes = self._stats['flushes']
+            return {
+                'queue_depth': self._queue.qsize(),
+                'avg_flush_ms': self._stats['total_flush_ms'] / flushes if flushes else 0.0,
+                **self._stats,
+            }
+
+    # ============ BACKGROUND THREAD ============
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            markers = []
+            stop = False
+
+            if item is _STOP:
+                stop = True
+            elif isinstance(item, _FlushRequest):
+                markers.append(item)
+            else:
+                batch.append(item)
+                # Gather more turns until the batch is full or the first one is due
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    if isinstance(item, _FlushRequest):
+                        markers.append(item)
+                        break
+                    batch.append(item)
+
+            if stop:
+                # Drain whatever is still queued before exiting
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, _FlushRequest):
+                        markers.append(item)
+                    elif item is not _STOP:
+                        batch.append(item)
+
+            for start in range(0, len(batch), self.batch_size):
+                self._write(batch[start:start + self.batch_size])
+            for marker in markers:
+                marker.done.set()
+            if stop:
+                return
+
+    def _write(self, batch):
+        """
+        Write one batch, retrying failed INSERTs with exponential backoff.
+
+        Turns of a batch that still fails are counted as failed and dropped.
+        """
+        for attempt in range(self.write_retries + 1):
+            if attempt:
+                with self._lock:
+                    self._stats['retries'] += 1
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                self._insert(batch)
+                return
+            except Exception as e:
+                print(f"Error saving chat history (attempt {attempt + 1}): {e}")
+
+        print(f"Error saving chat history: {len(batch)} turns dropped after "
+              f"{self.write_retries + 1} attempts")
+        with self._lock:
+            self._stats['failed'] += len(batch)
+            self._stats['dropped'] += len(batch)
+
+    def _insert(self, batch):
+        """Write one batch with a multi-row INSERT (raises on error)."""
+        started = time.perf_counter()
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                patient_ids = self._resolve_patients(cursor, batch)
+                execute_values(
+                    cursor,
+                    """INSERT INTO chat_history
+                       (patient_id, user_message, bot_response, session_id, timestamp)
+                       VALUES %s""",
+                    [
+                        (patient_ids.get(name), user_message, bot_response, session_id, ts)
+                        for name, user_message, bot_response, session_id, ts in batch
+                    ],
+                    page_size=len(batch)
+                )
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats['written'] += len(batch)
+            self._stats['flushes'] += 1
+            self._stats['last_flush_ms'] = elapsed_ms
+            self._stats['max_flush_ms'] = max(self._stats['max_flush_ms'], elapsed_ms)
+            self._stats['total_flush_ms'] += elapsed_ms
+
+    @staticmethod
+    def _resolve_patients(cursor, batch):
+        """Map every patient name in the batch to an ID, creating missing patients."""
+        names = sorted({item[0] for item in batch if item[0]})
+        if not names:
+            return {}
+
+        cursor.execute(
+            """SELECT DISTINCT ON (full_name) full_name, patient_id
+               FROM patients
+               WHERE full_name = ANY(%s)
+               ORDER BY full_name, patient_id""",
+            (names,)
+        )
+        patient_ids = dict(cursor.fetchall())
+
+        new_names = [name for name in names if name not in patient_ids]
+        if new_names:
+            created = execute_values(
+                cursor,
+                "INSERT INTO patients (full_name) VALUES %s RETURNING full_name, patient_id",
+                [(name,) for name in new_names],
+                fetch=True
+            )
+            patient_ids.update(created)
+
+        return patient_ids
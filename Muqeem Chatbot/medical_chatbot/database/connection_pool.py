@@ -0,0 +1,278 @@
+"""Thread-safe PostgreSQL connection pool with health checks and metrics."""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class ConnectionPool:
+    """
+    Keeps a set of open PostgreSQL connections for reuse across operations.
+
+    Up to ``max_size`` connections are kept open; when they are all in use,
+    up to ``max_overflow`` extra connections may be opened and are closed
+    again as soon as they are returned. Beyond that, callers wait up to
+    ``timeout`` seconds for a connection to be returned.
+    """
+
+    def __init__(self, connect_kwargs, min_size=1, max_size=10, max_overflow=5,
+                 timeout=5.0, health_check_interval=30.0, connect=None):
+        """
+        Initialize the pool.
+
+        Args:
+            connect_kwargs: Keyword arguments passed to psycopg2.connect
+            min_size: Connections opened eagerly when the pool is created
+            max_size: Connections kept open in the pool
+            max_overflow: Extra temporary connections allowed under load
+            timeout: Default seconds to wait for a free connection
+            health_check_interval: Idle seconds after which a connection is
+                pinged before being handed out
+            connect: Connection factory (defaults to psycopg2.connect)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size > max_size:
+            raise ValueError("min_size cannot be larger than max_size")
+
+        self.connect_kwargs = dict(connect_kwargs)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._connect = connect or psycopg2.connect
+
+        self._lock = threading.Condition()
+        self._idle = deque()        # (connection, last_used) pairs, most recent last
+        self._in_use = set()
+        self._opened = 0            # idle + in use + being opened
+        self._waiting = 0
+        self._closed = False
+
+        self._metrics = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'connections_created': 0,
+            'connections_discarded': 0,
+            'health_check_failures': 0,
+            'peak_in_use': 0,
+            'peak_overflow': 0,
+        }
+
+        for _ in range(min_size):
+            conn = self._open_connection()
+            with self._lock:
+                self._opened += 1
+                self._idle.append((conn, time.monotonic()))
+
+    # ============ CHECKOUT / RETURN ============
+
+    def getconn(self, timeout=None):
+        """
+        Check out a connection from the pool.
+
+        Args:
+            timeout: Seconds to wait for a free connection (defaults to the
+                pool timeout)
+
+        Returns:
+            An open psycopg2 connection
+
+        Raises:
+            PoolTimeoutError: If no connection became free in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            conn = None
+            last_used = None
+            must_open = False
+
+            with self._lock:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+
+                while not self._idle and self._opened >= self.max_size + self.max_overflow:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {timeout:.1f}s "
+                            f"({len(self._in_use)} in use)"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._lock.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                    if self._closed:
+                        raise PoolError("connection pool is closed")
+
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                else:
+                    # Reserve the slot now, open the connection outside the lock
+                    self._opened += 1
+                    must_open = True
+
+            if must_open:
+                try:
+                    conn = self._open_connection()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                        self._lock.notify()
+                    raise
+            elif not self._is_healthy(conn, last_used):
+                self._discard(conn)
+                continue
+
+            waited = time.monotonic() - started
+            with self._lock:
+                self._in_use.add(conn)
+                self._metrics['checkouts'] += 1
+                self._metrics['total_wait_time'] += waited
+                self._metrics['max_wait_time'] = max(self._metrics['max_wait_time'], waited)
+                self._metrics['peak_in_use'] = max(self._metrics['peak_in_use'], len(self._in_use))
+                self._metrics['peak_overflow'] = max(
+                    self._metrics['peak_overflow'], self._opened - self.max_size
+                )
+            return conn
+
+    def putconn(self, conn, discard=False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            conn: Connection previously obtained from getconn()
+            discard: Close the connection instead of keeping it
+        """
+        with self._lock:
+            self._in_use.discard(conn)
+            # Overflow connections are closed unless someone is waiting for one
+            overflow = self._opened > self.max_size and not self._waiting
+
+        if not discard and not conn.closed:
+            try:
+                # Never hand out a connection with an open transaction
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard or overflow or conn.closed or self._closed:
+            self._discard(conn)
+            return
+
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Check out a connection for the duration of a ``with`` block.
+
+        The transaction is committed when the block exits normally and
+        rolled back if it raises.
+        """
+        conn = self.getconn(timeout)
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard or conn.closed)
+
+    # ============ MAINTENANCE ============
+
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._lock:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._lock.notify_all()
+
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """
+        Get pool-level metrics.
+
+        Returns:
+            Dictionary with current usage and cumulative counters
+        """
+        with self._lock:
+            checkouts = self._metrics['checkouts']
+            return {
+                'max_size': self.max_size,
+                'max_overflow': self.max_overflow,
+                'open': self._opened,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'overflow': max(0, self._opened - self.max_size),
+                'avg_wait_time': self._metrics['total_wait_time'] / checkouts if checkouts else 0.0,
+                **self._metrics,
+            }
+
+    # ============ INTERNALS ============
+
+    def _open_connection(self):
+        conn = self._connect(**self.connect_kwargs)
+        with self._lock:
+            self._metrics['connections_created'] += 1
+        return conn
+
+    def _is_healthy(self, conn, last_used):
+        """Check that an idle connection is still usable."""
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            with self._lock:
+                self._metrics['health_check_failures'] += 1
+            return False
+
+    def _discard(self, conn):
+        """Close a connection and release its slot."""
+        try:
+            if not conn.closed:
+                conn.close()
+        except Exception:
+            pass
+
+        with self._lock:
+            self._opened -= 1
+            self._metrics['connections_discarded'] += 1
+            self._lock.notify()
@@ -2,25 +2,280 @@
 
 import psycopg2
 from psycopg2 import sql
-from datetime import datetime, date, time as dt_time
+from datetime import datetime, date, time as dt_time, timedelta
 import sys
 import os
+import atexit
+import threading
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.database_config import DatabaseConfig
+from config.schedule_config import ScheduleConfig
+from database.connection_pool import ConnectionPool
+from database.availability_cache import AvailabilityCache
+from database.chat_history_writer import ChatHistoryWriter
+from database.queries import (
+    FIND_PATIENT_ID_SQL,
+    INSERT_PATIENT_SQL,
+    GET_PATIENT_BY_ID_SQL,
+    GET_PATIENT_BY_NAME_SQL,
+    BOOK_APPOINTMENT_SQL,
+    CANCEL_APPOINTMENT_SQL,
+    AVAILABILITY_SQL,
+    build_patient,
+    view_appointments_query,
+    chat_history_query,
+    chat_history_page_query,
+    chat_history_page_key,
+)
+
+
+# ============ SHARED HELPERS ============
+# Used by both DatabaseManager and AsyncDatabaseManager so the two stay in step.
+
+def parse_date(value):
+    """Convert a YYYY-MM-DD string to a date (date objects pass through)."""
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    return value
+
+
+def parse_time(value):
+    """Convert an HH:MM:SS string to a time (time objects pass through)."""
+    if isinstance(value, str):
+        return datetime.strptime(value, '%H:%M:%S').time()
+    return value
+
+
+def parse_slot_time(value):
+    """Convert an 'HH:MM:SS' slot string to a time."""
+    return datetime.strptime(value, '%H:%M:%S').time()
+
+
+def format_booking_confirmation(appointment_id, patient_name, specialist,
+                                appointment_date, appointment_time, reason):
+    """Format the message shown after a successful booking."""
+    return f"""✅ APPOINTMENT CONFIRMED!
+
+Appointment ID: {appointment_id}
+Patient: {patient_name}
+Specialist: {specialist}
+Date: {appointment_date}
+Time: {appointment_time}
+Reason: {reason}
+
+📧 Please arrive 15 minutes early for check-in."""
+
+
+def build_booking_result(patient_id, appointment_id, patient_name, specialist,
+                         appointment_date, appointment_time, reason):
+    """
+    Build the structured result of a booking attempt.
+    
+    Returns:
+        Dictionary with 'status' ('booked' or 'unavailable'), the booking
+        details and a user-facing 'message'
+    """
+    result = {
+        'status': 'booked' if appointment_id else 'unavailable',
+        'appointment_id': appointment_id,
+        'patient_id': patient_id,
+        'patient_name': patient_name,
+        'specialist': specialist,
+        'appointment_date': appointment_date,
+        'appointment_time': appointment_time,
+        'reason': reason,
+    }
+    
+    if appointment_id:
+        result['message'] = format_booking_confirmation(
+            appointment_id, patient_name, specialist,
+            appointment_date, appointment_time, reason
+        )
+    else:
+        result['message'] = f"❌ Sorry, {specialist} is not available at {appointment_time} on {appointment_date}."
+    
+    return result
+
+
+def build_booking_error(error):
+    """Build the structured result of a booking attempt that failed."""
+    return {
+        'status': 'error',
+        'appointment_id': None,
+        'error': str(error),
+        'message': f"❌ Error booking appointment: {error}",
+    }
+
+
+def format_appointments(appointments):
+    """Format appointment rows (id, patient, date, time, specialist, reason, status)."""
+    if not appointments:
+        return "No appointments found."
+    
+    result = "\n📅 SCHEDULED APPOINTMENTS:\n" + "="*70 + "\n"
+    for apt in appointments:
+        result += f"""
+ID: {apt[0]}
+Patient: {apt[1]}
+Date: {apt[2]}
+Time: {apt[3]}
+Specialist: {apt[4]}
+Reason: {apt[5]}
+Status: {apt[6]}
+{'─'*70}
+"""
+    
+    return result
+
+
+def date_range(start_date, end_date):
+    """List every date from start_date to end_date inclusive."""
+    days = (end_date - start_date).days + 1
+    if days < 1:
+        raise ValueError("end_date must not be before start_date")
+    if days > ScheduleConfig.MAX_AVAILABILITY_DAYS:
+        raise ValueError(
+            f"Date range too long ({days} days, max {ScheduleConfig.MAX_AVAILABILITY_DAYS})"
+        )
+    return [start_date + timedelta(days=offset) for offset in range(days)]
+
+
+def availability_query_params(missing):
+    """
+    Build AVAILABILITY_SQL parameters covering a set of uncached cells.
+    
+    Args:
+        missing: List of (date, specialist) keys
+    
+    Returns:
+        Tuple of (start_date, end_date, specialists, template_specialists,
+        template_slots) where the last two are the parallel unnest arrays
+    """
+    days = [day for day, _ in missing]
+    specialists = sorted({specialist for _, specialist in missing})
+    template_specialists = []
+    template_slots = []
+    for specialist in specialists:
+        for slot in ScheduleConfig.get_slots(specialist):
+            template_specialists.append(specialist)
+            template_slots.append(slot)
+    return min(days), max(days), specialists, template_specialists, template_slots
+
+
+def collect_availability(rows, start_date, end_date, specialists):
+    """Group (day, specialist, slot_time) rows into (day, specialist) -> slots."""
+    cells = {
+        (day, specialist): []
+        for day in date_range(start_date, end_date)
+        for specialist in specialists
+    }
+    for day, specialist, slot_time in rows:
+        cells[(day, specialist)].append(str(slot_time))
+    return cells
+
+
+def build_availability_matrix(days, specialists, cells):
+    """Arrange cached cells as {date: {specialist: [slots]}}."""
+    return {
+        day: {specialist: list(cells[(day, specialist)]) for specialist in specialists}
+        for day in days
+    }
+
+
+def format_available_slots(appointment_date, specialist, available_slots):
+    """Format the free slots of one specialist on one day."""
+    if available_slots:
+        result = f"📅 Available slots for {specialist} on {appointment_date}:\n\n"
+        for slot in available_slots:
+            result += f"  ⏰ {slot[:5]}\n"
+        return result
+    else:
+        return f"No available slots for {specialist} on {appointment_date}."
 
 
 class DatabaseManager:
     """Handles all database operations."""
     
+    _pool = None
+    _pool_lock = threading.Lock()
+    _chat_writer = None
+    
+    # Free slots per (date, specialist), invalidated on book/cancel
+    availability_cache = AvailabilityCache(ttl=ScheduleConfig.AVAILABILITY_CACHE_TTL)
+    
+    # ============ CONNECTION MANAGEMENT ============
+    
+    @staticmethod
+    def get_pool():
+        """Get the shared connection pool, creating it on first use."""
+        if DatabaseManager._pool is None:
+            with DatabaseManager._pool_lock:
+                if DatabaseManager._pool is None:
+                    DatabaseManager._pool = ConnectionPool(
+                        DatabaseConfig.get_config_dict(),
+                        **DatabaseConfig.get_pool_config()
+                    )
+        return DatabaseManager._pool
+    
+    @staticmethod
+    def connection():
+        """
+        Check out a pooled connection for a ``with`` block.
+        
+        Commits when the block succeeds, rolls back if it raises, and
+        always returns the connection to the pool.
+        """
+        return DatabaseManager.get_pool().connection()
+    
     @staticmethod
     def get_connection():
-        """Get database connection."""
+        """Get a dedicated, unpooled database connection (caller closes it)."""
         return psycopg2.connect(**DatabaseConfig.get_config_dict())
     
+    @staticmethod
+    def get_pool_stats():
+        """Get connection pool metrics (wait time, in-use, overflow, ...)."""
+        return DatabaseManager.get_pool().stats()
+    
+    @staticmethod
+    def close_pool():
+        """Close all pooled connections."""
+        with DatabaseManager._pool_lock:
+            if DatabaseManager._pool is not None:
+                DatabaseManager._pool.closeall()
+                DatabaseManager._pool = None
+    
+    @staticmethod
+    def shutdown():
+        """Flush buffered chat history, then close the connection pool."""
+        with DatabaseManager._pool_lock:
+            writer = DatabaseManager._chat_writer
+            DatabaseManager._chat_writer = None
+        if writer is not None:
+            writer.close()
+        DatabaseManager.close_pool()
+    
     # ============ PATIENT OPERATIONS ============
     
+    @staticmethod
+    def _get_or_create_patient(cursor, full_name, phone=None, email=None, date_of_birth=None):
+        """Return the patient ID for a name, inserting the patient if needed."""
+        cursor.execute(FIND_PATIENT_ID_SQL, {'full_name': full_name})
+        result = cursor.fetchone()
+        
+        if result:
+            return result[0]
+        
+        cursor.execute(INSERT_PATIENT_SQL, {
+            'full_name': full_name,
+            'phone': phone,
+            'email': email,
+            'date_of_birth': parse_date(date_of_birth),
+        })
+        return cursor.fetchone()[0]
+    
     @staticmethod
     def add_patient(full_name, phone=None, email=None, date_of_birth=None):
         """
@@ -36,31 +291,11 @@ class DatabaseManager:
             patient_id or None if error
         """
         try:
-            conn = DatabaseManager.get_connection()
-            cursor = conn.cursor()
-            
-            # Check if patient exists by name
-            cursor.execute(
-                "SELECT patient_id FROM patients WHERE full_name = %s",
-                (full_name,)
-            )
-            result = cursor.fetchone()
-            
-            if result:
-                patient_id = result[0]
-            else:
-                # Insert new patient
-                cursor.execute(
-                    """INSERT INTO patients (full_name, phone, email, date_of_birth) 
-                       VALUES (%s, %s, %s, %s) RETURNING patient_id""",
-                    (full_name, phone, email, date_of_birth)
-                )
-                patient_id = cursor.fetchone()[0]
-                conn.commit()
-            
-            cursor.close()
-            conn.close()
-            return patient_id
+            with DatabaseManager.connection() as conn:
+                with conn.cursor() as cursor:
+                    return DatabaseManager._get_or_create_patient(
+                        cursor, full_name, phone, email, date_of_birth
+                    )
             
         except Exception as e:
             print(f"Error adding patient: {e}")
@@ -68,38 +303,24 @@ class DatabaseManager:
     
     @staticmethod
     def get_patient(patient_id=None, full_name=None):
-        """Get patient information."""
-        try:
-            conn = DatabaseManager.get_connection()
-            cursor = conn.cursor()
-            
-            if patient_id:
-                cursor.execute(
-                    "SELECT * FROM patients WHERE patient_id = %s",
-                    (patient_id,)
-                )
-            elif full_name:
-                cursor.execute(
-                    "SELECT * FROM patients WHERE full_name = %s",
-                    (full_name,)
-                )
-            else:
-                return None
-            
-            result = cursor.fetchone()
-            cursor.close()
-            conn.close()
-            
-            if result:
-                return {
-                    'patient_id': result[0],
-                    'full_name': result[1],
-                    'phone': result[2],
-                    'email': result[3],
-                    'date_of_birth': result[4],
-                    'date_registered': result[5]
-                }
+        """
+        Get patient information.
+        
+        Returns:
+            Dictionary with patient_id, full_name, phone, email,
+            date_of_birth and date_registered, or None if not found
+        """
+        if not patient_id and not full_name:
             return None
+        
+        try:
+            with DatabaseManager.connection() as conn:
+                with conn.cursor() as cursor:
+                    if patient_id:
+                        cursor.execute(GET_PATIENT_BY_ID_SQL, {'patient_id': patient_id})
+                    else:
+                        cursor.execute(GET_PATIENT_BY_NAME_SQL, {'full_name': full_name})
+                    return build_patient(cursor.fetchone())
             
         except Exception as e:
             print(f"Error getting patient: {e}")
@@ -108,78 +329,78 @@ class DatabaseManager:
     # ============ APPOINTMENT OPERATIONS ============
     
     @staticmethod
-    def book_appointment(patient_name, appointment_date, appointment_time, 
-                        reason, specialist="General Practitioner", notes=None):
+    def reserve_appointment(patient_name, appointment_date, appointment_time, 
+                            reason, specialist="General Practitioner", notes=None):
         """
-        Book a new appointment.
+        Book a new appointment in one round trip and one transaction.
+        
+        Concurrent bookings of the same slot are resolved by the
+        unique_active_appointment index: exactly one of them gets the slot
+        and the others come back as 'unavailable' instead of raising.
+        Earlier cancelled, completed or no-show appointments in the slot
+        are kept; the booking is a new row.
         
         Args:
             patient_name: Patient's full name
             appointment_date: Date (YYYY-MM-DD string or date object)
-            appointment_time: Time (HH:MM string or time object)
+            appointment_time: Time (HH:MM:SS string or time object)
             reason: Reason for visit
             specialist: Type of specialist
             notes: Additional notes (optional)
         
         Returns:
-            Success message or error message
+            Dictionary with 'status' ('booked', 'unavailable' or 'error'),
+            'appointment_id', 'patient_id' and a user-facing 'message'
         """
         try:
-            conn = DatabaseManager.get_connection()
-            cursor = conn.cursor()
-            
-            # Get or create patient
-            patient_id = DatabaseManager.add_patient(patient_name)
-            if not patient_id:
-                return "Error: Could not create patient record."
-            
             # Convert date/time if strings
-            if isinstance(appointment_date, str):
-                appointment_date = datetime.strptime(appointment_date, '%Y-%m-%d').date()
-            if isinstance(appointment_time, str):
-                appointment_time = datetime.strptime(appointment_time, '%H:%M:%S').time()
-            
-            # Check if slot is available
-            cursor.execute(
-                """SELECT appointment_id FROM appointments 
-                   WHERE appointment_date = %s 
-                   AND appointment_time = %s 
-                   AND specialist = %s
-                   AND status = 'scheduled'""",
-                (appointment_date, appointment_time, specialist)
-            )
-            
-            if cursor.fetchone():
-                cursor.close()
-                conn.close()
-                return f"❌ Sorry, {specialist} is not available at {appointment_time} on {appointment_date}."
-            
-            # Book appointment
-            cursor.execute(
-                """INSERT INTO appointments 
-                   (patient_id, appointment_date, appointment_time, reason, specialist, notes) 
-                   VALUES (%s, %s, %s, %s, %s, %s) RETURNING appointment_id""",
-                (patient_id, appointment_date, appointment_time, reason, specialist, notes)
+            appointment_date = parse_date(appointment_date)
+            appointment_time = parse_time(appointment_time)
+            
+            with DatabaseManager.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(BOOK_APPOINTMENT_SQL, {
+                        'patient_name': patient_name,
+                        'appointment_date': appointment_date,
+                        'appointment_time': appointment_time,
+                        'reason': reason,
+                        'specialist': specialist,
+                        'notes': notes,
+                    })
+                    patient_id, appointment_id = cursor.fetchone()
+            
+            if appointment_id:
+                DatabaseManager.availability_cache.invalidate(appointment_date, specialist)
+            
+            return build_booking_result(
+                patient_id, appointment_id, patient_name, specialist,
+                appointment_date, appointment_time, reason
             )
             
-            appointment_id = cursor.fetchone()[0]
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-            return f"""✅ APPOINTMENT CONFIRMED!
-
-Appointment ID: {appointment_id}
-Patient: {patient_name}
-Specialist: {specialist}
-Date: {appointment_date}
-Time: {appointment_time}
-Reason: {reason}
-
-📧 Please arrive 15 minutes early for check-in."""
-            
         except Exception as e:
-            return f"❌ Error booking appointment: {e}"
+            return build_booking_error(e)
+    
+    @staticmethod
+    def book_appointment(patient_name, appointment_date, appointment_time, 
+                        reason, specialist="General Practitioner", notes=None):
+        """
+        Book a new appointment.
+        
+        Args:
+            patient_name: Patient's full name
+            appointment_date: Date (YYYY-MM-DD string or date object)
+            appointment_time: Time (HH:MM:SS string or time object)
+            reason: Reason for visit
+            specialist: Type of specialist
+            notes: Additional notes (optional)
+        
+        Returns:
+            Success message or error message
+        """
+        return DatabaseManager.reserve_appointment(
+            patient_name, appointment_date, appointment_time,
+            reason, specialist, notes
+        )['message']
     
     @staticmethod
     def view_appointments(patient_name=None, specialist=None, status='scheduled'):
@@ -195,50 +416,14 @@ Reason: {reason}
             Formatted string of appointments
         """
         try:
-            conn = DatabaseManager.get_connection()
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT a.appointment_id, p.full_name, a.appointment_date, 
-                       a.appointment_time, a.specialist, a.reason, a.status
-                FROM appointments a
-                JOIN patients p ON a.patient_id = p.patient_id
-                WHERE a.status = %s
-            """
-            params = [status]
-            
-            if patient_name:
-                query += " AND p.full_name = %s"
-                params.append(patient_name)
-            
-            if specialist:
-                query += " AND a.specialist = %s"
-                params.append(specialist)
-            
-            query += " ORDER BY a.appointment_date, a.appointment_time"
+            query, params = view_appointments_query(patient_name, specialist, status)
             
-            cursor.execute(query, params)
-            appointments = cursor.fetchall()
-            cursor.close()
-            conn.close()
+            with DatabaseManager.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    appointments = cursor.fetchall()
             
-            if not appointments:
-                return "No appointments found."
-            
-            result = "\n📅 SCHEDULED APPOINTMENTS:\n" + "="*70 + "\n"
-            for apt in appointments:
-                result += f"""
-ID: {apt[0]}
-Patient: {apt[1]}
-Date: {apt[2]}
-Time: {apt[3]}
-Specialist: {apt[4]}
-Reason: {apt[5]}
-Status: {apt[6]}
-{'─'*70}
-"""
-            
-            return result
+            return format_appointments(appointments)
             
         except Exception as e:
             return f"Error viewing appointments: {e}"
@@ -247,23 +432,14 @@ Status: {apt[6]}
     def cancel_appointment(appointment_id):
         """Cancel an appointment."""
         try:
-            conn = DatabaseManager.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """UPDATE appointments 
-                   SET status = 'cancelled' 
-                   WHERE appointment_id = %s 
-                   RETURNING appointment_id""",
-                (appointment_id,)
-            )
-            
-            result = cursor.fetchone()
-            conn.commit()
-            cursor.close()
-            conn.close()
+            with DatabaseManager.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(CANCEL_APPOINTMENT_SQL, {'appointment_id': appointment_id})
+                    result = cursor.fetchone()
             
             if result:
+                DatabaseManager.availability_cache.invalidate(result[1], result[2])
+
                 return f"✅ Appointment {appointment_id} has been cancelled."
             else:
                 return f"❌ Appointment {appointment_id} not found."
@@ -271,6 +447,60 @@ Status: {apt[6]}
         except Exception as e:
             return f"Error cancelling appointment: {e}"
     
+    @staticmethod
+    def get_availability(start_date, end_date=None, specialists=None):
+        """
+        Get free slots for a range of dates and specialists in one query.
+        
+        Cells already in the availability cache are served from memory; all
+        other cells are fetched with a single SQL statement.
+        
+        Args:
+            start_date: First date (YYYY-MM-DD string or date object)
+            end_date: Last date, inclusive (defaults to start_date)
+            specialists: Specialists to include (defaults to all templates)
+        
+        Returns:
+            Dictionary {date: {specialist: ['HH:MM:SS', ...]}}, or an empty
+            dictionary on error
+        """
+        try:
+            start_date = parse_date(start_date)
+            end_date = parse_date(end_date) if end_date else start_date
+            days = date_range(start_date, end_date)
+            if not specialists:
+                specialists = list(ScheduleConfig.get_slot_templates())
+            
+            cache = DatabaseManager.availability_cache
+            cells, missing = cache.get_many(
+                [(day, specialist) for day in days for specialist in specialists]
+            )
+            
+            if missing:
+                version = cache.version
+                (span_start, span_end, queried,
+                 template_specialists, template_slots) = availability_query_params(missing)
+                
+                with DatabaseManager.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(AVAILABILITY_SQL, {
+                            'specialists': template_specialists,
+                            'slots': template_slots,
+                            'start_date': span_start,
+                            'end_date': span_end,
+                        })
+                        rows = cursor.fetchall()
+                
+                fetched = collect_availability(rows, span_start, span_end, queried)
+                cache.set_many(fetched, version)
+                cells.update(fetched)
+            
+            return build_availability_matrix(days, specialists, cells)
+            
+        except Exception as e:
+            print(f"Error getting availability: {e}")
+            return {}
+    
     @staticmethod
     def get_available_slots(appointment_date, specialist="General Practitioner"):
         """
@@ -284,104 +514,136 @@ Status: {apt[6]}
             List of available time slots
         """
         try:
-            conn = DatabaseManager.get_connection()
-            cursor = conn.cursor()
-            
-            # Convert date if string
-            if isinstance(appointment_date, str):
-                appointment_date = datetime.strptime(appointment_date, '%Y-%m-%d').date()
-            
-            # Get booked times
-            cursor.execute(
-                """SELECT appointment_time FROM appointments 
-                   WHERE appointment_date = %s 
-                   AND specialist = %s
-                   AND status = 'scheduled'""",
-                (appointment_date, specialist)
+            appointment_date = parse_date(appointment_date)
+            availability = DatabaseManager.get_availability(
+                appointment_date, appointment_date, [specialist]
             )
+            if not availability:
+                return "Error checking available slots: availability query failed"
             
-            booked_times = [str(row[0]) for row in cursor.fetchall()]
-            cursor.close()
-            conn.close()
-            
-            # Define all possible slots
-            all_slots = [
-                '09:00:00', '10:00:00', '11:00:00', 
-                '14:00:00', '15:00:00', '16:00:00'
-            ]
-            available_slots = [slot for slot in all_slots if slot not in booked_times]
-            
-            if available_slots:
-                result = f"📅 Available slots for {specialist} on {appointment_date}:\n\n"
-                for slot in available_slots:
-                    result += f"  ⏰ {slot[:5]}\n"
-                return result
-            else:
-                return f"No available slots for {specialist} on {appointment_date}."
+            available_slots = availability[appointment_date][specialist]
+            return format_available_slots(appointment_date, specialist, available_slots)
                 
         except Exception as e:
             return f"Error checking available slots: {e}"
     
     # ============ CHAT HISTORY OPERATIONS ============
     
+    @staticmethod
+    def get_chat_writer():
+        """Get the background chat history writer, starting it on first use."""
+        if DatabaseManager._chat_writer is None:
+            with DatabaseManager._pool_lock:
+                if DatabaseManager._chat_writer is None:
+                    DatabaseManager._chat_writer = ChatHistoryWriter(
+                        DatabaseManager.connection,
+                        **DatabaseConfig.get_chat_writer_config()
+                    )
+                    atexit.register(DatabaseManager.shutdown)
+        return DatabaseManager._chat_writer
+    
     @staticmethod
     def save_chat_history(patient_name, user_message, bot_response, session_id=None):
-        """Save chat conversation to database."""
-        try:
-            conn = DatabaseManager.get_connection()
-            cursor = conn.cursor()
-            
-            patient_id = DatabaseManager.add_patient(patient_name)
-            
-            cursor.execute(
-                """INSERT INTO chat_history 
-                   (patient_id, user_message, bot_response, session_id) 
-                   VALUES (%s, %s, %s, %s)""",
-                (patient_id, user_message, bot_response, session_id)
-            )
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-        except Exception as e:
-            print(f"Error saving chat history: {e}")
+        """
+        Save chat conversation to database.
+        
+        The turn is buffered and written in a batch by a background thread,
+        so this returns without waiting for the database. Use
+        flush_chat_history() when the rows must be visible immediately.
+        
+        Returns:
+            True if the turn was queued, False if it was dropped
+        """
+        return DatabaseManager.get_chat_writer().enqueue(
+            patient_name, user_message, bot_response, session_id
+        )
+    
+    @staticmethod
+    def flush_chat_history(timeout=None):
+        """Write all buffered chat history now and wait for it."""
+        if DatabaseManager._chat_writer is None:
+            return True
+        return DatabaseManager._chat_writer.flush(timeout)
+    
+    @staticmethod
+    def get_chat_writer_stats():
+        """Get queue depth and flush latency counters of the chat writer."""
+        return DatabaseManager.get_chat_writer().stats()
     
     @staticmethod
     def get_chat_history(patient_name=None, limit=50):
         """Retrieve chat history."""
         try:
-            conn = DatabaseManager.get_connection()
-            cursor = conn.cursor()
-            
-            if patient_name:
-                cursor.execute(
-                    """SELECT ch.user_message, ch.bot_response, ch.timestamp
-                       FROM chat_history ch
-                       JOIN patients p ON ch.patient_id = p.patient_id
-                       WHERE p.full_name = %s
-                       ORDER BY ch.timestamp DESC
-                       LIMIT %s""",
-                    (patient_name, limit)
-                )
-            else:
-                cursor.execute(
-                    """SELECT ch.user_message, ch.bot_response, ch.timestamp
-                       FROM chat_history ch
-                       ORDER BY ch.timestamp DESC
-                       LIMIT %s""",
-                    (limit,)
-                )
-            
-            history = cursor.fetchall()
-            cursor.close()
-            conn.close()
+            query, params = chat_history_query(patient_name, limit)
+            with DatabaseManager.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    history = cursor.fetchall()
             
             return history
             
         except Exception as e:
             print(f"Error getting chat history: {e}")
             return []
+    
+    @staticmethod
+    def iter_chat_history_chunks(patient_id=None, session_id=None, chunk_size=1000,
+                                 after=None, newest_first=True):
+        """
+        Stream chat history in chunks using keyset pagination.
+        
+        Each chunk is one indexed query continuing from the (timestamp,
+        chat_id) of the previous chunk's last row, on its own pooled
+        connection, so memory use and query cost stay flat no matter how
+        much history there is. Unlike the other methods, database errors
+        are raised rather than printed, so an export cannot silently stop
+        halfway.
+        
+        Args:
+            patient_id: Only rows of this patient (optional)
+            session_id: Only rows of this session (optional)
+            chunk_size: Rows per chunk
+            after: (timestamp, chat_id) to resume after (optional)
+            newest_first: Order by newest first (default) or oldest first
+        
+        Yields:
+            Lists of (chat_id, patient_id, session_id, user_message,
+            bot_response, timestamp) tuples
+        """
+        position = tuple(after) if after else None
+        
+        while True:
+            query, params = chat_history_page_query(patient_id, session_id, position,
+                                                    chunk_size, newest_first)
+            
+            with DatabaseManager.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    rows = cursor.fetchall()
+            
+            if not rows:
+                return
+            
+            yield rows
+            
+            if len(rows) < chunk_size:
+                return
+            position = chat_history_page_key(rows[-1])
+    
+    @staticmethod
+    def iter_chat_history(patient_id=None, session_id=None, chunk_size=1000,
+                          after=None, newest_first=True):
+        """
+        Stream chat history row by row (see iter_chat_history_chunks).
+        
+        Yields:
+            (chat_id, patient_id, session_id, user_message, bot_response,
+            timestamp) tuples
+        """
+        for chunk in DatabaseManager.iter_chat_history_chunks(
+            patient_id, session_id, chunk_size, after, newest_first
+        ):
+            yield from chunk
 
 
 # Test functions
@@ -406,4 +668,13 @@ if __name__ == '__main__':
     print(DatabaseManager.view_appointments())
     
     # Test available slots
-    print(DatabaseManager.get_available_slots("2024-12-25"))
\ No newline at end of file
+    print(DatabaseManager.get_available_slots("2024-12-25"))
+    
+    # Test bulk availability for a week
+    week = DatabaseManager.get_availability("2024-12-23", "2024-12-29")
+    for day, by_specialist in week.items():
+        free = sum(len(slots) for slots in by_specialist.values())
+        print(f"{day}: {free} free slots")
+    
+    # Pool metrics
+    print(DatabaseManager.get_pool_stats())
\ No newline at end of file
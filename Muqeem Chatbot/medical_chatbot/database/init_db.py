@@ -86,6 +86,74 @@ def create_tables():
         return False
 
 
+# Brings a database created by an older schema.sql up to date without
+# dropping data. Every statement is idempotent.
+UPGRADE_SQL = """
+    -- bookings keep old appointments as history instead of overwriting them
+    ALTER TABLE appointments DROP CONSTRAINT IF EXISTS unique_appointment;
+    CREATE UNIQUE INDEX IF NOT EXISTS unique_active_appointment
+        ON appointments(appointment_date, appointment_time, specialist)
+        WHERE status = 'scheduled';
+"""
+
+
+def upgrade_schema():
+    """Apply UPGRADE_SQL to an existing database (keeps all rows)."""
+    try:
+        conn = psycopg2.connect(**DatabaseConfig.get_config_dict())
+        cursor = conn.cursor()
+        cursor.execute(UPGRADE_SQL)
+        conn.commit()
+        
+        print("✅ Schema upgraded!")
+        
+        cursor.close()
+        conn.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error upgrading schema: {e}")
+        return False
+
+
+def seed_medical_conditions():
+    """Upsert the built-in condition catalogue into medical_conditions."""
+    from models.medical_conditions import MEDICAL_CONDITIONS
+    
+    try:
+        conn = psycopg2.connect(**DatabaseConfig.get_config_dict())
+        cursor = conn.cursor()
+        
+        for condition in MEDICAL_CONDITIONS:
+            cursor.execute(
+                """INSERT INTO medical_conditions
+                       (condition_name, specialist_type, urgency_level, description,
+                        common_symptoms, treatment, when_to_see_doctor)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s)
+                   ON CONFLICT (condition_name) DO UPDATE SET
+                       specialist_type = EXCLUDED.specialist_type,
+                       urgency_level = EXCLUDED.urgency_level,
+                       description = EXCLUDED.description,
+                       common_symptoms = EXCLUDED.common_symptoms,
+                       treatment = EXCLUDED.treatment,
+                       when_to_see_doctor = EXCLUDED.when_to_see_doctor""",
+                (condition['condition'], condition['specialist'], condition['urgency'],
+                 condition.get('description'), condition['symptoms'],
+                 condition.get('treatment'), condition.get('when_to_see_doctor'))
+            )
+        conn.commit()
+        
+        print(f"✅ Seeded {len(MEDICAL_CONDITIONS)} medical conditions!")
+        
+        cursor.close()
+        conn.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error seeding medical conditions: {e}")
+        return False
+
+
 def initialize_database():
     """Main initialization function."""
     print("="*60)
@@ -100,6 +168,10 @@ def initialize_database():
     if not create_tables():
         return False
     
+    print("\nStep 3: Seeding medical conditions...")
+    if not seed_medical_conditions():
+        return False
+    
     print("\n" + "="*60)
     print("✅ DATABASE INITIALIZED SUCCESSFULLY!")
     print("="*60)
@@ -107,4 +179,8 @@ def initialize_database():
 
 
 if __name__ == '__main__':
-    initialize_database()
\ No newline at end of file
+    # --upgrade migrates an existing database in place instead of recreating it
+    if '--upgrade' in sys.argv:
+        upgrade_schema()
+    else:
+        initialize_database()
\ No newline at end of file
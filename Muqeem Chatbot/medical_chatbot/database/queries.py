@@ -0,0 +1,248 @@
+"""SQL shared by DatabaseManager (psycopg2) and AsyncDatabaseManager (asyncpg)."""
+
+import re
+from functools import lru_cache
+
+
+# Every statement is written once, with psycopg2's named placeholders
+# (%(name)s). to_asyncpg() rewrites them as $1, $2, ... for asyncpg, so
+# the sync and async managers always run the same SQL.
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%%")
+
+
+@lru_cache(maxsize=None)
+def to_asyncpg(query):
+    """
+    Rewrite a psycopg2 query for asyncpg.
+
+    Args:
+        query: SQL with %(name)s placeholders
+
+    Returns:
+        Tuple of (SQL with $n placeholders, parameter names in $n order)
+    """
+    names = []
+
+    def replace(match):
+        if match.group() == '%%':
+            return '%'
+        name = match.group(1)
+        if name not in names:
+            names.append(name)
+        return f"${names.index(name) + 1}"
+
+    return _PLACEHOLDER.sub(replace, query), tuple(names)
+
+
+def asyncpg_args(query, params):
+    """Positional arguments for an asyncpg call: the query, then its parameters."""
+    text, names = to_asyncpg(query)
+    return (text, *(params[name] for name in names))
+
+
+# ============ PATIENTS ============
+
+PATIENT_COLUMNS = ('patient_id', 'full_name', 'phone', 'email', 'date_of_birth', 'date_registered')
+
+FIND_PATIENT_ID_SQL = "SELECT patient_id FROM patients WHERE full_name = %(full_name)s"
+
+INSERT_PATIENT_SQL = """
+    INSERT INTO patients (full_name, phone, email, date_of_birth)
+    VALUES (%(full_name)s, %(phone)s, %(email)s, %(date_of_birth)s)
+    RETURNING patient_id
+"""
+
+GET_PATIENT_BY_ID_SQL = f"""
+    SELECT {', '.join(PATIENT_COLUMNS)} FROM patients WHERE patient_id = %(patient_id)s
+"""
+
+GET_PATIENT_BY_NAME_SQL = f"""
+    SELECT {', '.join(PATIENT_COLUMNS)} FROM patients WHERE full_name = %(full_name)s
+"""
+
+
+def build_patient(row):
+    """Patient dictionary from a row of PATIENT_COLUMNS (None passes through)."""
+    if row is None:
+        return None
+    return dict(zip(PATIENT_COLUMNS, tuple(row)))
+
+
+# ============ APPOINTMENTS ============
+
+# Books a slot in a single round trip: reuses or creates the patient, then
+# inserts a new appointment row. Only one 'scheduled' appointment may hold
+# a slot (unique_active_appointment is a partial unique index), so a taken
+# slot inserts nothing and no appointment_id comes back; cancelled,
+# completed and no-show rows for the slot are left alone as history.
+BOOK_APPOINTMENT_SQL = """
+    WITH existing AS (
+        SELECT patient_id FROM patients
+        WHERE full_name = %(patient_name)s
+        ORDER BY patient_id
+        LIMIT 1
+    ), new_patient AS (
+        INSERT INTO patients (full_name)
+        SELECT %(patient_name)s
+        WHERE NOT EXISTS (SELECT 1 FROM existing)
+        RETURNING patient_id
+    ), patient AS (
+        SELECT patient_id FROM existing
+        UNION ALL
+        SELECT patient_id FROM new_patient
+    ), booked AS (
+        INSERT INTO appointments
+            (patient_id, appointment_date, appointment_time, reason, specialist, notes)
+        SELECT patient_id, %(appointment_date)s::date, %(appointment_time)s::time,
+               %(reason)s::text, %(specialist)s::text, %(notes)s::text
+        FROM patient
+        ON CONFLICT (appointment_date, appointment_time, specialist)
+            WHERE status = 'scheduled'
+            DO NOTHING
+        RETURNING appointment_id
+    )
+    SELECT (SELECT patient_id FROM patient), (SELECT appointment_id FROM booked)
+"""
+
+CANCEL_APPOINTMENT_SQL = """
+    UPDATE appointments
+    SET status = 'cancelled'
+    WHERE appointment_id = %(appointment_id)s
+    RETURNING appointment_id, appointment_date, specialist
+"""
+
+
+def view_appointments_query(patient_name=None, specialist=None, status='scheduled'):
+    """
+    Build the appointment listing query for the given filters.
+
+    Returns:
+        Tuple of (SQL, parameters) yielding (id, patient, date, time,
+        specialist, reason, status) rows
+    """
+    query = """
+        SELECT a.appointment_id, p.full_name, a.appointment_date,
+               a.appointment_time, a.specialist, a.reason, a.status
+        FROM appointments a
+        JOIN patients p ON a.patient_id = p.patient_id
+        WHERE a.status = %(status)s
+    """
+    params = {'status': status}
+
+    if patient_name:
+        query += " AND p.full_name = %(patient_name)s"
+        params['patient_name'] = patient_name
+
+    if specialist:
+        query += " AND a.specialist = %(specialist)s"
+        params['specialist'] = specialist
+
+    query += " ORDER BY a.appointment_date, a.appointment_time"
+    return query, params
+
+
+# Free slots for every day in a range and every (specialist, slot) pair of
+# the templates passed as two parallel arrays, in a single statement.
+AVAILABILITY_SQL = """
+    WITH template AS (
+        SELECT * FROM unnest(%(specialists)s::text[], %(slots)s::time[])
+            AS t(specialist, slot_time)
+    ), days AS (
+        SELECT day::date AS day
+        FROM generate_series(%(start_date)s::date, %(end_date)s::date, interval '1 day') AS day
+    )
+    SELECT d.day, t.specialist, t.slot_time
+    FROM days d
+    CROSS JOIN template t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM appointments a
+        WHERE a.appointment_date = d.day
+        AND a.appointment_time = t.slot_time
+        AND a.specialist = t.specialist
+        AND a.status = 'scheduled'
+    )
+    ORDER BY d.day, t.specialist, t.slot_time
+"""
+
+
+# ============ CHAT HISTORY ============
+
+INSERT_CHAT_HISTORY_SQL = """
+    INSERT INTO chat_history (patient_id, user_message, bot_response, session_id)
+    VALUES (%(patient_id)s, %(user_message)s, %(bot_response)s, %(session_id)s)
+"""
+
+RECENT_CHAT_HISTORY_SQL = """
+    SELECT ch.user_message, ch.bot_response, ch.timestamp
+    FROM chat_history ch
+    ORDER BY ch.timestamp DESC
+    LIMIT %(limit)s
+"""
+
+PATIENT_CHAT_HISTORY_SQL = """
+    SELECT ch.user_message, ch.bot_response, ch.timestamp
+    FROM chat_history ch
+    JOIN patients p ON ch.patient_id = p.patient_id
+    WHERE p.full_name = %(patient_name)s
+    ORDER BY ch.timestamp DESC
+    LIMIT %(limit)s
+"""
+
+
+def chat_history_query(patient_name=None, limit=50):
+    """
+    Build the recent chat history query.
+
+    Returns:
+        Tuple of (SQL, parameters) yielding (user_message, bot_response,
+        timestamp) rows, newest first
+    """
+    if patient_name:
+        return PATIENT_CHAT_HISTORY_SQL, {'patient_name': patient_name, 'limit': limit}
+    return RECENT_CHAT_HISTORY_SQL, {'limit': limit}
+
+
+def chat_history_page_query(patient_id=None, session_id=None, after=None, limit=1000,
+                            newest_first=True):
+    """
+    Build one keyset-paginated page of chat history.
+
+    The page continues from ``after``, the (timestamp, chat_id) of the
+    previous page's last row, so every page is one indexed range scan.
+
+    Returns:
+        Tuple of (SQL, parameters) yielding (chat_id, patient_id,
+        session_id, user_message, bot_response, timestamp) rows
+    """
+    direction = 'DESC' if newest_first else 'ASC'
+    conditions = []
+    params = {'limit': limit}
+
+    if patient_id is not None:
+        conditions.append("patient_id = %(patient_id)s")
+        params['patient_id'] = patient_id
+
+    if session_id is not None:
+        conditions.append("session_id = %(session_id)s")
+        params['session_id'] = session_id
+
+    if after is not None:
+        comparison = '<' if newest_first else '>'
+        conditions.append(f"(timestamp, chat_id) {comparison} "
+                          f"(%(after_timestamp)s::timestamp, %(after_chat_id)s::integer)")
+        params['after_timestamp'], params['after_chat_id'] = after
+
+    query = """
+        SELECT chat_id, patient_id, session_id, user_message, bot_response, timestamp
+        FROM chat_history
+    """
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY timestamp {direction}, chat_id {direction} LIMIT %(limit)s"
+    return query, params
+
+
+def chat_history_page_key(row):
+    """The (timestamp, chat_id) the page after ``row`` continues from."""
+    return row[5], row[0]
@@ -3,6 +3,7 @@
 
 -- Drop existing tables if they exist
 DROP TABLE IF EXISTS chat_history CASCADE;
+DROP TABLE IF EXISTS medical_conditions CASCADE;
 DROP TABLE IF EXISTS appointments CASCADE;
 DROP TABLE IF EXISTS patients CASCADE;
 
@@ -31,10 +32,15 @@ CREATE TABLE appointments (
     status VARCHAR(20) DEFAULT 'scheduled' CHECK (status IN ('scheduled', 'completed', 'cancelled', 'no-show')),
     notes TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    CONSTRAINT unique_appointment UNIQUE(appointment_date, appointment_time, specialist)
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- One active booking per slot; cancelled, completed and no-show
+-- appointments stay in the table as history
+CREATE UNIQUE INDEX unique_active_appointment
+    ON appointments(appointment_date, appointment_time, specialist)
+    WHERE status = 'scheduled';
+
 -- Create indexes for appointment queries
 CREATE INDEX idx_appointment_date ON appointments(appointment_date);
 CREATE INDEX idx_appointment_status ON appointments(status);
@@ -48,12 +54,13 @@ CREATE TABLE chat_history (
     user_message TEXT NOT NULL,
     bot_response TEXT NOT NULL,
     session_id VARCHAR(100),
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create index on timestamp for chat history queries
-CREATE INDEX idx_chat_timestamp ON chat_history(timestamp DESC);
-CREATE INDEX idx_chat_session ON chat_history(session_id);
+-- Indexes for keyset-paginated chat history reads, ordered by (timestamp, chat_id)
+CREATE INDEX idx_chat_timestamp ON chat_history(timestamp DESC, chat_id DESC);
+CREATE INDEX idx_chat_session ON chat_history(session_id, timestamp DESC, chat_id DESC);
+CREATE INDEX idx_chat_patient ON chat_history(patient_id, timestamp DESC, chat_id DESC);
 
 -- Medical conditions reference table (optional, for tracking)
 CREATE TABLE medical_conditions (
@@ -63,21 +70,14 @@ CREATE TABLE medical_conditions (
     urgency_level VARCHAR(20) CHECK (urgency_level IN ('low', 'medium', 'high', 'emergency')),
     description TEXT,
     common_symptoms TEXT[],
+    treatment TEXT,
+    when_to_see_doctor TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Insert common medical conditions
-INSERT INTO medical_conditions (condition_name, specialist_type, urgency_level, description, common_symptoms) VALUES
-('Diabetes', 'Endocrinologist', 'high', 'Chronic condition affecting blood sugar regulation', ARRAY['increased thirst', 'frequent urination', 'fatigue', 'blurred vision']),
-('Hypertension', 'Cardiologist', 'high', 'High blood pressure condition', ARRAY['headaches', 'shortness of breath', 'nosebleeds', 'chest pain']),
-('Asthma', 'Pulmonologist', 'medium', 'Chronic respiratory condition', ARRAY['wheezing', 'shortness of breath', 'chest tightness', 'coughing']),
-('Migraine', 'Neurologist', 'medium', 'Severe headache disorder', ARRAY['severe headache', 'nausea', 'sensitivity to light', 'visual auras']),
-('Depression', 'Psychiatrist', 'high', 'Mental health disorder affecting mood', ARRAY['persistent sadness', 'loss of interest', 'fatigue', 'difficulty concentrating']),
-('Arthritis', 'Rheumatologist', 'medium', 'Joint inflammation causing pain', ARRAY['joint pain', 'stiffness', 'swelling', 'reduced range of motion']),
-('GERD', 'Gastroenterologist', 'low', 'Acid reflux condition', ARRAY['heartburn', 'chest pain', 'difficulty swallowing', 'regurgitation']),
-('Thyroid Disorder', 'Endocrinologist', 'medium', 'Thyroid gland dysfunction', ARRAY['fatigue', 'weight changes', 'mood changes', 'temperature sensitivity']),
-('Eczema', 'Dermatologist', 'low', 'Chronic skin condition', ARRAY['itchy skin', 'red patches', 'dry skin', 'skin rash']),
-('Chronic Back Pain', 'Orthopedist', 'medium', 'Persistent back pain', ARRAY['lower back pain', 'muscle aches', 'shooting pain', 'limited flexibility']);
+-- Conditions are seeded from models/medical_conditions.py by init_db.py
+-- (seed_medical_conditions), so the table and the built-in catalogue agree
+CREATE INDEX idx_conditions_specialist ON medical_conditions(specialist_type);
 
 -- Create function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -7,6 +7,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from ai.grok_client import GrokClient
+from ai.response_cache import ResponseCache
+from config.model_config import ModelConfig
+from ai.router import TieredRouter
 from models.symptom_analyzer import SymptomAnalyzer
 from database.db_manager import DatabaseManager
 from database.init_db import initialize_database
@@ -71,8 +74,11 @@ def start_chatbot():
     print("="*70)
     print("\nInitializing Grok AI...")
     
-    grok = GrokClient(verbose=False)
+    cache = ResponseCache() if ModelConfig.RESPONSE_CACHE_ENABLED else None
+    grok = GrokClient(verbose=False, cache=cache)
     symptom_analyzer = SymptomAnalyzer()
+    router = TieredRouter(grok=grok, symptom_analyzer=symptom_analyzer, system_prompt=SYSTEM_PROMPT)
+    router.warm_up()
     
     print("✅ System ready!")
     print("\n" + "="*70)
@@ -83,7 +89,7 @@ def start_chatbot():
     print("  4. 💊 Medical information")
     print("\n⚠️  DISCLAIMER: General information only. Always consult healthcare professionals.")
     print("\n💡 TIP: Describe your symptoms naturally!")
-    print("\nCommands: 'quit' to exit | 'help' for more info | 'reset' to clear conversation")
+    print("\nCommands: 'quit' to exit | 'help' for more info | 'reset' to clear conversation | 'stats' for routing stats")
     print("="*70)
     
     while True:
@@ -116,17 +122,11 @@ def start_chatbot():
                 print("   • 'Check available slots for 2024-12-25'")
                 continue
             
-            # Check for symptom keywords
-            symptom_keywords = ['symptom', 'pain', 'ache', 'feeling', 'have', 'experiencing']
-            has_symptoms = any(word in user_input.lower() for word in symptom_keywords)
-            
-            # Analyze symptoms if detected
-            if has_symptoms:
-                analysis = symptom_analyzer.analyze_symptoms(user_input)
-                if analysis['found_matches']:
-                    print("\n🤖 Bot:")
-                    print(analysis['recommendation'])
-                    continue
+            # Routing statistics
+            if user_input.lower() == 'stats':
+                print("\n🤖 Bot: Messages handled per tier:\n")
+                print(router.format_stats())
+                continue
             
             # Check for appointment commands
             lower_input = user_input.lower()
@@ -171,10 +171,13 @@ def start_chatbot():
                     print("   Example: 'Book appointment for John Doe on 2024-12-25 at 14:00'")
                 continue
             
-            # For everything else, use Grok with system prompt
+            # Everything else: intent classifier, then symptom analysis,
+            # and Grok only if neither can answer
+            # (LLM replies are printed token by token as they arrive)
             print("\n🤖 Bot: ", end="", flush=True)
-            response = grok.chat(user_input, system_prompt=SYSTEM_PROMPT)
-            print(response)
+            for chunk in router.route_stream(user_input):
+                print(chunk, end="", flush=True)
+            print()
             
         except KeyboardInterrupt:
             print("\n\n🤖 Bot: Goodbye! 👋")
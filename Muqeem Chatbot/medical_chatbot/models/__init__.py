@@ -1,2 +1,3 @@
 from .medical_conditions import MEDICAL_CONDITIONS, format_medical_documents
 from .symptom_analyzer import SymptomAnalyzer
+from .condition_catalogue import ConditionCatalogue, CatalogueSnapshot, get_default_catalogue
@@ -0,0 +1,307 @@
+"""Loadable, indexed and hot-reloadable medical condition catalogue."""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .medical_conditions import MEDICAL_CONDITIONS
+from .symptom_matcher import SymptomMatcher
+from .condition_scorer import ConditionScorer
+
+
+URGENCY_LEVELS = ('low', 'medium', 'high', 'emergency')
+
+CONDITION_DEFAULTS = {
+    'description': '',
+    'treatment': 'Please consult a healthcare professional for treatment options.',
+    'when_to_see_doctor': 'If symptoms persist, worsen or interfere with daily life.',
+}
+
+
+class CatalogueSnapshot:
+    """
+    One immutable, compiled version of the catalogue.
+
+    Holds the conditions together with every structure derived from them
+    (hash indexes, symptom matcher, condition scorer), so a reload can
+    replace all of them with a single reference swap.
+    """
+
+    def __init__(self, conditions: List[Dict], source: str, checksum: str):
+        self.conditions = conditions
+        self.source = source
+        self.checksum = checksum
+        self.loaded_at = time.time()
+
+        self.by_name = {}
+        self.by_specialist = {}
+        self.symptom_index = {}
+        for condition in conditions:
+            self.by_name[condition['condition'].lower()] = condition
+            self.by_specialist.setdefault(condition['specialist'].lower(), []).append(condition)
+            for symptom in condition['symptoms']:
+                self.symptom_index.setdefault(symptom.lower(), []).append(condition)
+
+        self.symptom_matcher = SymptomMatcher(self.symptom_index.keys())
+        self.condition_scorer = ConditionScorer(conditions, self.symptom_index)
+        self.condition_symptoms = [
+            {symptom.lower() for symptom in condition['symptoms']}
+            for condition in conditions
+        ]
+
+
+class ConditionCatalogue:
+    """
+    Medical condition catalogue that can be reloaded while the bot runs.
+
+    Conditions come from the built-in MEDICAL_CONDITIONS list, a JSON file
+    or the medical_conditions table. Each load is validated and compiled
+    into a new CatalogueSnapshot off to the side; readers keep using the
+    previous snapshot until it is swapped in, and a failed load leaves the
+    previous snapshot in place.
+    """
+
+    SOURCES = ('builtin', 'file', 'database')
+
+    def __init__(self, source: str = 'builtin', path: Optional[str] = None):
+        """
+        Initialize and load the catalogue.
+
+        Args:
+            source: 'builtin', 'file' or 'database'
+            path: JSON file path when source is 'file'
+        """
+        if source not in self.SOURCES:
+            raise ValueError(f"Unknown catalogue source '{source}' (expected one of {self.SOURCES})")
+        if source == 'file' and not path:
+            raise ValueError("A file path is required when source is 'file'")
+
+        self.source = source
+        self.path = path
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        # mtime of the file behind the current snapshot; only a load that
+        # parsed and validated records it, so a bad write is retried
+        self._file_mtime = None
+        self.snapshot, self._file_mtime = self._load_snapshot()
+
+    # ============ LOADING ============
+
+    def _load(self) -> List[Dict]:
+        """Read raw condition dicts from the configured source."""
+        if self.source == 'file':
+            return self.load_file(self.path)
+        if self.source == 'database':
+            return self.load_database()
+        return MEDICAL_CONDITIONS
+
+    def _load_snapshot(self):
+        """Load and validate the source; returns (snapshot, file mtime or None)."""
+        # taken before reading, so a write during the read is seen next time
+        mtime = os.path.getmtime(self.path) if self.source == 'file' else None
+        return self._build_snapshot(self._load()), mtime
+
+    def load_file(self, path: str) -> List[Dict]:
+        """
+        Read conditions from a JSON file.
+
+        The file holds either a list of condition dicts (same fields as
+        MEDICAL_CONDITIONS) or an object with a "conditions" list.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data['conditions'] if isinstance(data, dict) else data
+
+    @staticmethod
+    def load_database() -> List[Dict]:
+        """Read conditions from the medical_conditions table."""
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from database.db_manager import DatabaseManager
+
+        with DatabaseManager.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """SELECT condition_name, specialist_type, urgency_level,
+                              description, common_symptoms, treatment, when_to_see_doctor
+                       FROM medical_conditions
+                       ORDER BY condition_id"""
+                )
+                rows = cursor.fetchall()
+
+        return [
+            {
+                'condition': name,
+                'specialist': specialist,
+                'urgency': urgency or 'medium',
+                'description': description,
+                'symptoms': list(symptoms or []),
+                'treatment': treatment,
+                'when_to_see_doctor': when_to_see_doctor,
+            }
+            for name, specialist, urgency, description, symptoms, treatment, when_to_see_doctor in rows
+        ]
+
+    @staticmethod
+    def _validate(raw_conditions: List[Dict]) -> List[Dict]:
+        """Check required fields and fill optional ones with defaults."""
+        conditions = []
+        seen = set()
+        for i, raw in enumerate(raw_conditions):
+            for field in ('condition', 'specialist', 'urgency', 'symptoms'):
+                if not raw.get(field):
+                    raise ValueError(f"Condition #{i} is missing '{field}'")
+            if raw['urgency'] not in URGENCY_LEVELS:
+                raise ValueError(f"Condition '{raw['condition']}' has invalid urgency '{raw['urgency']}'")
+            if raw['condition'].lower() in seen:
+                raise ValueError(f"Duplicate condition '{raw['condition']}'")
+            seen.add(raw['condition'].lower())
+
+            condition = dict(raw)
+            condition['symptoms'] = list(raw['symptoms'])
+            for field, default in CONDITION_DEFAULTS.items():
+                if not condition.get(field):
+                    condition[field] = default
+            conditions.append(condition)
+
+        if not conditions:
+            raise ValueError("Catalogue is empty")
+        return conditions
+
+    def _build_snapshot(self, raw_conditions: List[Dict]) -> CatalogueSnapshot:
+        conditions = self._validate(raw_conditions)
+        checksum = hashlib.sha256(
+            json.dumps(conditions, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        return CatalogueSnapshot(conditions, self.source, checksum)
+
+    # ============ HOT RELOAD ============
+
+    def reload(self) -> bool:
+        """
+        Reload the catalogue from its source and swap it in atomically.
+
+        Returns:
+            True if a new version was swapped in, False if the content was
+            unchanged or the load failed (the current version is kept)
+        """
+        with self._lock:
+            try:
+                snapshot, mtime = self._load_snapshot()
+            except Exception as e:
+                print(f"❌ Error reloading condition catalogue: {e}")
+                return False
+
+            self._file_mtime = mtime
+            if snapshot.checksum == self.snapshot.checksum:
+                return False
+            self.snapshot = snapshot
+            return True
+
+    def start_watching(self, interval: float = 30.0):
+        """
+        Reload in the background every ``interval`` seconds.
+
+        File catalogues are only re-read when the file's modification time
+        changes; database catalogues are re-read and compared by checksum.
+        """
+        if self.source == 'builtin' or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                if self.source == 'file':
+                    try:
+                        if os.path.getmtime(self.path) == self._file_mtime:
+                            continue
+                    except OSError:
+                        continue
+                if self.reload():
+                    print(f"🔄 Condition catalogue reloaded ({len(self.snapshot.conditions)} conditions)")
+
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=watch, name='catalogue-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background reload thread."""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    # ============ LOOKUPS ============
+
+    @property
+    def conditions(self) -> List[Dict]:
+        return self.snapshot.conditions
+
+    def get_condition(self, condition_name: str) -> Optional[Dict]:
+        """Get a condition by name (case-insensitive)."""
+        return self.snapshot.by_name.get(condition_name.lower())
+
+    def get_by_specialist(self, specialist_name: str) -> List[Dict]:
+        """Get the conditions handled by a specialist (case-insensitive)."""
+        return list(self.snapshot.by_specialist.get(specialist_name.lower(), []))
+
+    def get_by_symptom(self, symptom: str) -> List[Dict]:
+        """Get the conditions that list a symptom (case-insensitive)."""
+        return list(self.snapshot.symptom_index.get(symptom.lower(), []))
+
+    def export(self, path: str):
+        """Write the current catalogue to a JSON file usable as a 'file' source."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'conditions': self.snapshot.conditions}, f, indent=2, ensure_ascii=False)
+
+
+_default_catalogue = None
+_default_lock = threading.Lock()
+
+
+def get_default_catalogue() -> ConditionCatalogue:
+    """
+    Get the process-wide catalogue configured by ModelConfig.
+
+    Created on first use; starts the background watcher when
+    CONDITIONS_RELOAD_INTERVAL is set.
+    """
+    global _default_catalogue
+    if _default_catalogue is None:
+        with _default_lock:
+            if _default_catalogue is None:
+                sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+                from config.model_config import ModelConfig
+
+                catalogue = ConditionCatalogue(
+                    ModelConfig.CONDITIONS_SOURCE, ModelConfig.CONDITIONS_FILE or None
+                )
+                if ModelConfig.CONDITIONS_RELOAD_INTERVAL > 0:
+                    catalogue.start_watching(ModelConfig.CONDITIONS_RELOAD_INTERVAL)
+                _default_catalogue = catalogue
+    return _default_catalogue
+
+
+# For testing
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Condition catalogue tools")
+    parser.add_argument('--source', default='builtin', choices=ConditionCatalogue.SOURCES)
+    parser.add_argument('--file', help="JSON file for --source file")
+    parser.add_argument('--export', help="Write the loaded catalogue to this JSON file")
+    args = parser.parse_args()
+
+    catalogue = ConditionCatalogue(args.source, args.file)
+    snapshot = catalogue.snapshot
+    print(f"Loaded {len(snapshot.conditions)} conditions from {snapshot.source}")
+    print(f"  Symptoms indexed: {len(snapshot.symptom_index)}")
+    print(f"  Specialists: {', '.join(sorted(c['specialist'] for c in snapshot.conditions))}")
+    print(f"  Checksum: {snapshot.checksum[:12]}")
+
+    if args.export:
+        catalogue.export(args.export)
+        print(f"✅ Exported to {args.export}")
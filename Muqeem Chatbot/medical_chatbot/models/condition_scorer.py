@@ -0,0 +1,96 @@
+"""Vectorized condition ranking over a sparse condition × symptom matrix."""
+
+import math
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+class ConditionScorer:
+    """
+    Ranks conditions by the weighted symptoms found in a message.
+
+    Conditions and symptoms form a sparse condition × symptom matrix whose
+    entries are IDF-style symptom weights: a symptom shared by many
+    conditions (e.g. "fatigue") counts for less than one specific to a
+    single condition (e.g. "increased thirst"). A message is a sparse 0/1
+    symptom vector, so ranking is one sparse matrix–vector product
+    followed by a top-k selection.
+
+    The matrix is kept in compressed sparse column form (one slice of
+    condition rows per symptom), which makes the product a single
+    ``np.bincount`` over the columns of the matched symptoms.
+    """
+
+    def __init__(self, conditions: List[Dict], symptom_index: Dict[str, List[Dict]]):
+        """
+        Build the weight matrix.
+
+        Args:
+            conditions: Condition dicts (matrix rows, in this order)
+            symptom_index: Lowercased symptom -> conditions having it
+        """
+        self.conditions = conditions
+        self.symptoms = list(symptom_index)
+        self.symptom_ids = {symptom: j for j, symptom in enumerate(self.symptoms)}
+
+        row_of = {id(condition): i for i, condition in enumerate(conditions)}
+        n_conditions = len(conditions)
+
+        indptr = [0]
+        indices = []
+        weights = np.empty(len(self.symptoms), dtype=np.float64)
+        for j, symptom in enumerate(self.symptoms):
+            rows = sorted({row_of[id(condition)] for condition in symptom_index[symptom]})
+            indices.extend(rows)
+            indptr.append(len(indices))
+            # Smoothed inverse document frequency, as in TF-IDF
+            weights[j] = math.log((1 + n_conditions) / (1 + len(rows))) + 1
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.weights = weights
+        self.data = np.repeat(weights, np.diff(self.indptr))
+
+    def score(self, symptoms: Iterable[str]) -> np.ndarray:
+        """
+        Score every condition against a set of matched symptoms.
+
+        Args:
+            symptoms: Matched (lowercased) symptom phrases
+
+        Returns:
+            Array of scores, one per condition
+        """
+        columns = [self.symptom_ids[s] for s in symptoms if s in self.symptom_ids]
+        if not columns:
+            return np.zeros(len(self.conditions))
+
+        starts = self.indptr[columns]
+        ends = self.indptr[np.asarray(columns) + 1]
+        selected = np.concatenate([np.arange(a, b) for a, b in zip(starts, ends)])
+        return np.bincount(
+            self.indices[selected],
+            weights=self.data[selected],
+            minlength=len(self.conditions)
+        )
+
+    def top_k(self, symptoms: Iterable[str], k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Get the best scoring conditions.
+
+        Args:
+            symptoms: Matched (lowercased) symptom phrases
+            k: Number of conditions to return
+
+        Returns:
+            List of (condition row, score) for conditions with a positive
+            score, best first; ties keep catalogue order
+        """
+        scores = self.score(symptoms)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            keep = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[keep]
+        order = np.lexsort((candidates, -scores[candidates]))
+        return [(int(row), float(scores[row])) for row in candidates[order]]
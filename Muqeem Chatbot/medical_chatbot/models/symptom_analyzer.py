@@ -1,32 +1,39 @@
 """Symptom analysis and specialist recommendation system."""
 
-from typing import Dict, List, Tuple
-from .medical_conditions import MEDICAL_CONDITIONS
+from typing import Dict, List, Optional, Tuple
+from .condition_catalogue import ConditionCatalogue, get_default_catalogue
 
 
 class SymptomAnalyzer:
     """Analyzes user symptoms and recommends specialists."""
     
-    def __init__(self):
-        """Initialize with medical conditions database."""
-        self.conditions = MEDICAL_CONDITIONS
-        self.symptom_index = self._build_symptom_index()
-    
-    def _build_symptom_index(self) -> Dict:
+    def __init__(self, catalogue: Optional[ConditionCatalogue] = None):
         """
-        Create a searchable index of symptoms to conditions.
+        Initialize with the medical conditions catalogue.
         
-        Returns:
-            Dictionary mapping symptoms to conditions
+        Args:
+            catalogue: Catalogue to analyze against (defaults to the
+                process-wide catalogue configured by ModelConfig)
         """
-        index = {}
-        for condition in self.conditions:
-            for symptom in condition['symptoms']:
-                symptom_lower = symptom.lower()
-                if symptom_lower not in index:
-                    index[symptom_lower] = []
-                index[symptom_lower].append(condition)
-        return index
+        self.catalogue = catalogue or get_default_catalogue()
+    
+    @property
+    def conditions(self) -> List[Dict]:
+        """Conditions in the current catalogue version."""
+        return self.catalogue.snapshot.conditions
+    
+    @property
+    def symptom_index(self) -> Dict:
+        """Lowercased symptom -> conditions, for the current catalogue version."""
+        return self.catalogue.snapshot.symptom_index
+    
+    @property
+    def symptom_matcher(self):
+        return self.catalogue.snapshot.symptom_matcher
+    
+    @property
+    def condition_scorer(self):
+        return self.catalogue.snapshot.condition_scorer
     
     def analyze_symptoms(self, user_input: str) -> Dict:
         """
@@ -40,38 +47,33 @@ class SymptomAnalyzer:
         """
         user_input_lower = user_input.lower()
         
-        # Find matching conditions
-        matches = {}
+        # Use one catalogue version for the whole analysis, even if a
+        # reload swaps in a new one meanwhile
+        snapshot = self.catalogue.snapshot
         
-        for symptom, conditions in self.symptom_index.items():
-            if symptom in user_input_lower:
-                for condition in conditions:
-                    condition_name = condition['condition']
-                    if condition_name not in matches:
-                        matches[condition_name] = {
-                            'condition': condition,
-                            'matched_symptoms': [],
-                            'score': 0
-                        }
-                    matches[condition_name]['matched_symptoms'].append(symptom)
-                    matches[condition_name]['score'] += 1
+        # Find mentioned symptoms, then rank conditions by weighted symptoms
+        found_symptoms = snapshot.symptom_matcher.find_phrases(user_input_lower)
+        ranked = snapshot.condition_scorer.top_k(found_symptoms, k=3)
         
-        if not matches:
+        if not ranked:
             return {
                 'found_matches': False,
                 'message': "I couldn't match your symptoms to specific conditions. I recommend seeing a General Practitioner for evaluation.",
                 'suggested_specialist': 'General Practitioner'
             }
         
-        # Sort by number of matching symptoms
-        sorted_matches = sorted(
-            matches.items(), 
-            key=lambda x: x[1]['score'], 
-            reverse=True
-        )
-        
-        # Get top matches (up to 3)
-        top_matches = sorted_matches[:3]
+        # Get top matches (up to 3), best first
+        top_matches = []
+        for row, score in ranked:
+            condition = snapshot.conditions[row]
+            top_matches.append((condition['condition'], {
+                'condition': condition,
+                'matched_symptoms': [
+                    symptom for symptom in found_symptoms
+                    if symptom in snapshot.condition_symptoms[row]
+                ],
+                'score': score
+            }))
         
         return {
             'found_matches': True,
@@ -171,10 +173,8 @@ This is for general information only and not a substitute for professional medic
         Returns:
             Specialist type or 'General Practitioner' if not found
         """
-        for condition in self.conditions:
-            if condition['condition'].lower() == condition_name.lower():
-                return condition['specialist']
-        return "General Practitioner"
+        condition = self.catalogue.get_condition(condition_name)
+        return condition['specialist'] if condition else "General Practitioner"
     
     def get_urgency_for_condition(self, condition_name: str) -> str:
         """
@@ -186,10 +186,8 @@ This is for general information only and not a substitute for professional medic
         Returns:
             Urgency level ('low', 'medium', 'high', 'emergency')
         """
-        for condition in self.conditions:
-            if condition['condition'].lower() == condition_name.lower():
-                return condition['urgency']
-        return "medium"
+        condition = self.catalogue.get_condition(condition_name)
+        return condition['urgency'] if condition else "medium"
     
     def search_by_specialist(self, specialist_name: str) -> List[Dict]:
         """
@@ -201,10 +199,7 @@ This is for general information only and not a substitute for professional medic
         Returns:
             List of conditions
         """
-        return [
-            condition for condition in self.conditions
-            if condition['specialist'].lower() == specialist_name.lower()
-        ]
+        return self.catalogue.get_by_specialist(specialist_name)
     
     def get_conditions_by_symptom(self, symptom: str) -> List[str]:
         """
@@ -216,13 +211,10 @@ This is for general information only and not a substitute for professional medic
         Returns:
             List of condition names
         """
-        symptom_lower = symptom.lower()
-        if symptom_lower in self.symptom_index:
-            return [
-                condition['condition'] 
-                for condition in self.symptom_index[symptom_lower]
-            ]
-        return []
+        return [
+            condition['condition']
+            for condition in self.catalogue.get_by_symptom(symptom)
+        ]
 
 
 # Test functions
@@ -0,0 +1,112 @@
+"""Multi-pattern symptom phrase matcher (Aho–Corasick)."""
+
+from typing import Iterable, List, Tuple
+
+
+class SymptomMatcher:
+    """
+    Finds every known symptom phrase in a text in a single pass.
+
+    The phrases are compiled once into an Aho–Corasick automaton, so the
+    cost of a lookup grows with the length of the text rather than with
+    the number of symptoms. Matches must start and end on word boundaries:
+    "pain" matches "chest pain" but not "painting".
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        """
+        Compile the automaton.
+
+        Args:
+            phrases: Symptom phrases to look for (matched case-insensitively)
+        """
+        self.phrases = []
+        self._goto = [{}]       # state -> {char: next state}
+        self._fail = [0]        # state -> fallback state
+        self._output = [()]     # state -> ids of phrases ending here
+
+        seen = set()
+        for phrase in phrases:
+            phrase = phrase.lower()
+            if phrase and phrase not in seen:
+                seen.add(phrase)
+                self._add(phrase)
+        self._build_failure_links()
+
+    def _add(self, phrase: str):
+        """Insert a phrase into the trie."""
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+
+        self._output[state] = self._output[state] + (len(self.phrases),)
+        self.phrases.append(phrase)
+
+    def _build_failure_links(self):
+        """Breadth-first pass linking each state to its longest proper suffix."""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Inherit the phrases that end at the suffix state
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+                queue.append(next_state)
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find every word-bounded phrase occurrence.
+
+        Args:
+            text: Lowercased text to search
+
+        Returns:
+            List of (start, end, phrase) tuples in order of their end position
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        phrases = self.phrases
+        length = len(text)
+
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if not output[state]:
+                continue
+            end = position + 1
+            if end < length and text[end].isalnum():
+                continue
+            for phrase_id in output[state]:
+                phrase = phrases[phrase_id]
+                start = end - len(phrase)
+                if start == 0 or not text[start - 1].isalnum():
+                    matches.append((start, end, phrase))
+
+        return matches
+
+    def find_phrases(self, text: str) -> List[str]:
+        """
+        Find the distinct phrases present in a text.
+
+        Returns:
+            Phrases in order of first occurrence
+        """
+        return list(dict.fromkeys(phrase for _, _, phrase in self.find_all(text)))
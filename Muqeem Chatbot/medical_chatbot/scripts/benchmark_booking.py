@@ -0,0 +1,150 @@
+"""
+Concurrency benchmark for appointment booking.
+
+Fires N parallel bookings at the same slot and reports throughput, how
+many bookers won/lost the slot, and the latency of the losing (conflict)
+requests. Exactly one booking should succeed per run.
+
+Usage:
+    python scripts/benchmark_booking.py --bookers 50 --date 2030-01-15 --time 10:00:00
+    python scripts/benchmark_booking.py --bookers 200 --use-async
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import DatabaseManager
+from database.async_db_manager import AsyncDatabaseManager
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_threaded(args):
+    """Book the slot from N threads released at the same instant."""
+    barrier = threading.Barrier(args.bookers)
+    results = [None] * args.bookers
+
+    def booker(i):
+        barrier.wait()
+        started = time.perf_counter()
+        result = DatabaseManager.reserve_appointment(
+            f"Benchmark Patient {i}", args.date, args.time,
+            "Concurrency benchmark", args.specialist
+        )
+        results[i] = (result, time.perf_counter() - started)
+
+    # Warm the pool so connection setup is not part of the measurement
+    DatabaseManager.get_pool()
+
+    threads = [threading.Thread(target=booker, args=(i,)) for i in range(args.bookers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def run_async(args):
+    """Book the slot from N coroutines on one event loop."""
+    async def main():
+        async with AsyncDatabaseManager() as db:
+            async def booker(i):
+                started = time.perf_counter()
+                result = await db.reserve_appointment(
+                    f"Benchmark Patient {i}", args.date, args.time,
+                    "Concurrency benchmark", args.specialist
+                )
+                return result, time.perf_counter() - started
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*(booker(i) for i in range(args.bookers)))
+            return results, time.perf_counter() - started
+
+    return asyncio.run(main())
+
+
+def report(results, elapsed):
+    """Print a summary of one benchmark run."""
+    by_status = {}
+    for result, latency in results:
+        by_status.setdefault(result['status'], []).append(latency)
+
+    print("\n" + "="*60)
+    print("BOOKING BENCHMARK RESULTS")
+    print("="*60)
+    print(f"  Bookers:     {len(results)}")
+    print(f"  Wall time:   {elapsed * 1000:.1f} ms")
+    print(f"  Throughput:  {len(results) / elapsed:.1f} bookings/s")
+
+    for status in ('booked', 'unavailable', 'error'):
+        latencies = by_status.get(status, [])
+        if not latencies:
+            continue
+        print(f"\n  {status.upper()}: {len(latencies)}")
+        print(f"    mean: {statistics.mean(latencies) * 1000:.2f} ms")
+        print(f"    p50:  {percentile(latencies, 50) * 1000:.2f} ms")
+        print(f"    p95:  {percentile(latencies, 95) * 1000:.2f} ms")
+        print(f"    max:  {max(latencies) * 1000:.2f} ms")
+
+    errors = [result['error'] for result, _ in results if result['status'] == 'error']
+    if errors:
+        print(f"\n  First error: {errors[0]}")
+
+    booked = len(by_status.get('booked', []))
+    print("\n" + ("✅ Exactly one booking won the slot." if booked == 1
+                  else f"❌ Expected 1 successful booking, got {booked}."))
+
+    return [result for result, _ in results if result['status'] == 'booked']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent appointment booking benchmark")
+    parser.add_argument('--bookers', type=int, default=50, help="Parallel bookings to fire")
+    parser.add_argument('--date', default='2030-01-15', help="Slot date (YYYY-MM-DD)")
+    parser.add_argument('--time', default='10:00:00', help="Slot time (HH:MM:SS)")
+    parser.add_argument('--specialist', default='General Practitioner')
+    parser.add_argument('--use-async', action='store_true', help="Use AsyncDatabaseManager")
+    parser.add_argument('--keep', action='store_true', help="Keep the booked appointment")
+    args = parser.parse_args()
+
+    # Start from a free slot
+    DatabaseManager.get_pool()
+    with DatabaseManager.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """UPDATE appointments SET status = 'cancelled'
+                   WHERE appointment_date = %s AND appointment_time = %s
+                   AND specialist = %s AND status = 'scheduled'""",
+                (args.date, args.time, args.specialist)
+            )
+
+    if args.use_async:
+        results, elapsed = run_async(args)
+    else:
+        results, elapsed = run_threaded(args)
+
+    booked = report(results, elapsed)
+    print(f"\nPool: {DatabaseManager.get_pool_stats()}")
+
+    if not args.keep:
+        for result in booked:
+            DatabaseManager.cancel_appointment(result['appointment_id'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark symptom matching and condition scoring as the catalogue grows.
+
+Compares the original approach (a substring check per known symptom)
+with the compiled SymptomMatcher automaton on catalogues padded with
+synthetic symptoms, then times ConditionScorer ranking against
+catalogues of synthetic conditions.
+
+Usage:
+    python scripts/benchmark_symptom_matcher.py
+    python scripts/benchmark_symptom_matcher.py --sizes 100 1000 10000 --messages 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.medical_conditions import get_all_symptoms
+from models.symptom_matcher import SymptomMatcher
+from models.condition_scorer import ConditionScorer
+
+
+WORDS = [
+    'acute', 'chronic', 'sharp', 'dull', 'left', 'right', 'upper', 'lower',
+    'ear', 'eye', 'knee', 'wrist', 'throat', 'jaw', 'ankle', 'neck', 'skin',
+    'burning', 'itching', 'swelling', 'numbness', 'cramps', 'spasms', 'rash'
+]
+
+MESSAGES = [
+    "I have increased thirst and frequent urination and I feel extreme fatigue",
+    "I've had a severe headache with nausea and sensitivity to light since yesterday",
+    "I love painting but lately I get chest pain and shortness of breath",
+    "My lower back pain gets worse in the morning and I have muscle aches",
+    "Nothing serious, just wanted to ask about your opening hours",
+]
+
+
+def build_catalogue(size, rng):
+    """Real symptoms padded with synthetic multi-word symptoms up to ``size``."""
+    symptoms = list(get_all_symptoms())
+    seen = set(symptoms)
+    while len(symptoms) < size:
+        phrase = " ".join(rng.sample(WORDS, rng.randint(2, 3)))
+        phrase = f"{phrase} {len(symptoms)}"
+        if phrase not in seen:
+            seen.add(phrase)
+            symptoms.append(phrase)
+    return symptoms
+
+
+def naive_match(symptoms, text):
+    """The original loop: substring check per symptom."""
+    return [symptom for symptom in symptoms if symptom in text]
+
+
+def time_it(func, messages, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            func(message)
+    return (time.perf_counter() - started) / (repeat * len(messages))
+
+
+def build_conditions(count, symptoms, rng):
+    """Synthetic conditions with 4-10 symptoms each, plus the symptom index."""
+    conditions = [
+        {'condition': f"Condition {i}", 'symptoms': rng.sample(symptoms, rng.randint(4, 10))}
+        for i in range(count)
+    ]
+    index = {}
+    for condition in conditions:
+        for symptom in condition['symptoms']:
+            index.setdefault(symptom, []).append(condition)
+    return conditions, index
+
+
+def bench_scoring(condition_counts, symptoms, rng):
+    """Time top-3 ranking of a 4-symptom message against growing catalogues."""
+    print(f"\n{'conditions':>10} | {'build ms':>9} | {'top-3 µs/msg':>13}")
+    print("-" * 40)
+
+    for count in condition_counts:
+        conditions, index = build_conditions(count, symptoms, rng)
+        started = time.perf_counter()
+        scorer = ConditionScorer(conditions, index)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        queries = [rng.sample(list(index), 4) for _ in range(200)]
+        per_query = time_it(lambda found: scorer.top_k(found, k=3), queries, 5)
+        print(f"{count:>10} | {build_ms:>9.1f} | {per_query * 1e6:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Symptom matcher benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 2000, 5000, 10000])
+    parser.add_argument('--messages', type=int, default=200, help="Messages per measurement")
+    parser.add_argument('--conditions', type=int, nargs='+', default=[100, 1000, 5000, 20000])
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = [rng.choice(MESSAGES).lower() for _ in range(args.messages)]
+
+    print(f"{'symptoms':>9} | {'build ms':>9} | {'loop µs/msg':>12} | {'automaton µs/msg':>17} | {'speedup':>8}")
+    print("-" * 68)
+
+    for size in args.sizes:
+        symptoms = build_catalogue(size, rng)
+
+        started = time.perf_counter()
+        matcher = SymptomMatcher(symptoms)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        repeat = max(1, 2000 // size)
+        naive = time_it(lambda text: naive_match(symptoms, text), messages, repeat)
+        compiled = time_it(matcher.find_phrases, messages, repeat)
+
+        print(f"{len(symptoms):>9} | {build_ms:>9.1f} | {naive * 1e6:>12.1f} | "
+              f"{compiled * 1e6:>17.1f} | {naive / compiled:>7.1f}x")
+
+    bench_scoring(args.conditions, build_catalogue(max(args.sizes), rng), rng)
+
+
+if __name__ == '__main__':
+    main()
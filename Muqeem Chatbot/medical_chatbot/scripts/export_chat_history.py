@@ -0,0 +1,64 @@
+"""
+Export chat history to JSON Lines or CSV without loading it into memory.
+
+Usage:
+    python scripts/export_chat_history.py chat_history.jsonl
+    python scripts/export_chat_history.py chat_history.csv --session-id abc123
+    python scripts/export_chat_history.py patient_7.jsonl --patient-id 7 --oldest-first
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import DatabaseManager
+
+
+COLUMNS = ['chat_id', 'patient_id', 'session_id', 'user_message', 'bot_response', 'timestamp']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream chat history to a file")
+    parser.add_argument('output', help="Output file (.jsonl or .csv)")
+    parser.add_argument('--patient-id', type=int, help="Only this patient's chats")
+    parser.add_argument('--session-id', help="Only this session's chats")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Rows fetched per query")
+    parser.add_argument('--oldest-first', action='store_true', help="Export in chronological order")
+    args = parser.parse_args()
+
+    as_csv = args.output.lower().endswith('.csv')
+    started = time.perf_counter()
+    total = 0
+
+    with open(args.output, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f) if as_csv else None
+        if writer:
+            writer.writerow(COLUMNS)
+
+        for chunk in DatabaseManager.iter_chat_history_chunks(
+            patient_id=args.patient_id,
+            session_id=args.session_id,
+            chunk_size=args.chunk_size,
+            newest_first=not args.oldest_first
+        ):
+            for row in chunk:
+                if writer:
+                    writer.writerow(row)
+                else:
+                    record = dict(zip(COLUMNS, row))
+                    record['timestamp'] = record['timestamp'].isoformat()
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            total += len(chunk)
+            print(f"  ... {total} rows", end="\r", flush=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Exported {total} rows to {args.output} in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
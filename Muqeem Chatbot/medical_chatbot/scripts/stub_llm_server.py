@@ -0,0 +1,269 @@
+"""
+Local stand-in for the OpenAI-compatible chat completions API.
+
+Answers POST /chat/completions with a canned reply after an optional
+delay (streamed word by word as server-sent events when the request has
+"stream": true), can fail a share of requests with 429/5xx to exercise
+retries, and counts TCP connections so connection reuse is visible. Point the
+client at it with OPENROUTER_BASE_URL=http://127.0.0.1:8089.
+
+Usage:
+    python scripts/stub_llm_server.py --port 8089 --delay 0.2 --fail-rate 0.1
+    python scripts/stub_llm_server.py --demo 50      # time GrokClient against the stub
+    python scripts/stub_llm_server.py --demo 5 --stream --token-delay 0.05
+    python scripts/stub_llm_server.py --demo 200 --async-sessions 100 --delay 0.5
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests; headers and body
+    # go out in separate writes, so Nagle would stall kept-alive replies
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # client cancelled the request
+            self.close_connection = True
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def _send_stream(self, model, content):
+        """Reply as an SSE stream of chat.completion.chunk events (chunked encoding)."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            # providers send keep-alive comments while the model warms up
+            self._write_chunk(b": processing\n\n")
+            words = content.split(" ")
+            for i, word in enumerate(words):
+                time.sleep(self.server.token_delay)
+                event = {
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}],
+                }
+                self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+            self._write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # client stopped reading mid-stream
+            self.close_connection = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        time.sleep(self.server.delay)
+        if random.random() < self.server.fail_rate:
+            status = random.choice(self.server.fail_statuses)
+            headers = {"Retry-After": "0"} if status == 429 else None
+            self._send_json(status, {"error": {"message": "stub failure"}}, headers)
+            return
+
+        question = request.get("messages", [{}])[-1].get("content", "")
+        if request.get("stream"):
+            self._send_stream(request.get("model", "stub"), f"Stub answer to: {question}. " + self.server.filler)
+            return
+        self._send_json(200, {
+            "id": f"stub-{self.server.requests}",
+            "object": "chat.completion",
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": f"Stub answer to: {question}"},
+                "finish_reason": "stop",
+            }],
+        })
+
+
+def start_server(host="127.0.0.1", port=8089, delay=0.0, fail_rate=0.0,
+                 fail_statuses=(429, 503), token_delay=0.0, verbose=False):
+    """Start the stub in a daemon thread and return the server."""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.fail_rate = fail_rate
+    server.fail_statuses = list(fail_statuses)
+    server.token_delay = token_delay
+    # padding so streamed replies have a realistic number of tokens
+    server.filler = "This is general information. Please consult a healthcare provider for personalized advice."
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def demo_stream(server, calls):
+    """Time to first token vs. full reply for GrokClient.chat_stream."""
+    from ai.grok_client import GrokClient
+    from config.model_config import ModelConfig
+
+    ModelConfig.OPENROUTER_BASE_URL = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    client = GrokClient()
+    for i in range(calls):
+        print("🤖 Bot: ", end="", flush=True)
+        for delta in client.chat_stream(f"question {i}"):
+            print(delta, end="", flush=True)
+        t = client.last_timing
+        print(f"\n   first token {t['first_token_ms']:.0f} ms, full reply {t['total_ms']:.0f} ms, "
+              f"history {len(client.conversation_history)} messages, "
+              f"prompt ~{client.last_prompt_tokens} tokens")
+    client.close()
+
+
+def demo_async(server, calls, sessions, concurrency, rpm):
+    """Spread CALLS messages over SESSIONS concurrent conversations with AsyncGrokClient."""
+    import asyncio
+    from ai.async_grok_client import AsyncGrokClient
+    from config.model_config import ModelConfig
+
+    ModelConfig.OPENROUTER_BASE_URL = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    async def conversation(client, session_id, turns):
+        for turn in range(turns):
+            await client.chat(session_id, f"{session_id} question {turn}")
+
+    async def run():
+        async with AsyncGrokClient(max_concurrency=concurrency, requests_per_minute=rpm) as client:
+            turns = max(1, calls // sessions)
+            start = time.perf_counter()
+            tasks = [asyncio.ensure_future(conversation(client, f"user-{i}", turns))
+                     for i in range(sessions)]
+            # one user disconnects halfway through
+            await asyncio.sleep(server.delay / 2)
+            client.cancel("user-0")
+            await asyncio.gather(*tasks, return_exceptions=True)
+            elapsed = time.perf_counter() - start
+
+            stats = client.get_stats()
+            history = client.get_history("user-1")
+            print(f"{sessions} sessions x {turns} turns, concurrency {concurrency}"
+                  f"{f', {rpm:g} rpm' if rpm else ''}")
+            print(f"  wall time {elapsed:.2f} s ({stats['requests']} requests, "
+                  f"{server.connections} connections, {stats['retries']} retries, "
+                  f"{stats['cancelled']} cancelled, {stats['rate_limited_s']:.2f} s rate limited)")
+            print(f"  sequential estimate {sessions * turns * server.delay:.2f} s")
+            print(f"  user-1 history: {len(history)} messages, last: {history[-1]['content']!r}")
+
+    asyncio.run(run())
+
+
+def demo(server, calls):
+    """Time GrokClient (pooled session) against one new connection per call."""
+    import requests
+    from ai.grok_client import GrokClient
+    from config.model_config import ModelConfig
+
+    base_url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    ModelConfig.OPENROUTER_BASE_URL = base_url
+
+    client = GrokClient()
+    timings = []
+    for i in range(calls):
+        client.reset_conversation()
+        client.chat(f"question {i}")
+        timings.append(client.last_timing)
+    pooled_connections = server.connections
+
+    start = time.perf_counter()
+    for i in range(calls):
+        requests.post(f"{base_url}/chat/completions",
+                      data=json.dumps({"messages": [{"role": "user", "content": f"q {i}"}]}),
+                      headers={"Content-Type": "application/json", "Connection": "close"},
+                      timeout=30)
+    unpooled_ms = (time.perf_counter() - start) * 1000 / calls
+
+    print(f"{calls} calls against {base_url}")
+    print(f"  pooled session:   {pooled_connections} connections, "
+          f"mean {statistics.mean(t['call_ms'] for t in timings):.2f} ms/call "
+          f"(connect {statistics.mean(t['connect_ms'] for t in timings):.2f} ms, "
+          f"TTFB {statistics.mean(t['ttfb_ms'] for t in timings):.2f} ms, "
+          f"{sum(t['attempts'] - 1 for t in timings)} retries)")
+    print(f"  new connection:   {server.connections - pooled_connections} connections, "
+          f"mean {unpooled_ms:.2f} ms/call")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds before each reply")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="Share of requests answered with 429/503")
+    parser.add_argument("--token-delay", type=float, default=0.0,
+                        help="Seconds between streamed words")
+    parser.add_argument("--demo", type=int, metavar="CALLS",
+                        help="Run GrokClient against the stub for CALLS calls, then exit")
+    parser.add_argument("--stream", action="store_true", help="Use chat_stream in --demo")
+    parser.add_argument("--async-sessions", type=int, metavar="N",
+                        help="Run --demo with AsyncGrokClient over N concurrent conversations")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight for --async-sessions")
+    parser.add_argument("--rpm", type=float, default=0, help="Requests per minute for --async-sessions")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port, args.delay, args.fail_rate,
+                          token_delay=args.token_delay, verbose=args.verbose)
+    if args.demo and args.async_sessions:
+        demo_async(server, args.demo, args.async_sessions, args.concurrency, args.rpm)
+        server.shutdown()
+        return
+    if args.demo:
+        (demo_stream if args.stream else demo)(server, args.demo)
+        server.shutdown()
+        return
+
+    print(f"Stub LLM server on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+# Make the package modules (ai, config, models, ...) importable.
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
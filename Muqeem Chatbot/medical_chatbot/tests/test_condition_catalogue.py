@@ -0,0 +1,43 @@
+"""ConditionCatalogue hot reload from a JSON file."""
+
+import json
+import os
+import time
+
+from models.condition_catalogue import ConditionCatalogue
+
+
+def condition(name):
+    return {'condition': name, 'specialist': 'General Practitioner',
+            'urgency': 'low', 'symptoms': ['cough']}
+
+
+def write(path, text, mtime):
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_failed_reload_is_retried(tmp_path):
+    path = tmp_path / 'conditions.json'
+    write(path, json.dumps([condition('Cold')]), mtime=1_000_000)
+    catalogue = ConditionCatalogue(source='file', path=str(path))
+
+    # a half-written file, completed within the same mtime tick
+    write(path, '[{"condition": "Fl', mtime=2_000_000)
+    assert not catalogue.reload()
+    write(path, json.dumps([condition('Cold'), condition('Flu')]), mtime=2_000_000)
+
+    catalogue.start_watching(interval=0.05)
+    try:
+        assert wait_for(lambda: len(catalogue.snapshot.conditions) == 2)
+    finally:
+        catalogue.stop_watching()
@@ -0,0 +1,29 @@
+"""Shared SQL builders (no database needed)."""
+
+from datetime import datetime
+
+from database.queries import chat_history_page_key, chat_history_page_query, asyncpg_args
+
+
+def test_first_page_has_no_keyset_condition():
+    query, params = chat_history_page_query(limit=10)
+    assert 'WHERE' not in query
+    assert 'ORDER BY timestamp DESC, chat_id DESC' in query
+    assert params == {'limit': 10}
+
+
+def test_next_page_continues_after_last_row():
+    row = (42, 7, 'session-1', 'hi', 'hello', datetime(2025, 1, 1, 12, 0))
+    query, params = chat_history_page_query(patient_id=7, after=chat_history_page_key(row), limit=10)
+    assert '(timestamp, chat_id) <' in query
+
+    text, *values = asyncpg_args(query, params)
+    assert '%(' not in text
+    assert values == [7, datetime(2025, 1, 1, 12, 0), 42, 10]
+
+
+def test_oldest_first_pages_ascend():
+    query, _ = chat_history_page_query(session_id='s', after=(datetime(2025, 1, 1), 1),
+                                       newest_first=False)
+    assert '(timestamp, chat_id) >' in query
+    assert 'ORDER BY timestamp ASC, chat_id ASC' in query
@@ -0,0 +1,64 @@
+"""TieredRouter tests with stub tiers (no model files or API access needed)."""
+
+from ai.router import TieredRouter
+
+
+class StubClassifier:
+    """classify_top/choose_response of chatbot.py with a fixed prediction."""
+
+    def __init__(self, tag, confidence, threshold):
+        self.top = {'tag': tag, 'confidence': confidence, 'threshold': threshold}
+
+    def classify_top(self, message):
+        return dict(self.top)
+
+    def choose_response(self, tag, confidence, threshold):
+        return f"{tag} reply"
+
+
+class NoSymptoms:
+    def analyze_symptoms(self, message):
+        return {'found_matches': False}
+
+
+class UnreachableGrok:
+    """Fails the test if the router escalates to the LLM."""
+
+    last_cache_hit = False
+    last_error = None
+
+    def chat(self, *args, **kwargs):
+        raise AssertionError("message escalated to the LLM")
+
+    def chat_stream(self, *args, **kwargs):
+        raise AssertionError("message escalated to the LLM")
+
+
+def make_router(threshold):
+    classifier = StubClassifier('greeting_morning', 0.98, threshold)
+    router = TieredRouter(grok=UnreachableGrok(), symptom_analyzer=NoSymptoms(),
+                          classifier=classifier, classifier_intents=['greeting_morning'])
+    # calibrated thresholds, whatever ROUTER_MIN_CONFIDENCE says
+    router.min_confidence = None
+    return router
+
+
+def test_uncapped_threshold_still_answers_locally():
+    # a calibration that never trusted the intent asks for 1.0
+    router = make_router(threshold=1.0)
+
+    assert ''.join(router.route_stream("good morning")) == "greeting_morning reply"
+    assert router.route("good morning")['tier'] == 'classifier'
+
+    stats = router.stats()
+    assert stats['classifier']['handled'] == 2
+    assert stats['llm']['attempts'] == 0
+
+
+def test_low_confidence_still_escalates():
+    router = make_router(threshold=1.0)
+    router.classifier.top['confidence'] = 0.5
+    router.grok = None
+
+    assert router.route("good morning")['tier'] == 'none'
+    assert router.stats()['classifier']['handled'] == 0
@@ -14,14 +14,19 @@ from database.db_manager import DatabaseManager
 class QueryProcessor:
     """Processes and routes user queries."""
     
-    def __init__(self, rag_system=None):
+    def __init__(self, rag_system=None, llm_client=None, system_prompt: Optional[str] = None):
         """
         Initialize query processor.
         
         Args:
             rag_system: RAG system instance for medical Q&A
+            llm_client: GrokClient answering medical questions when there
+                is no RAG system (supports streaming via process_stream)
+            system_prompt: System prompt sent with llm_client requests
         """
         self.rag_system = rag_system
+        self.llm_client = llm_client
+        self.system_prompt = system_prompt
         self.symptom_analyzer = SymptomAnalyzer()
         self.conversation_state = {
             'awaiting_appointment_confirmation': False,
@@ -40,6 +45,37 @@ class QueryProcessor:
         Returns:
             Bot response string
         """
+        response = self._handle_local(user_input)
+        if response is not None:
+            return response
+        
+        # Default to RAG system for general medical questions
+        return self._handle_medical_query(user_input)
+    
+    def process_stream(self, user_input: str):
+        """
+        Like process(), but yields the response in pieces.
+        
+        Local handlers (appointments, symptoms) yield their whole response
+        at once; general medical questions answered by llm_client are
+        streamed as the model generates them.
+        
+        Args:
+            user_input: User's message
+        
+        Yields:
+            Text of the bot response
+        """
+        response = self._handle_local(user_input)
+        if response is not None:
+            yield response
+        elif self.rag_system is None and self.llm_client is not None:
+            yield from self.llm_client.chat_stream(user_input, system_prompt=self.system_prompt)
+        else:
+            yield self._handle_medical_query(user_input)
+    
+    def _handle_local(self, user_input: str) -> Optional[str]:
+        """Response from the local handlers, or None for a general medical question."""
         user_input_lower = user_input.lower().strip()
         
         # Check for empty input
@@ -73,8 +109,7 @@ class QueryProcessor:
         if any(keyword in user_input_lower for keyword in symptom_keywords):
             return self._handle_symptom_analysis(user_input)
         
-        # Default to RAG system for general medical questions
-        return self._handle_medical_query(user_input)
+        return None
     
     def _handle_symptom_analysis(self, user_input: str) -> str:
         """Handle symptom analysis and specialist recommendation."""
@@ -208,7 +243,10 @@ Or check available slots first: "Show available slots for 2024-12-25"
         )
     
     def _handle_medical_query(self, user_input: str) -> str:
-        """Handle general medical questions using RAG system."""
+        """Handle general medical questions using RAG system (or the LLM client)."""
+        if self.rag_system is None and self.llm_client is not None:
+            return self.llm_client.chat(user_input, system_prompt=self.system_prompt)
+        
         if self.rag_system is None:
             return "I apologize, but the medical knowledge system is not available right now. Please try again later."
         
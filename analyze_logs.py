@@ -0,0 +1,393 @@
+# analyze_logs.py
+# Aggregate statistics over HealthMate conversation logs.
+#
+# Reads the legacy logs.txt format (USER / BOT / dashes, three lines per
+# turn) and the JSON-lines log written by conversation_logger.py, plain or
+# gzipped. Plain files are split into byte ranges processed on a pool of
+# worker processes; every worker streams its range line by line into
+# fixed-size aggregates (counters, histograms, a Space-Saving top-k), and
+# the partial results are merged, so memory stays flat however big the
+# logs are.
+#
+#   python analyze_logs.py                              # logs.txt + conversations*.jsonl*
+#   python analyze_logs.py big.jsonl --jobs 8 --chunk-mb 128
+#   python analyze_logs.py logs.txt --json report.json
+import argparse
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BASE = Path(__file__).parent
+FALLBACK_PREFIX = "I'm sorry — I didn't understand that."
+
+CONFIDENCE_BINS = 20
+# latency histogram: log-spaced buckets, ~2% relative error on quantiles
+LATENCY_MIN_MS = 0.01
+LATENCY_GROWTH = 1.02
+
+_SPACES = re.compile(r"\s+")
+
+
+# -----------------------------
+# Aggregates
+# -----------------------------
+class SpaceSaving:
+    """
+    Approximate top-k counter (Metwally et al.) in `capacity` slots.
+
+    Items that are never evicted are counted exactly; an item that took over
+    a slot inherits the evicted count, recorded as its error. A lazy min-heap
+    finds the slot to evict.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def add(self, item):
+        count = self.counts.get(item)
+        if count is not None:
+            self.counts[item] = count + 1
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = 1
+            self.errors[item] = 0
+        else:
+            floor = self._evict()
+            self.counts[item] = floor + 1
+            self.errors[item] = floor
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild()
+
+    def _evict(self):
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                del self.counts[item]
+                del self.errors[item]
+                return count
+
+    def _rebuild(self):
+        self._heap = [(c, item) for item, c in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def merge(self, other):
+        for item, count in other.counts.items():
+            self.counts[item] = self.counts.get(item, 0) + count
+            self.errors[item] = self.errors.get(item, 0) + other.errors[item]
+        if len(self.counts) > self.capacity:
+            keep = heapq.nlargest(self.capacity, self.counts.items(), key=lambda kv: kv[1])
+            self.counts = dict(keep)
+            self.errors = {item: self.errors[item] for item in self.counts}
+        self._rebuild()
+
+    def top(self, k):
+        items = heapq.nlargest(k, self.counts.items(), key=lambda kv: kv[1])
+        return [(item, count, self.errors[item]) for item, count in items]
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        ms = max(ms, LATENCY_MIN_MS)
+        b = int(math.log(ms / LATENCY_MIN_MS, LATENCY_GROWTH))
+        self.buckets[b] = self.buckets.get(b, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def merge(self, other):
+        for b, n in other.buckets.items():
+            self.buckets[b] = self.buckets.get(b, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen > rank:
+                # geometric midpoint of the bucket
+                return min(LATENCY_MIN_MS * LATENCY_GROWTH ** (b + 0.5), self.max)
+        return self.max
+
+
+class LogStats:
+    def __init__(self, top_capacity=1000):
+        self.turns = 0
+        self.fallbacks = 0
+        self.bad_lines = 0
+        self.tags = {}              # tag -> [turns, fallbacks, confidence sum]
+        self.confidence = [0] * CONFIDENCE_BINS
+        self.hours = [0] * 24
+        self.first_ts = None
+        self.last_ts = None
+        self.latency = LatencyHistogram()
+        self.unmatched = SpaceSaving(top_capacity)
+
+    def add(self, ts, user, bot, tag=None, confidence=None, latency_ms=None, fallback=None):
+        if fallback is None:
+            fallback = bot.startswith(FALLBACK_PREFIX)
+        self.turns += 1
+        if ts:
+            if len(ts) >= 13 and ts[11:13].isdigit():
+                self.hours[int(ts[11:13])] += 1
+            # ISO timestamps compare correctly as strings
+            if self.first_ts is None or ts < self.first_ts:
+                self.first_ts = ts
+            if self.last_ts is None or ts > self.last_ts:
+                self.last_ts = ts
+        if fallback:
+            self.fallbacks += 1
+            self.unmatched.add(_SPACES.sub(" ", user.strip().lower()))
+        if tag is not None:
+            entry = self.tags.setdefault(tag, [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += bool(fallback)
+            entry[2] += confidence or 0.0
+        if confidence is not None:
+            self.confidence[min(int(confidence * CONFIDENCE_BINS), CONFIDENCE_BINS - 1)] += 1
+        if latency_ms is not None:
+            self.latency.add(latency_ms)
+
+    def merge(self, other):
+        self.turns += other.turns
+        self.fallbacks += other.fallbacks
+        self.bad_lines += other.bad_lines
+        for tag, (n, fb, conf) in other.tags.items():
+            entry = self.tags.setdefault(tag, [0, 0, 0.0])
+            entry[0] += n
+            entry[1] += fb
+            entry[2] += conf
+        self.confidence = [a + b for a, b in zip(self.confidence, other.confidence)]
+        self.hours = [a + b for a, b in zip(self.hours, other.hours)]
+        for ts in (other.first_ts, other.last_ts):
+            if ts is not None:
+                self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+                self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        self.latency.merge(other.latency)
+        self.unmatched.merge(other.unmatched)
+        return self
+
+    def report(self, top=20):
+        def rate(part, whole):
+            return round(part / whole, 4) if whole else None
+
+        return {
+            "turns": self.turns,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": rate(self.fallbacks, self.turns),
+            "bad_lines": self.bad_lines,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "latency_ms": {
+                "count": self.latency.count,
+                "mean": self.latency.total / self.latency.count if self.latency.count else None,
+                "p50": self.latency.quantile(0.50),
+                "p95": self.latency.quantile(0.95),
+                "p99": self.latency.quantile(0.99),
+                "max": self.latency.max if self.latency.count else None,
+            },
+            "tags": {
+                tag: {"turns": n, "fallbacks": fb, "fallback_rate": rate(fb, n),
+                      "mean_confidence": conf / n}
+                for tag, (n, fb, conf) in sorted(self.tags.items(), key=lambda kv: -kv[1][0])
+            },
+            "confidence_histogram": {
+                f"{i / CONFIDENCE_BINS:.2f}-{(i + 1) / CONFIDENCE_BINS:.2f}": n
+                for i, n in enumerate(self.confidence)
+            },
+            "turns_per_hour": {f"{h:02d}": n for h, n in enumerate(self.hours)},
+            "top_unmatched": [{"text": text, "count": count, "error": error}
+                              for text, count, error in self.unmatched.top(top)],
+        }
+
+
+# -----------------------------
+# Parsing
+# -----------------------------
+def detect_format(path):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                return "jsonl" if line.lstrip().startswith(b"{") else "legacy"
+    return "jsonl"
+
+
+def _lines(f, end):
+    """Lines of a binary file that start before byte offset `end` (None = EOF)."""
+    while end is None or f.tell() < end:
+        line = f.readline()
+        if not line:
+            return
+        yield line.decode("utf-8", errors="replace")
+
+
+def parse_jsonl(lines, stats):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            r = json.loads(line)
+            stats.add(r.get("ts"), r.get("user", ""), r.get("bot", ""), tag=r.get("tag"),
+                      confidence=r.get("confidence"), latency_ms=r.get("latency_ms"),
+                      fallback=r.get("fallback"))
+        except (ValueError, AttributeError, TypeError):
+            stats.bad_lines += 1
+
+
+def parse_legacy(lines, stats, f=None):
+    """
+    "<ts> USER: ..." followed by "<ts> BOT: ...". A BOT line without its
+    USER line (the turn started in the previous chunk) is skipped; a USER
+    line at the end of the range reads on into the next chunk for its BOT.
+    """
+    ts = user = None
+    for line in lines:
+        if " USER: " in line:
+            ts, user = line.split(" USER: ", 1)
+            user = user.strip()
+        elif " BOT: " in line and user is not None:
+            stats.add(ts, user, line.split(" BOT: ", 1)[1].strip())
+            ts = user = None
+    if user is not None and f is not None:
+        line = f.readline().decode("utf-8", errors="replace")
+        if " BOT: " in line:
+            stats.add(ts, user, line.split(" BOT: ", 1)[1].strip())
+
+
+def analyze_range(path, fmt, start, end, top_capacity=1000):
+    """Aggregate the lines starting in [start, end) of `path` (the whole file if end is None)."""
+    stats = LogStats(top_capacity)
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rb") as f:
+        if start:
+            # the line straddling `start` belongs to the previous range
+            f.seek(start - 1)
+            f.readline()
+        lines = _lines(f, end)
+        if fmt == "jsonl":
+            parse_jsonl(lines, stats)
+        else:
+            parse_legacy(lines, stats, f)
+    return stats
+
+
+def plan_tasks(paths, chunk_bytes, top_capacity):
+    tasks = []
+    for path in paths:
+        fmt = detect_format(path)
+        size = os.path.getsize(path)
+        if str(path).endswith(".gz") or size <= chunk_bytes:
+            # gzip streams can't be entered mid-way
+            tasks.append((str(path), fmt, 0, None, top_capacity))
+            continue
+        for start in range(0, size, chunk_bytes):
+            end = start + chunk_bytes
+            tasks.append((str(path), fmt, start, end if end < size else None, top_capacity))
+    return tasks
+
+
+def _run_task(task):
+    return analyze_range(*task)
+
+
+def analyze(paths, jobs=None, chunk_mb=64, top_capacity=1000):
+    tasks = plan_tasks(paths, int(chunk_mb * 1024 * 1024), top_capacity)
+    total = LogStats(top_capacity)
+    if jobs == 1 or len(tasks) == 1:
+        for task in tasks:
+            total.merge(_run_task(task))
+        return total
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for stats in pool.map(_run_task, tasks):
+            total.merge(stats)
+    return total
+
+
+# -----------------------------
+# Output
+# -----------------------------
+def print_report(report, top):
+    def fmt(value, spec=".2f"):
+        return "-" if value is None else format(value, spec)
+
+    print(f"Turns: {report['turns']}  ({report['first_ts']} .. {report['last_ts']})")
+    print(f"Fallbacks: {report['fallbacks']}  rate {fmt(report['fallback_rate'], '.1%')}")
+    if report["bad_lines"]:
+        print(f"Unparseable lines: {report['bad_lines']}")
+
+    lat = report["latency_ms"]
+    if lat["count"]:
+        print(f"\nLatency (ms, {lat['count']} turns): mean {fmt(lat['mean'])}  p50 {fmt(lat['p50'])}  "
+              f"p95 {fmt(lat['p95'])}  p99 {fmt(lat['p99'])}  max {fmt(lat['max'])}")
+
+    if report["tags"]:
+        print(f"\n{'tag':<28} | {'turns':>7} | {'fallback':>8} | {'mean conf':>9}")
+        print("-" * 62)
+        for tag, t in report["tags"].items():
+            print(f"{tag:<28} | {t['turns']:>7} | {fmt(t['fallback_rate'], '.1%'):>8} | "
+                  f"{t['mean_confidence']:>9.3f}")
+
+        print("\nConfidence:")
+        peak = max(report["confidence_histogram"].values()) or 1
+        for label, n in report["confidence_histogram"].items():
+            print(f"  {label} {n:>7} {'#' * round(40 * n / peak)}")
+
+    print("\nTurns per hour of day:")
+    peak = max(report["turns_per_hour"].values()) or 1
+    for hour, n in report["turns_per_hour"].items():
+        print(f"  {hour}:00 {n:>7} {'#' * round(40 * n / peak)}")
+
+    print(f"\nTop {top} unmatched messages:")
+    for item in report["top_unmatched"]:
+        approx = f" (±{item['error']})" if item["error"] else ""
+        print(f"  {item['count']:>6}{approx}  {item['text']}")
+
+
+def default_paths():
+    paths = [BASE / "logs.txt"] + sorted(BASE.glob("conversations*.jsonl*"))
+    return [p for p in paths if p.exists()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate HealthMate conversation logs")
+    parser.add_argument("paths", nargs="*", help="Log files (default: logs.txt and conversations*.jsonl*)")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=float, default=64, help="Bytes per worker task, in MB")
+    parser.add_argument("--top", type=int, default=20, help="Unmatched messages to list")
+    parser.add_argument("--top-capacity", type=int, default=1000,
+                        help="Slots of the approximate top-k counter")
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    paths = args.paths or default_paths()
+    if not paths:
+        parser.error("no log files found")
+
+    report = analyze(paths, args.jobs, args.chunk_mb, args.top_capacity).report(args.top)
+    print_report(report, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmark_inference.py
+# Messages/sec of the HealthMate classifier: one get_response per message
+# vs get_responses batches of 1-512, and the MicroBatcher under concurrency.
+#
+#   python benchmark_inference.py
+#   python benchmark_inference.py --messages 4096 --threads 32
+import argparse
+import contextlib
+import io
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import chatbot
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+
+def sample_messages(n, seed=42):
+    """Intent patterns with a random suffix so every message misses the cache."""
+    rng = random.Random(seed)
+    patterns = [p for intent in chatbot.intents["intents"] for p in intent["patterns"]]
+    return [f"{rng.choice(patterns)} {i}" for i in range(n)]
+
+
+def throughput(func, messages):
+    chatbot.classification_cache.clear()
+    start = time.perf_counter()
+    func(messages)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def single(messages):
+    # get_response prints debug lines for every message
+    with contextlib.redirect_stdout(io.StringIO()):
+        for m in messages:
+            chatbot.get_response(m)
+
+
+def batched(size):
+    def run(messages):
+        for i in range(0, len(messages), size):
+            chatbot.get_responses(messages[i:i + size])
+    return run
+
+
+def micro_batched(threads, max_batch_size, max_wait):
+    def run(messages):
+        batcher = chatbot.MicroBatcher(max_batch_size=max_batch_size, max_wait=max_wait)
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(batcher.get_response, messages))
+        batcher.close()
+        return batcher.stats()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HealthMate inference throughput")
+    parser.add_argument("--messages", type=int, default=2048)
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent callers for the micro-batcher")
+    parser.add_argument("--max-wait", type=float, default=0.005, help="Micro-batch window in seconds")
+    args = parser.parse_args()
+
+    messages = sample_messages(args.messages)
+
+    base = throughput(single, messages)
+    print(f"{'mode':<22} | {'msgs/sec':>10} | {'speedup':>8}")
+    print("-" * 47)
+    print(f"{'get_response':<22} | {base:>10.0f} | {1:>7.1f}x")
+    for size in BATCH_SIZES:
+        rate = throughput(batched(size), messages)
+        print(f"{'get_responses b=' + str(size):<22} | {rate:>10.0f} | {rate / base:>7.1f}x")
+
+    run = micro_batched(args.threads, 64, args.max_wait)
+    chatbot.classification_cache.clear()
+    start = time.perf_counter()
+    stats = run(messages)
+    rate = len(messages) / (time.perf_counter() - start)
+    print(f"{'MicroBatcher x' + str(args.threads):<22} | {rate:>10.0f} | {rate / base:>7.1f}x"
+          f"   (avg batch {stats['avg_batch_size']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmark_preprocessing.py
+# Parity check and throughput of the fast preprocessing engine vs NLTK.
+#
+# Parity: the fast engine (regex tokenizer + lemma dictionary built from the
+# intents, as train_model.py does) must produce the same tokens as
+# nltk.word_tokenize, and the same features as the NLTK path, on every
+# intent pattern, every logged user message and a set of generated
+# variants. Lemmas are compared with out-of-vocabulary words masked: a word
+# whose lemma never occurs in training ("kids" when "kid" was never seen)
+# can't form a feature, so its spelling doesn't matter. Exits with status 1
+# on any mismatch.
+#
+#   python benchmark_preprocessing.py
+#   python benchmark_preprocessing.py --extra my_messages.txt --repeat 5
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from preprocessing import FastPreprocessor, NltkPreprocessor, build_lemma_dict
+
+BASE = Path(__file__).parent
+
+# inflections, contractions and punctuation that exercise the tokenizer rules
+VARIANTS = [
+    "{} please", "{}?", "{}!!", "I can't {}", "{}, thanks", "\"{}\"", "({})",
+    "{}... really", "it's {}", "{} -- now", "my kids' {}", "{}. cannot sleep",
+    "{}s and headaches", "gonna {}", "{}; {}", "i'm {} since 10:30",
+]
+
+
+def load_corpus(extra=None, seed=42):
+    with open(BASE / "intents.json", encoding="utf-8") as f:
+        patterns = [p for intent in json.load(f)["intents"] for p in intent["patterns"]]
+    messages = []
+    log_path = BASE / "logs.txt"
+    if log_path.exists():
+        with open(log_path, encoding="utf-8") as f:
+            messages = [line.split(" USER: ", 1)[1].strip() for line in f if " USER: " in line]
+    if extra:
+        with open(extra, encoding="utf-8") as f:
+            messages += [line.strip() for line in f if line.strip()]
+
+    rng = random.Random(seed)
+    variants = [rng.choice(VARIANTS).format(*[rng.choice(patterns)] * 2) for _ in range(2000)]
+    return patterns, patterns + messages + variants
+
+
+def mask_unknown(processed, vocabulary):
+    return [t if t in vocabulary else "<unk>" for t in processed.split()]
+
+
+def check_parity(fast, nltk_engine, corpus, vocabulary, show=10):
+    token_diffs, text_diffs = [], []
+    for text in corpus:
+        if fast.tokenize(text) != nltk_engine.tokenize(text):
+            token_diffs.append(text)
+        elif mask_unknown(fast(text), vocabulary) != mask_unknown(nltk_engine(text), vocabulary):
+            text_diffs.append(text)
+
+    print(f"Parity on {len(corpus)} messages: "
+          f"{len(token_diffs)} token mismatches, {len(text_diffs)} feature mismatches")
+    for text in (token_diffs + text_diffs)[:show]:
+        print(f"  {text!r}\n    fast: {fast(text)!r}\n    nltk: {nltk_engine(text)!r}")
+    return not token_diffs and not text_diffs
+
+
+def throughput(engine, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            engine(text)
+    return len(corpus) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast vs NLTK preprocessing")
+    parser.add_argument("--extra", help="File with extra messages, one per line")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    patterns, corpus = load_corpus(args.extra)
+    try:
+        nltk_engine = NltkPreprocessor()
+        nltk_engine("warm up wordnet")
+    except LookupError as e:
+        print(f"NLTK data missing, cannot compare: {e}")
+        sys.exit(2)
+
+    start = time.perf_counter()
+    fast = FastPreprocessor(build_lemma_dict(patterns))
+    print(f"Lemma dictionary: {len(fast.lemmas)} entries in {time.perf_counter() - start:.2f}s")
+
+    vocabulary = {t for p in patterns for t in nltk_engine(p).split()}
+    ok = check_parity(fast, nltk_engine, corpus, vocabulary)
+
+    nltk_rate = throughput(nltk_engine, corpus, args.repeat)
+    fast_rate = throughput(fast, corpus, args.repeat)
+    print(f"\n{'engine':<8} | {'msgs/sec':>10} | {'µs/msg':>8}")
+    print("-" * 32)
+    for name, rate in (("nltk", nltk_rate), ("fast", fast_rate)):
+        print(f"{name:<8} | {rate:>10.0f} | {1e6 / rate:>8.1f}")
+    print(f"speedup: {fast_rate / nltk_rate:.1f}x")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,509 @@
 # chatbot.py
 import json
+import os
 import random
+import re
 import pickle
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from pathlib import Path
-from datetime import datetime
-import nltk
-from nltk.stem import WordNetLemmatizer
+import numpy as np
+
+from conversation_logger import ConversationLogger
+from preprocessing import NltkPreprocessor, load_from_manifest
 
 # -----------------------------
 # Paths
 # -----------------------------
 BASE = Path(__file__).parent
 MODEL_PATH = BASE / "healthmate_model.pkl"
+ARTIFACT_DIR = BASE / "healthmate_model"
+ONLINE_MODEL_PATH = BASE / "healthmate_online.pkl"
 INTENTS_PATH = BASE / "intents.json"
-LOG_PATH = BASE / "logs.txt"
+CONVERSATION_LOG_PATH = BASE / "conversations.jsonl"
 
 # -----------------------------
-# Load model + data
+# Inference engine
 # -----------------------------
-pipeline = pickle.load(open(MODEL_PATH, "rb"))
+class InferenceEngine:
+    """
+    TF-IDF + linear classifier inference straight from the artifact that
+    train_model.export_artifact writes (healthmate_model/).
+
+    Arrays are opened with mmap_mode="r", so loading touches only the
+    manifest and page tables; worker processes share the OS page cache
+    instead of each unpickling its own copy. Mirrors TfidfVectorizer
+    (word n-grams, raw counts * idf, l2 norm) followed by
+    softmax(x @ coef + intercept). Exposes classes_ and predict_proba like
+    the sklearn Pipeline it replaces.
+    """
+
+    SUPPORTED_VERSION = 1
+
+    def __init__(self, artifact_dir=ARTIFACT_DIR):
+        artifact_dir = Path(artifact_dir)
+        self.artifact_dir = artifact_dir
+        with open(artifact_dir / "manifest.json", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest["version"] != self.SUPPORTED_VERSION:
+            raise ValueError(f"Unsupported model artifact version {self.manifest['version']}")
+        if self.manifest["link"] != "softmax":
+            raise ValueError(f"Unsupported link function {self.manifest['link']}")
+
+        tfidf = self.manifest["tfidf"]
+        self.lowercase = tfidf["lowercase"]
+        self.token_re = re.compile(tfidf["token_pattern"])
+        self.min_n, self.max_n = tfidf["ngram_range"]
+        self.sublinear_tf = tfidf["sublinear_tf"]
+        self.norm = tfidf["norm"]
+        self.classes_ = np.array(self.manifest["classes"])
+        self.calibration = self.manifest.get("calibration")
+        self.temperature = self.calibration["temperature"] if self.calibration else 1.0
+
+        self.vocab = np.load(artifact_dir / "vocab.npy", mmap_mode="r")
+        self.idf = np.load(artifact_dir / "idf.npy", mmap_mode="r")
+        self.coef = np.load(artifact_dir / "coef.npy", mmap_mode="r")
+        self.intercept = np.load(artifact_dir / "intercept.npy", mmap_mode="r")
+
+    def _ngrams(self, text):
+        tokens = self.token_re.findall(text.lower() if self.lowercase else text)
+        grams = []
+        for n in range(self.min_n, self.max_n + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def transform(self, texts):
+        """
+        TF-IDF features of a batch as flat (row, column, value) arrays.
+
+        All n-grams of the batch are looked up with a single binary search
+        over the sorted vocabulary.
+        """
+        rows, terms, tf = [], [], []
+        for i, text in enumerate(texts):
+            counts = {}
+            for gram in self._ngrams(text):
+                counts[gram] = counts.get(gram, 0) + 1
+            rows.extend([i] * len(counts))
+            terms.extend(counts)
+            tf.extend(counts.values())
+        if not terms:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+
+        terms = np.array(terms)
+        pos = np.minimum(np.searchsorted(self.vocab, terms), len(self.vocab) - 1)
+        known = self.vocab[pos] == terms
+        rows = np.array(rows, dtype=np.intp)[known]
+        cols = pos[known]
+        tf = np.array(tf, dtype=np.float64)[known]
+        if self.sublinear_tf:
+            tf = np.log(tf) + 1
+        values = tf * self.idf[cols]
+
+        if self.norm == "l2":
+            norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))
+        elif self.norm == "l1":
+            norms = np.bincount(rows, weights=np.abs(values), minlength=len(texts))
+        else:
+            norms = None
+        if norms is not None and values.size:
+            values /= norms[rows]
+        return rows, cols, values
+
+    def decision_function(self, texts):
+        scores = np.tile(np.asarray(self.intercept), (len(texts), 1))
+        rows, cols, values = self.transform(texts)
+        if values.size:
+            np.add.at(scores, rows, self.coef[cols] * values[:, None])
+        return scores
+
+    def predict_proba(self, texts, temperature=None):
+        """Class probabilities, calibrated unless temperature=1 is passed."""
+        scores = self.decision_function(texts)
+        temperature = self.temperature if temperature is None else temperature
+        if temperature != 1.0:
+            scores /= temperature
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+
+# "auto": the artifact if present, else the pickle; "online": the
+# incrementally trained model from online_learning.py, reloaded on change
+MODEL_BACKEND = os.getenv("HEALTHMATE_MODEL", "auto")
+
+# (model, preprocessor) swapped as one reference, so a reload can never pair
+# a new model with the old preprocessing
+_active = None
+_model_lock = threading.Lock()
+
+def _load_active():
+    if MODEL_BACKEND == "online":
+        with open(ONLINE_MODEL_PATH, "rb") as f:
+            model = pickle.load(f)
+        return model, model.make_preprocessor()
+    if (ARTIFACT_DIR / "manifest.json").exists():
+        model = InferenceEngine(ARTIFACT_DIR)
+        return model, load_from_manifest(ARTIFACT_DIR, model.manifest)
+    with open(MODEL_PATH, "rb") as f:
+        return pickle.load(f), NltkPreprocessor()
 
+def get_active():
+    """Load the classifier and its preprocessor on first use."""
+    global _active
+    if _active is None:
+        with _model_lock:
+            if _active is None:
+                _active = _load_active()
+    return _active
+
+def get_model():
+    return get_active()[0]
+
+def get_preprocessor():
+    """The preprocessing engine the loaded model was trained with."""
+    return get_active()[1]
+
+def reload_model():
+    """Load the model again and swap it in; requests in flight finish on the old one."""
+    global _active
+    new = _load_active()
+    with _model_lock:
+        _active = new
+    # cached classifications came from the old model
+    classification_cache.clear()
+
+def watch_model(interval: float = 5.0):
+    """Reload the online model whenever its file is replaced (background thread)."""
+    def run():
+        last = ONLINE_MODEL_PATH.stat().st_mtime_ns if ONLINE_MODEL_PATH.exists() else None
+        while True:
+            time.sleep(interval)
+            try:
+                mtime = ONLINE_MODEL_PATH.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if mtime != last:
+                last = mtime
+                try:
+                    reload_model()
+                    print("[INFO] Reloaded online model")
+                except Exception as e:
+                    print(f"[WARN] Keeping current model, reload failed: {e}")
+
+    thread = threading.Thread(target=run, name="model-watcher", daemon=True)
+    thread.start()
+    return thread
+
+# -----------------------------
+# Load data
+# -----------------------------
 with open(INTENTS_PATH, "r", encoding="utf-8") as f:
     intents = json.load(f)
 
-lemmatizer = WordNetLemmatizer()
+# tag -> responses, built once instead of scanning intents per message
+RESPONSES = {intent["tag"]: intent["responses"] for intent in intents["intents"]}
+
+FALLBACK_RESPONSE = "I'm sorry — I didn't understand that. Could you rephrase or provide more details?"
+
+# used when the model carries no per-intent threshold table
+DEFAULT_THRESHOLD = 0.1
+# ranked intents kept per cached classification
+TOP_K = 3
+
+# -----------------------------
+# Classification cache
+# -----------------------------
+class LRUCache:
+    """
+    Least-recently-used cache with hit/miss counters.
+
+    Shared by callers, the micro-batcher worker and the model watcher, so
+    every operation holds a lock (move_to_end/popitem are not atomic).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# raw message -> (processed text, ((tag, probability), ...) best first, TOP_K long)
+classification_cache = LRUCache(maxsize=4096)
 
 # -----------------------------
 # Helper functions
 # -----------------------------
 def preprocess(text: str) -> str:
-    tokens = nltk.word_tokenize(text.lower())
-    lemmas = [lemmatizer.lemmatize(t) for t in tokens if t.isalnum()]
-    return " ".join(lemmas)
+    return get_preprocessor()(text)
 
-def get_response(message: str, threshold: float = 0.1):
-    msg_proc = preprocess(message)
-    probs = pipeline.predict_proba([msg_proc])[0]
-    idx = probs.argmax()
-    confidence = probs[idx]
-    predicted_tag = pipeline.classes_[idx]
+def _rank(classes, probs, k=TOP_K):
+    top = np.argsort(-probs, kind="stable")[:k]
+    return tuple((str(classes[i]), float(probs[i])) for i in top)
 
-    print(f"[DEBUG] Input: {message}")
-    print(f"[DEBUG] Processed: {msg_proc}")
-    print(f"[DEBUG] Predicted tag: {predicted_tag}")
-    print(f"[DEBUG] Confidence: {confidence:.3f}")
+def _classify_ranked(message: str):
+    """(processed text, ranked intents), memoized on the message."""
+    # preprocess lowercases and ignores surrounding whitespace, so
+    # "Hi", "hi " and "HI" share one entry
+    key = message.strip().lower()
+    cached = classification_cache.get(key)
+    if cached is not None:
+        return cached
 
-    # low confidence -> fallback
-    if confidence < threshold:
-        return "I'm sorry — I didn't understand that. Could you rephrase or provide more details?"
+    model, preprocessor = get_active()
+    msg_proc = preprocessor(message)
+    result = (msg_proc, _rank(model.classes_, model.predict_proba([msg_proc])[0]))
+    classification_cache.put(key, result)
+    return result
+
+def classify(message: str):
+    """Return (processed text, tag, confidence), memoized on the message."""
+    msg_proc, ranked = _classify_ranked(message)
+    tag, confidence = ranked[0]
+    return msg_proc, tag, confidence
 
-    for intent in intents["intents"]:
-        if intent["tag"] == predicted_tag:
-            return random.choice(intent["responses"])
+def classify_top(message: str, k: int = TOP_K) -> dict:
+    """
+    The k most likely intents with their (calibrated) probabilities.
 
+    margin is the gap between the best two: a small margin means the
+    classifier is torn between intents even when the top score clears
+    its threshold.
+    """
+    if k > TOP_K:
+        model, preprocessor = get_active()
+        msg_proc = preprocessor(message)
+        ranked = _rank(model.classes_, model.predict_proba([msg_proc])[0], k)
+    else:
+        msg_proc, ranked = _classify_ranked(message)
+        ranked = ranked[:k]
+    tag, confidence = ranked[0]
+    return {
+        "processed": msg_proc,
+        "tag": tag,
+        "confidence": confidence,
+        "margin": confidence - ranked[1][1] if len(ranked) > 1 else confidence,
+        "threshold": intent_threshold(tag),
+        "intents": [{"tag": t, "confidence": p} for t, p in ranked],
+    }
+
+def classify_many(messages):
+    """Classify a list of messages with a single predict_proba call for the cache misses."""
+    results = [None] * len(messages)
+    pending = {}
+    for i, message in enumerate(messages):
+        key = message.strip().lower()
+        cached = classification_cache.get(key)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.setdefault(key, []).append(i)
+
+    if pending:
+        model, preprocessor = get_active()
+        keys = list(pending)
+        processed = [preprocessor(messages[pending[key][0]]) for key in keys]
+        probs = model.predict_proba(processed)
+        for key, msg_proc, row in zip(keys, processed, probs):
+            result = (msg_proc, _rank(model.classes_, row))
+            classification_cache.put(key, result)
+            for i in pending[key]:
+                results[i] = result
+    return [(msg_proc, *ranked[0]) for msg_proc, ranked in results]
+
+def intent_threshold(tag) -> float:
+    """Confidence a prediction of `tag` needs, from the model's calibration table."""
+    calibration = getattr(get_model(), "calibration", None)
+    if not calibration:
+        return DEFAULT_THRESHOLD
+    return calibration["thresholds"].get(tag, calibration["default_threshold"])
+
+def choose_response(predicted_tag, confidence, threshold: float = None):
+    """threshold=None uses the per-intent table learned at training time."""
+    if threshold is None:
+        threshold = intent_threshold(predicted_tag)
+    if confidence < threshold:
+        return FALLBACK_RESPONSE
+    responses = RESPONSES.get(predicted_tag)
+    if responses:
+        return random.choice(responses)
     return "Sorry, something went wrong."
 
-def log_conversation(user_msg, bot_msg):
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(f"{datetime.now().isoformat()} USER: {user_msg}\n")
-        f.write(f"{datetime.now().isoformat()} BOT: {bot_msg}\n")
-        f.write("-" * 50 + "\n")
+def get_responses(messages, threshold: float = None):
+    """Batch version of get_response: one dict (tag, confidence, response) per message."""
+    return [
+        {"tag": tag, "confidence": confidence, "response": choose_response(tag, confidence, threshold)}
+        for _, tag, confidence in classify_many(messages)
+    ]
+
+def answer(message: str, threshold: float = None) -> dict:
+    """Classify and reply, returning the details the conversation log records."""
+    start = time.perf_counter()
+    top = classify_top(message)
+    if threshold is None:
+        threshold = top["threshold"]
+    return {
+        "response": choose_response(top["tag"], top["confidence"], threshold),
+        "tag": top["tag"],
+        "confidence": top["confidence"],
+        "margin": top["margin"],
+        "processed": top["processed"],
+        "fallback": top["confidence"] < threshold,
+        "latency_ms": (time.perf_counter() - start) * 1000,
+    }
+
+def get_response(message: str, threshold: float = None):
+    result = answer(message, threshold)
+
+    print(f"[DEBUG] Input: {message}")
+    print(f"[DEBUG] Processed: {result['processed']}")
+    print(f"[DEBUG] Predicted tag: {result['tag']}")
+    print(f"[DEBUG] Confidence: {result['confidence']:.3f} (margin {result['margin']:.3f})")
+
+    return result["response"]
+
+# -----------------------------
+# Micro-batching
+# -----------------------------
+class MicroBatcher:
+    """
+    Groups concurrent get_response calls into batched classifications.
+
+    Callers submit a message and get a Future. A worker thread takes the
+    first waiting message, keeps collecting for up to `max_wait` seconds
+    (or until `max_batch_size` messages), then classifies the whole group
+    with one get_responses call.
+    """
+
+    def __init__(self, max_batch_size: int = 64, max_wait: float = 0.005, threshold: float = None):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.threshold = threshold
+        self._queue = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self.messages = 0
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, message: str) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((message, future))
+        return future
+
+    def get_response(self, message: str, timeout: float = None) -> dict:
+        return self.submit(message).result(timeout)
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            try:
+                results = get_responses([message for message, _ in batch], self.threshold)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+            self.batches += 1
+            self.messages += len(batch)
+
+    def close(self):
+        """Finish queued messages and stop the worker."""
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "avg_batch_size": self.messages / self.batches if self.batches else 0.0,
+        }
+
+conversation_logger = None
+
+def get_conversation_logger():
+    global conversation_logger
+    if conversation_logger is None:
+        conversation_logger = ConversationLogger(CONVERSATION_LOG_PATH)
+    return conversation_logger
+
+def log_conversation(user_msg, bot_msg, **details):
+    """Queue one turn for the JSON-lines log (written by a background thread)."""
+    get_conversation_logger().log(user_msg, bot_msg, **details)
 
 # -----------------------------
 # Main Chat Loop
 # -----------------------------
 def main():
+    if MODEL_BACKEND == "online":
+        watch_model()
     print("🤖 HealthMate: Hello! I’m HealthMate — your AI medical assistant. Type 'quit' to exit.\n")
     while True:
         user_input = input("You: ").strip()
@@ -72,9 +511,10 @@ def main():
             print("HealthMate: Goodbye! Take care of your health.")
             break
 
-        bot_reply = get_response(user_input)
+        result = answer(user_input)
+        bot_reply = result.pop("response")
         print("HealthMate:", bot_reply, "\n")
-        log_conversation(user_input, bot_reply)
+        log_conversation(user_input, bot_reply, **result)
 
 if __name__ == "__main__":
     main()
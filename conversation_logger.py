@@ -0,0 +1,157 @@
+# conversation_logger.py
+# Buffered JSON-lines conversation log with rotation and compression.
+#
+# log() only appends a dict to an in-memory buffer; a background thread
+# serializes and writes the buffer every `flush_interval` seconds (or as
+# soon as `batch_size` records are waiting), rotates the file by size or
+# age and gzips rotated files, so none of that cost lands on the request.
+#
+# One JSON object per line:
+#   {"ts": "2025-11-02T12:42:22.086", "session": "...", "user": "hello",
+#    "bot": "Hi!", "tag": "greeting_hello", "confidence": 0.91,
+#    "latency_ms": 1.4, "processed": "hello", "fallback": false}
+import atexit
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+class ConversationLogger:
+    def __init__(self, path, flush_interval: float = 1.0, batch_size: int = 256,
+                 max_bytes: int = 50 * 1024 * 1024, rotate_interval: float = 24 * 3600,
+                 backup_count: int = 14, max_buffer: int = 100_000):
+        """
+        path: active log file; rotated files sit next to it as
+            <stem>-YYYYmmdd-HHMMSS.jsonl.gz
+        max_bytes / rotate_interval: rotate when the file grows past this
+            size or is older than this many seconds (0 disables either)
+        backup_count: rotated files to keep (0 keeps all)
+        max_buffer: records held in memory before new ones are dropped
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.max_buffer = max_buffer
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._opened_at = self._first_record_time() if self.path.exists() else time.time()
+        self._worker = threading.Thread(target=self._run, name="conversation-logger", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _first_record_time(self) -> float:
+        """
+        When the existing file was started: the timestamp of its first
+        record (its mtime is only the last write), else its mtime.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return datetime.fromisoformat(json.loads(f.readline())["ts"]).timestamp()
+        except (ValueError, KeyError, TypeError):
+            return self.path.stat().st_mtime
+
+    def log(self, user_msg, bot_msg, tag=None, confidence=None, latency_ms=None,
+            processed=None, session=None, **extra):
+        record = {"ts": time.time(), "session": session, "user": user_msg, "bot": bot_msg,
+                  "tag": tag, "confidence": confidence, "latency_ms": latency_ms,
+                  "processed": processed}
+        record.update(extra)
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[WARN] Conversation log flush failed: {e}")
+
+    def flush(self):
+        """Write buffered records to disk (called by the worker; safe to call directly)."""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return
+
+        lines = []
+        for record in records:
+            record["ts"] = datetime.fromtimestamp(record["ts"]).isoformat(timespec="milliseconds")
+            lines.append(json.dumps(record, ensure_ascii=False))
+
+        with self._write_lock:
+            self._maybe_rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            self.written += len(records)
+
+    def _maybe_rotate(self):
+        if not self.path.exists():
+            self._opened_at = time.time()
+            return
+        too_big = self.max_bytes and self.path.stat().st_size >= self.max_bytes
+        too_old = self.rotate_interval and time.time() - self._opened_at >= self.rotate_interval
+        if too_big or too_old:
+            self.rotate()
+
+    def rotate(self):
+        """Move the active file aside, gzip it and prune old rotated files."""
+        if not self.path.exists():
+            return
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        rotated = self.path.with_name(f"{self.path.stem}-{stamp}{self.path.suffix}")
+        n = 1
+        while rotated.exists() or Path(f"{rotated}.gz").exists():
+            rotated = self.path.with_name(f"{self.path.stem}-{stamp}-{n}{self.path.suffix}")
+            n += 1
+        os.replace(self.path, rotated)
+        self._opened_at = time.time()
+        with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        rotated.unlink()
+        self.rotations += 1
+
+        if self.backup_count:
+            backups = sorted(self.path.parent.glob(f"{self.path.stem}-*{self.path.suffix}.gz"),
+                             key=lambda p: p.stat().st_mtime)
+            for old in backups[:-self.backup_count]:
+                old.unlink()
+
+    def close(self):
+        """Stop the worker and write whatever is still buffered."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._worker.join()
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {"buffered": buffered, "written": self.written, "dropped": self.dropped,
+                "rotations": self.rotations}
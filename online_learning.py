@@ -0,0 +1,256 @@
+# online_learning.py
+# Incrementally trained variant of the HealthMate intent classifier.
+#
+# HashingVectorizer needs no fitted vocabulary and SGDClassifier(log_loss)
+# supports partial_fit, so the model can keep learning from newly labelled
+# utterances without a full retrain. Every update is written atomically
+# (temp file + os.replace); chatbot.py picks the new file up without a
+# restart when run with HEALTHMATE_MODEL=online.
+#
+#   python online_learning.py init                      # bootstrap from intents.json
+#   python online_learning.py candidates to_label.jsonl # fallback messages from the logs
+#   python online_learning.py update labelled.jsonl     # learn {"text", "tag"} lines
+import argparse
+import gzip
+import json
+import os
+import pickle
+import random
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from preprocessing import FastPreprocessor, get_preprocessor
+
+BASE = Path(__file__).parent
+INTENTS_PATH = BASE / "intents.json"
+LOG_PATH = BASE / "logs.txt"
+CONVERSATION_LOG_PATH = BASE / "conversations.jsonl"
+ONLINE_MODEL_PATH = BASE / "healthmate_online.pkl"
+
+FALLBACK_PREFIX = "I'm sorry — I didn't understand that."
+
+
+class OnlineModel:
+    """
+    HashingVectorizer + SGDClassifier with the predict_proba/classes_
+    interface chatbot.py expects. Carries its preprocessing spec (engine
+    and lemma dictionary) so inference preprocesses text the same way the
+    model was trained.
+    """
+
+    def __init__(self, classes, n_features=2 ** 16, ngram_range=(1, 2), preprocessing=None):
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, ngram_range=ngram_range,
+            alternate_sign=False, norm="l2",
+        )
+        self.clf = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42)
+        self.classes_ = np.array(sorted(classes))
+        self.preprocessing = preprocessing or {"engine": "nltk"}
+        self.updates = 0
+        self.samples_seen = 0
+
+    def make_preprocessor(self):
+        if self.preprocessing["engine"] == "fast":
+            return FastPreprocessor(self.preprocessing.get("lemmas", {}))
+        return get_preprocessor(self.preprocessing["engine"])
+
+    def partial_fit(self, processed_texts, tags):
+        """One SGD step over a batch of already-preprocessed texts."""
+        X = self.vectorizer.transform(processed_texts)
+        self.clf.partial_fit(X, tags, classes=self.classes_)
+        self.updates += 1
+        self.samples_seen += len(tags)
+
+    def predict_proba(self, processed_texts):
+        return self.clf.predict_proba(self.vectorizer.transform(processed_texts))
+
+
+def save_model(model, path=ONLINE_MODEL_PATH):
+    """Write to a temp file in the same directory, then rename over the old model."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(model, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_model(path=ONLINE_MODEL_PATH):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def load_intent_examples():
+    with open(INTENTS_PATH, encoding="utf-8") as f:
+        intents = json.load(f)["intents"]
+    return [(p, intent["tag"]) for intent in intents for p in intent["patterns"]]
+
+
+def read_labelled(path):
+    """(text, tag) pairs from a JSON-lines file; lines without a tag are skipped."""
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("tag"):
+                    examples.append((record["text"], record["tag"]))
+    return examples
+
+
+def train_batches(model, examples, preprocessor, batch_size=32, epochs=1, replay=None, replay_ratio=0.0, seed=42):
+    """
+    partial_fit over `examples` in shuffled batches.
+
+    With replay_ratio > 0 each batch is topped up with that fraction of
+    examples drawn from `replay` (the original intents), so the model keeps
+    what it knew while absorbing new utterances.
+    """
+    rng = random.Random(seed)
+    for _ in range(epochs):
+        examples = examples[:]
+        rng.shuffle(examples)
+        for i in range(0, len(examples), batch_size):
+            batch = examples[i:i + batch_size]
+            if replay and replay_ratio > 0:
+                batch = batch + rng.sample(replay, min(len(replay), int(len(batch) * replay_ratio)))
+            model.partial_fit([preprocessor(t) for t, _ in batch], [tag for _, tag in batch])
+
+
+def accuracy(model, preprocessor, examples):
+    probs = model.predict_proba([preprocessor(t) for t, _ in examples])
+    predicted = model.classes_[probs.argmax(axis=1)]
+    return float(np.mean(predicted == np.array([tag for _, tag in examples])))
+
+
+def cmd_init(args):
+    # pickle records a class by its module's name; run as a script this
+    # module is __main__, which chatbot.py could not resolve on load
+    from online_learning import OnlineModel
+
+    examples = load_intent_examples()
+    texts = [t for t, _ in examples]
+    if args.preprocessor == "fast":
+        from train_model import make_preprocessor
+        preprocessing = {"engine": "fast", "lemmas": make_preprocessor("fast", texts).lemmas}
+    else:
+        preprocessing = {"engine": "nltk"}
+
+    model = OnlineModel({tag for _, tag in examples}, n_features=2 ** args.hash_bits,
+                        preprocessing=preprocessing)
+    preprocessor = model.make_preprocessor()
+    train_batches(model, examples, preprocessor, batch_size=args.batch_size, epochs=args.epochs)
+    save_model(model, args.model)
+    print(f"Initialized {args.model}: {len(examples)} patterns, {len(model.classes_)} classes, "
+          f"train accuracy {accuracy(model, preprocessor, examples):.3f}")
+
+
+def cmd_update(args):
+    model = load_model(args.model)
+    preprocessor = model.make_preprocessor()
+    examples = read_labelled(args.labelled)
+
+    known = set(model.classes_)
+    unknown = [tag for _, tag in examples if tag not in known]
+    if unknown:
+        print(f"Skipping {len(unknown)} examples with unknown tags: {sorted(set(unknown))}")
+    examples = [(t, tag) for t, tag in examples if tag in known]
+    if not examples:
+        print("Nothing to learn.")
+        return
+
+    replay = load_intent_examples()
+    before = accuracy(model, preprocessor, examples)
+    train_batches(model, examples, preprocessor, batch_size=args.batch_size, epochs=args.epochs,
+                  replay=replay, replay_ratio=args.replay)
+    save_model(model, args.model)
+    print(f"Learned {len(examples)} examples in batches of {args.batch_size} "
+          f"(accuracy on them {before:.3f} -> {accuracy(model, preprocessor, examples):.3f}, "
+          f"on intents {accuracy(model, preprocessor, replay):.3f})")
+
+
+def conversation_log_paths():
+    """The gzipped logs rotated out by ConversationLogger (oldest first), then the active one."""
+    log = CONVERSATION_LOG_PATH
+    paths = sorted(log.parent.glob(f"{log.stem}-*{log.suffix}.gz"), key=lambda p: p.stat().st_mtime)
+    if log.exists():
+        paths.append(log)
+    return paths
+
+
+def fallback_messages():
+    """
+    User messages that got the fallback reply, from logs.txt and the
+    conversation log, rotated files included.
+    """
+    if LOG_PATH.exists():
+        user_msg = None
+        with open(LOG_PATH, encoding="utf-8") as f:
+            for line in f:
+                if " USER: " in line:
+                    user_msg = line.split(" USER: ", 1)[1].strip()
+                elif " BOT: " in line and user_msg:
+                    if line.split(" BOT: ", 1)[1].startswith(FALLBACK_PREFIX):
+                        yield user_msg
+                    user_msg = None
+    for path in conversation_log_paths():
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if record.get("fallback"):
+                        yield record["user"]
+
+
+def cmd_candidates(args):
+    """Write user messages that got the fallback reply, for labelling."""
+    seen = set()
+    with open(args.output, "w", encoding="utf-8") as out:
+        for user_msg in fallback_messages():
+            key = user_msg.lower()
+            if key not in seen:
+                seen.add(key)
+                out.write(json.dumps({"text": user_msg, "tag": ""}, ensure_ascii=False) + "\n")
+    print(f"Wrote {len(seen)} messages to {args.output}; fill in \"tag\" and run `update`")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online learning for the HealthMate classifier")
+    parser.add_argument("--model", default=str(ONLINE_MODEL_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("init", help="Bootstrap the online model from intents.json")
+    p.add_argument("--preprocessor", choices=["fast", "nltk"], default="fast")
+    p.add_argument("--hash-bits", type=int, default=16, help="log2 of the hashed feature space")
+    p.add_argument("--epochs", type=int, default=30)
+    p.add_argument("--batch-size", type=int, default=32)
+    p.set_defaults(func=cmd_init)
+
+    p = sub.add_parser("update", help="Learn from a JSON-lines file of {\"text\", \"tag\"}")
+    p.add_argument("labelled")
+    p.add_argument("--epochs", type=int, default=5)
+    p.add_argument("--batch-size", type=int, default=16)
+    p.add_argument("--replay", type=float, default=1.0,
+                   help="Intent patterns mixed into each batch, as a fraction of the batch")
+    p.set_defaults(func=cmd_update)
+
+    p = sub.add_parser("candidates", help="Extract fallback messages from the conversation logs for labelling")
+    p.add_argument("output")
+    p.set_defaults(func=cmd_candidates)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
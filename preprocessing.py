@@ -0,0 +1,203 @@
+# preprocessing.py
+# Text preprocessing engines shared by train_model.py and chatbot.py.
+#
+# Both engines turn a message into the space-joined string of lemmatized,
+# alphanumeric tokens the classifier is trained on:
+#   - NltkPreprocessor: nltk.word_tokenize + WordNetLemmatizer (the original path)
+#   - FastPreprocessor: a regex emulation of NLTK's Treebank tokenizer plus a
+#     lemma dictionary precomputed with WordNet at training time
+# The engine used for training is recorded in the model artifact, and
+# chatbot.py loads the same one, so training and inference features match.
+import json
+import re
+from pathlib import Path
+
+
+class NltkPreprocessor:
+    name = "nltk"
+
+    def __init__(self):
+        # imported here so the fast path never loads NLTK or WordNet
+        import nltk
+        from nltk.stem import WordNetLemmatizer
+        self._word_tokenize = nltk.word_tokenize
+        self._lemmatizer = WordNetLemmatizer()
+
+    def tokenize(self, text: str):
+        return [t for t in self._word_tokenize(text.lower()) if t.isalnum()]
+
+    def lemmatize(self, token: str) -> str:
+        return self._lemmatizer.lemmatize(token)
+
+    def __call__(self, text: str) -> str:
+        return " ".join(self.lemmatize(t) for t in self.tokenize(text))
+
+
+# -----------------------------
+# Treebank emulation
+# -----------------------------
+# Characters/sequences that NLTKWordTokenizer pads with spaces. Only the
+# alphanumeric tokens survive preprocessing, so padding them with a space
+# (instead of keeping them as tokens) gives the same result.
+_SEPARATORS = re.compile(
+    r"[;@#$%&?!*()\[\]{}<>\"«“‘„`»”’\u2012-\u2015]"
+    r"|[:,](?!\d)"          # "3,5" and "10:30" stay one (dropped) token
+    r"|--|''"
+    r"|\.(?:\.+"
+    # sentence-final period; word_tokenize finds these with Punkt, here any
+    # period followed by whitespace counts (so "dr. x" keeps "dr")
+    r"|(?<=[^.]\.)(?=[\])}>\"'»”’]*(?:\s|$)))"
+)
+# NLTK's comma/colon rule consumes the following character, so in an
+# even-length run like ",," the last one stays glued to the next word
+# (",b" -> dropped); "\x00" keeps that word non-alphanumeric the same way
+_PUNCT_RUN = re.compile(r"[:,]{2,}(?=[^\s\d:,])")
+_LEADING_QUOTE = re.compile(r"(?<!\w)'(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)")
+# NLTK splits these in two passes, each at most once per token
+_CLITICS = (
+    re.compile(r"(?<=[^' ])('s|'m|'d|')$"),
+    re.compile(r"(?<=[^' ])('ll|'re|'ve|n't)$"),
+)
+_CONTRACTIONS = re.compile(
+    r"\b(can)(not)\b|\b(d)('ye)\b|\b(gim)(me)\b|\b(gon)(na)\b"
+    r"|\b(got)(ta)\b|\b(lem)(me)\b|\b(more)('n)\b|\b(wan)(na)$"
+)
+_ALNUM_CONTRACTIONS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+
+
+def _split_contractions(match):
+    return " " + " ".join(g for g in match.groups() if g is not None) + " "
+
+
+def _glue_punct_run(match):
+    run = match.group()
+    return " \x00" if len(run) % 2 == 0 else run
+
+
+def fast_tokenize(text: str):
+    """Alphanumeric tokens of nltk.word_tokenize(text.lower()), without NLTK."""
+    tokens = []
+    text = text.lower()
+    if ",," in text or "::" in text or ",:" in text or ":," in text:
+        text = _PUNCT_RUN.sub(_glue_punct_run, text)
+    for piece in _SEPARATORS.sub(" ", text).split():
+        if piece.isalnum():
+            if piece in _ALNUM_CONTRACTIONS:
+                tokens.extend(_ALNUM_CONTRACTIONS[piece])
+            else:
+                tokens.append(piece)
+            continue
+
+        parts = _LEADING_QUOTE.sub("' ", piece).split()
+        stem, *clitic = _CLITICS[0].split(parts.pop(), maxsplit=1)
+        stem, *clitic2 = _CLITICS[1].split(stem, maxsplit=1)
+        parts += [stem] + clitic2[:1] + clitic[:1]
+        for part in parts:
+            if part.isalnum():
+                tokens.extend(_ALNUM_CONTRACTIONS.get(part, (part,)))
+            else:
+                tokens.extend(t for t in _CONTRACTIONS.sub(_split_contractions, part).split() if t.isalnum())
+    return tokens
+
+
+class FastPreprocessor:
+    name = "fast"
+
+    def __init__(self, lemmas=None):
+        # token -> lemma, only for tokens whose lemma differs
+        self.lemmas = lemmas or {}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.lemmas, f, ensure_ascii=False, sort_keys=True)
+
+    def tokenize(self, text: str):
+        return fast_tokenize(text)
+
+    def lemmatize(self, token: str) -> str:
+        return self.lemmas.get(token, token)
+
+    def __call__(self, text: str) -> str:
+        get = self.lemmas.get
+        return " ".join(get(t, t) for t in fast_tokenize(text))
+
+
+# -----------------------------
+# Lemma dictionary
+# -----------------------------
+def _noun_inflections(lemma: str):
+    """Surface forms WordNet's noun morphology (morphy) could reduce to `lemma`."""
+    forms = [lemma + "s"]
+    if lemma.endswith(("s", "x", "z", "ch", "sh")):
+        forms.append(lemma + "es")
+    if lemma.endswith("y"):
+        forms.append(lemma[:-1] + "ies")
+    if lemma.endswith("man"):
+        forms.append(lemma[:-3] + "men")
+    return forms
+
+
+def build_lemma_dict(texts, lemmatize=None):
+    """
+    Precompute WordNet lemmas for the training vocabulary.
+
+    Covers every token of `texts`, every lemma they produce, and the plural
+    and irregular (WordNet exception list) forms of those lemmas, so an
+    unseen inflection of a known word ("headaches") still maps onto the
+    trained feature ("headache").
+    """
+    if lemmatize is None:
+        from nltk.stem import WordNetLemmatizer
+        lemmatize = WordNetLemmatizer().lemmatize
+
+    tokens = {t for text in texts for t in fast_tokenize(text)}
+    lemmas = {}
+    for token in tokens:
+        lemmas[token] = lemmatize(token)
+    known = set(lemmas.values())
+    for lemma in list(known):
+        lemmas.setdefault(lemma, lemmatize(lemma))
+
+    candidates = [form for lemma in known for form in _noun_inflections(lemma)]
+    try:
+        from nltk.corpus import wordnet
+        wordnet.ensure_loaded()
+        for form, bases in wordnet._exception_map["n"].items():
+            if known.intersection(bases):
+                candidates.append(form)
+    except (LookupError, ImportError, AttributeError, KeyError):
+        pass
+    for form in candidates:
+        if form not in lemmas:
+            lemma = lemmatize(form)
+            if lemma in known:
+                lemmas[form] = lemma
+
+    return {token: lemma for token, lemma in lemmas.items() if token != lemma}
+
+
+def get_preprocessor(name: str = "nltk", lemmas_path=None):
+    if name == "fast":
+        return FastPreprocessor.load(lemmas_path) if lemmas_path else FastPreprocessor()
+    if name == "nltk":
+        return NltkPreprocessor()
+    raise ValueError(f"Unknown preprocessor '{name}'")
+
+
+def load_from_manifest(artifact_dir, manifest):
+    """The preprocessor a model artifact was trained with (nltk for older artifacts)."""
+    spec = manifest.get("preprocessing", {"engine": "nltk"})
+    lemmas = spec.get("lemmas")
+    return get_preprocessor(spec["engine"], Path(artifact_dir) / lemmas if lemmas else None)
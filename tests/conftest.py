@@ -0,0 +1,5 @@
+# Make the top-level scripts (chatbot.py, preprocessing.py, ...) importable.
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
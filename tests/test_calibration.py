@@ -0,0 +1,30 @@
+# The shipped per-intent thresholds must not reject correct, confident
+# predictions of the training phrases themselves.
+import json
+from pathlib import Path
+
+import pytest
+
+import chatbot
+from train_model import MAX_THRESHOLD
+
+ARTIFACT_DIR = Path(__file__).resolve().parent.parent / "healthmate_model"
+
+
+@pytest.mark.parametrize("message, tag", [
+    ("good morning", "greeting_morning"),
+    ("good evening", "greeting_evening"),
+    ("what are your visiting hours", "visiting_hours"),
+    ("book an appointment", "appointment"),
+])
+def test_training_phrases_are_answered(message, tag):
+    result = chatbot.answer(message)
+    assert result["tag"] == tag
+    assert not result["fallback"], result
+
+
+def test_no_intent_is_always_rejected():
+    with open(ARTIFACT_DIR / "manifest.json", encoding="utf-8") as f:
+        calibration = json.load(f)["calibration"]
+    assert calibration["default_threshold"] <= MAX_THRESHOLD
+    assert all(t <= MAX_THRESHOLD for t in calibration["thresholds"].values()), calibration["thresholds"]
@@ -0,0 +1,40 @@
+# Age-based rotation must count from the log's first record, not its last write.
+import json
+import time
+from datetime import datetime
+
+from conversation_logger import ConversationLogger
+
+
+def write_record(path, ts):
+    record = {"ts": datetime.fromtimestamp(ts).isoformat(timespec="milliseconds"),
+              "user": "hello", "bot": "Hi!"}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def test_old_log_rotates_after_restart(tmp_path):
+    path = tmp_path / "conversations.jsonl"
+    now = time.time()
+    write_record(path, now - 2 * 24 * 3600)
+    write_record(path, now - 60)  # recent write, so the mtime is fresh
+
+    logger = ConversationLogger(path, flush_interval=60, rotate_interval=24 * 3600)
+    logger.log("hello", "Hi!")
+    logger.close()
+
+    assert logger.rotations == 1
+    assert len(list(tmp_path.glob("conversations-*.jsonl.gz"))) == 1
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_recent_log_is_kept(tmp_path):
+    path = tmp_path / "conversations.jsonl"
+    write_record(path, time.time() - 3600)
+
+    logger = ConversationLogger(path, flush_interval=60, rotate_interval=24 * 3600)
+    logger.log("hello", "Hi!")
+    logger.close()
+
+    assert logger.rotations == 0
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
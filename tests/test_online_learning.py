@@ -0,0 +1,53 @@
+# online_learning.py: CLI models must load in chatbot.py, and candidate
+# extraction must see every conversation log.
+import gzip
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import online_learning
+
+BASE = Path(__file__).resolve().parent.parent
+
+
+def test_cli_model_loads_in_chatbot(tmp_path):
+    model_path = tmp_path / "healthmate_online.pkl"
+    subprocess.run(
+        [sys.executable, str(BASE / "online_learning.py"), "--model", str(model_path),
+         "init", "--preprocessor", "fast", "--epochs", "5"],
+        cwd=tmp_path, check=True, capture_output=True,
+    )
+
+    # a fresh interpreter, so nothing has imported online_learning yet
+    script = (
+        "import sys, chatbot\n"
+        "from pathlib import Path\n"
+        "chatbot.ONLINE_MODEL_PATH = Path(sys.argv[1])\n"
+        "model, _ = chatbot.get_active()\n"
+        "print(type(model).__module__, chatbot.classify('I have a terrible headache')[1])\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script, str(model_path)],
+        cwd=BASE, env={**os.environ, "HEALTHMATE_MODEL": "online"},
+        check=True, capture_output=True, text=True,
+    )
+    module, tag = result.stdout.split()[-2:]
+    assert module == "online_learning"
+    assert tag == "headache"
+
+
+def test_fallback_messages_include_rotated_logs(tmp_path, monkeypatch):
+    log = tmp_path / "conversations.jsonl"
+    monkeypatch.setattr(online_learning, "CONVERSATION_LOG_PATH", log)
+    monkeypatch.setattr(online_learning, "LOG_PATH", tmp_path / "logs.txt")
+
+    def record(user, fallback):
+        return json.dumps({"user": user, "bot": "...", "fallback": fallback}) + "\n"
+
+    with gzip.open(tmp_path / "conversations-20250101-000000.jsonl.gz", "wt", encoding="utf-8") as f:
+        f.write(record("my knee clicks", True) + record("hello", False))
+    log.write_text(record("ears ringing", True), encoding="utf-8")
+
+    assert list(online_learning.fallback_messages()) == ["my knee clicks", "ears ringing"]
@@ -0,0 +1,71 @@
+# The fast engine must produce exactly the tokens and features of the NLTK
+# path it replaces, over the whole intents corpus.
+import json
+from pathlib import Path
+
+import pytest
+
+from preprocessing import FastPreprocessor, NltkPreprocessor, fast_tokenize
+
+BASE = Path(__file__).resolve().parent.parent
+ARTIFACT_DIR = BASE / "healthmate_model"
+
+
+def load_patterns():
+    with open(BASE / "intents.json", encoding="utf-8") as f:
+        return [p for intent in json.load(f)["intents"] for p in intent["patterns"]]
+
+
+PATTERNS = load_patterns()
+
+
+@pytest.fixture(scope="module")
+def nltk_preprocessor():
+    try:
+        preprocessor = NltkPreprocessor()
+        preprocessor.lemmatize("headaches")
+    except LookupError:
+        pytest.skip("NLTK WordNet data not installed (nltk.download('wordnet'))")
+    return preprocessor
+
+
+@pytest.fixture(scope="module")
+def nltk_tokenizer(nltk_preprocessor):
+    try:
+        nltk_preprocessor.tokenize("Hi. Is Dr. Smith in?")
+    except LookupError:
+        pytest.skip("NLTK Punkt data not installed (nltk.download('punkt_tab'))")
+    return nltk_preprocessor
+
+
+@pytest.fixture(scope="module")
+def fast_preprocessor():
+    with open(ARTIFACT_DIR / "manifest.json", encoding="utf-8") as f:
+        preprocessing = json.load(f)["preprocessing"]
+    return FastPreprocessor.load(ARTIFACT_DIR / preprocessing["lemmas"])
+
+
+def test_artifact_uses_fast_engine():
+    with open(ARTIFACT_DIR / "manifest.json", encoding="utf-8") as f:
+        preprocessing = json.load(f)["preprocessing"]
+    assert preprocessing["engine"] == "fast"
+    assert (ARTIFACT_DIR / preprocessing["lemmas"]).exists()
+
+
+def test_tokens_match_nltk(nltk_tokenizer):
+    mismatches = [(p, nltk_tokenizer.tokenize(p), fast_tokenize(p)) for p in PATTERNS
+                  if nltk_tokenizer.tokenize(p) != fast_tokenize(p)]
+    assert not mismatches, mismatches
+
+
+def test_lemmas_match_wordnet(nltk_preprocessor, fast_preprocessor):
+    tokens = sorted({t for p in PATTERNS for t in fast_tokenize(p)})
+    mismatches = [(t, nltk_preprocessor.lemmatize(t), fast_preprocessor.lemmatize(t)) for t in tokens
+                  if nltk_preprocessor.lemmatize(t) != fast_preprocessor.lemmatize(t)]
+    assert not mismatches, mismatches
+
+
+def test_features_match_nltk(nltk_tokenizer, fast_preprocessor):
+    mismatches = [(p, nltk_tokenizer(p), fast_preprocessor(p)) for p in PATTERNS
+                  if nltk_tokenizer(p) != fast_preprocessor(p)]
+    assert not mismatches, mismatches
@@ -1,51 +1,327 @@
 # train_model.py (improved)
-import json, pickle
+import argparse, csv, hashlib, itertools, json, os, pickle, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
-import nltk
-from nltk.stem import WordNetLemmatizer
+from preprocessing import FastPreprocessor, NltkPreprocessor, build_lemma_dict
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.pipeline import Pipeline
-from sklearn.model_selection import cross_val_score, GridSearchCV, train_test_split
+from sklearn.model_selection import cross_val_predict, cross_val_score, StratifiedKFold, train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-nltk.download('punkt', quiet=True)
-nltk.download('wordnet', quiet=True)
-nltk.download('omw-1.4', quiet=True)
+from scipy.optimize import minimize_scalar
 
 BASE = Path(__file__).parent
 DATA_PATH = BASE / "intents.json"
 MODEL_OUT = BASE / "healthmate_model.pkl"
+ARTIFACT_DIR = BASE / "healthmate_model"
+ARTIFACT_VERSION = 1
+LEADERBOARD_OUT = BASE / "leaderboard.csv"
+REPORTS_DIR = BASE / "reports"
+CACHE_PATH = BASE / ".cache" / "preprocessed.json"
+
+# (resource path, package) pairs each engine needs
+NLTK_RESOURCES = {
+    "nltk": [("tokenizers/punkt", "punkt"), ("tokenizers/punkt_tab", "punkt_tab"),
+             ("corpora/wordnet", "wordnet"), ("corpora/omw-1.4", "omw-1.4")],
+    "fast": [("corpora/wordnet", "wordnet"), ("corpora/omw-1.4", "omw-1.4")],
+}
 
-lemmatizer = WordNetLemmatizer()
+# search space for --search: every TF-IDF setting x every classifier setting
+TFIDF_GRID = {
+    "ngram_range": [(1, 1), (1, 2), (1, 3)],
+    "max_features": [1000, 5000, None],
+}
+CLF_GRID = [("lr", C) for C in (0.1, 1.0, 10.0, 100.0)] + \
+           [("nb", alpha) for alpha in (0.01, 0.1, 0.5, 1.0)]
 
-def preprocess(text: str) -> str:
-    tokens = nltk.word_tokenize(text.lower())
-    lemmas = [lemmatizer.lemmatize(t) for t in tokens if t.isalnum()]
-    return " ".join(lemmas)
+# per-intent thresholds: accepted predictions of an intent should be at
+# least this precise; intents predicted fewer than MIN_SUPPORT times
+# out-of-fold, or that never reach the target, use the global threshold
+TARGET_PRECISION = 0.9
+MIN_SUPPORT = 5
+DEFAULT_THRESHOLD = 0.1
+# an intent's cut-off rests on a handful of out-of-fold predictions, so it
+# is shrunk toward DEFAULT_THRESHOLD as if PRIOR_WEIGHT more predictions
+# had backed that; no cut-off may reach 1.0 (an intent never answered)
+PRIOR_WEIGHT = 10
+MAX_THRESHOLD = 0.9
 
-def load_data():
+def load_patterns():
     with open(DATA_PATH, encoding='utf-8') as f:
         data = json.load(f)
-    X, y = [], []
+    texts, y = [], []
     for intent in data['intents']:
         tag = intent['tag']
         for pattern in intent['patterns']:
-            X.append(preprocess(pattern))
+            texts.append(pattern)
             y.append(tag)
-    return X, y
+    return texts, y
 
-def train_and_evaluate():
-    X, y = load_data()
-    print(f"Loaded {len(X)} samples, {len(set(y))} classes")
+def ensure_nltk_data(engine):
+    """Download the NLTK data an engine needs, only if it isn't installed."""
+    import nltk
+    for resource, package in NLTK_RESOURCES[engine]:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            try:
+                nltk.data.find(resource + ".zip")
+            except LookupError:
+                nltk.download(package, quiet=True)
 
-    # split for final test
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.10, random_state=42)
+def make_preprocessor(name, texts):
+    """'fast' precomputes WordNet lemmas for the training vocabulary; 'nltk' is the original path."""
+    ensure_nltk_data(name)
+    if name == "fast":
+        return FastPreprocessor(build_lemma_dict(texts))
+    return NltkPreprocessor()
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def load_data_cached(preprocessor_name, cache_path=CACHE_PATH):
+    """
+    Preprocessed patterns, reusing the cache from the previous run.
+
+    Each intent is cached under a hash of its patterns, so only added or
+    edited intents are preprocessed again. For the fast engine the lemma
+    dictionary is cached under the hash of the whole intents.json and only
+    rebuilt (which loads WordNet) when the file changed.
+
+    Returns (X, y, preprocessor); preprocessor is None when the nltk
+    engine had nothing to process.
+    """
+    raw = DATA_PATH.read_bytes()
+    intents_hash = _digest(raw)
+    intents = json.loads(raw.decode('utf-8'))['intents']
+
+    cache = {}
+    if cache_path.exists():
+        with open(cache_path, encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get("engine") != preprocessor_name:
+            cache = {}
+    entries = cache.get("intents", {})
+
+    start = time.perf_counter()
+    preprocessor = None
+    if preprocessor_name == "fast":
+        if cache.get("intents_hash") == intents_hash:
+            preprocessor = FastPreprocessor(cache["lemmas"])
+        else:
+            texts = [p for intent in intents for p in intent['patterns']]
+            # every pattern token maps to its own WordNet lemma, so cached
+            # intents still come out the same with the rebuilt dictionary
+            preprocessor = make_preprocessor("fast", texts)
+
+    X, y, new_entries, reprocessed = [], [], {}, 0
+    for intent in intents:
+        tag = intent['tag']
+        key = _digest(json.dumps(intent['patterns'], ensure_ascii=False).encode('utf-8'))
+        entry = entries.get(tag)
+        if entry is None or entry["hash"] != key:
+            if preprocessor is None:
+                preprocessor = make_preprocessor(preprocessor_name, [])
+            entry = {"hash": key, "processed": [preprocessor(p) for p in intent['patterns']]}
+            reprocessed += 1
+        new_entries[tag] = entry
+        X.extend(entry["processed"])
+        y.extend([tag] * len(entry["processed"]))
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache = {"engine": preprocessor_name, "intents_hash": intents_hash, "intents": new_entries}
+    if isinstance(preprocessor, FastPreprocessor):
+        cache["lemmas"] = preprocessor.lemmas
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+    print(f"Preprocessed {reprocessed} of {len(intents)} intents "
+          f"({len(intents) - reprocessed} cached) in {time.perf_counter() - start:.2f}s")
+    return X, y, preprocessor
+
+def export_artifact(pipeline, out_dir=ARTIFACT_DIR, preprocessor=None, calibration=None):
+    """
+    Write the fitted pipeline as plain NumPy arrays + a JSON manifest.
+
+    vocab.npy is sorted, so a term's column is its position (found with a
+    binary search) and no dict has to be built at load time. Both
+    LogisticRegression and MultinomialNB reduce to
+    softmax(tfidf @ coef.T + intercept), so one inference path covers both.
+    """
+    tfidf = pipeline.named_steps['tfidf']
+    clf = pipeline.named_steps['clf']
+
+    if isinstance(clf, MultinomialNB):
+        coef, intercept = clf.feature_log_prob_, clf.class_log_prior_
+    elif isinstance(clf, LogisticRegression):
+        if len(clf.classes_) == 2:
+            # binary LR stores one row; expand so softmax gives the sigmoid
+            coef = np.vstack([np.zeros_like(clf.coef_[0]), clf.coef_[0]])
+            intercept = np.array([0.0, clf.intercept_[0]])
+        else:
+            coef, intercept = clf.coef_, clf.intercept_
+    else:
+        raise ValueError(f"Cannot export classifier {type(clf).__name__}")
+
+    terms = sorted(tfidf.vocabulary_)
+    columns = [tfidf.vocabulary_[t] for t in terms]
 
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.save(out_dir / "vocab.npy", np.array(terms))
+    np.save(out_dir / "idf.npy", tfidf.idf_[columns].astype(np.float64))
+    # features x classes, so one term's weights are one contiguous row
+    np.save(out_dir / "coef.npy", np.ascontiguousarray(coef[:, columns].T, dtype=np.float64))
+    np.save(out_dir / "intercept.npy", np.asarray(intercept, dtype=np.float64))
+
+    manifest = {
+        "version": ARTIFACT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "classifier": type(clf).__name__,
+        "link": "softmax",
+        "classes": [str(c) for c in clf.classes_],
+        "tfidf": {
+            "lowercase": tfidf.lowercase,
+            "token_pattern": tfidf.token_pattern,
+            "ngram_range": list(tfidf.ngram_range),
+            "sublinear_tf": tfidf.sublinear_tf,
+            "norm": tfidf.norm,
+        },
+        "n_features": len(terms),
+        "preprocessing": {"engine": "nltk"},
+    }
+    if isinstance(preprocessor, FastPreprocessor):
+        # chatbot.py must tokenize/lemmatize exactly as the model was trained
+        preprocessor.save(out_dir / "lemmas.json")
+        manifest["preprocessing"] = {"engine": "fast", "lemmas": "lemmas.json"}
+    if calibration:
+        manifest["calibration"] = calibration
+    with open(out_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print("Saved artifact to", out_dir)
+
+def make_classifier(name, param):
+    if name == "lr":
+        return LogisticRegression(C=param, max_iter=1000)
+    return MultinomialNB(alpha=param)
+
+# -----------------------------
+# Parallel hyperparameter search
+# -----------------------------
+_search_data = {}
+
+def _init_search_worker(X, y, folds):
+    # sent once per worker process instead of once per task
+    _search_data.update(X=np.array(X, dtype=object), y=np.array(y), folds=folds)
+
+def _evaluate_tfidf_fold(tfidf_params, fold):
+    """
+    Fit TF-IDF once on one fold, then score every classifier setting on
+    the cached matrices. Returns one leaderboard row per classifier setting.
+    """
+    X, y = _search_data["X"], _search_data["y"]
+    train_idx, val_idx = _search_data["folds"][fold]
+
+    start = time.perf_counter()
+    tfidf = TfidfVectorizer(**tfidf_params)
+    X_tr = tfidf.fit_transform(X[train_idx])
+    X_val = tfidf.transform(X[val_idx])
+    tfidf_s = time.perf_counter() - start
+
+    rows = []
+    for name, param in CLF_GRID:
+        clf = make_classifier(name, param)
+        start = time.perf_counter()
+        clf.fit(X_tr, y[train_idx])
+        fit_s = time.perf_counter() - start
+        start = time.perf_counter()
+        y_pred = clf.predict(X_val)
+        predict_s = time.perf_counter() - start
+        rows.append({
+            "ngram_range": tfidf_params["ngram_range"],
+            "max_features": tfidf_params["max_features"],
+            "clf": name,
+            "param": param,
+            "fold": fold,
+            "accuracy": accuracy_score(y[val_idx], y_pred),
+            "tfidf_s": tfidf_s,
+            "fit_s": fit_s,
+            "predict_s": predict_s,
+        })
+    return rows
+
+def search(X_train, y_train, n_jobs=None, cv=5, leaderboard_path=LEADERBOARD_OUT):
+    """
+    Grid search over TFIDF_GRID x CLF_GRID on a process pool.
+
+    Work is split into (TF-IDF setting, fold) tasks so each fold's TF-IDF
+    matrix is computed once and reused for all classifier settings. Writes
+    a leaderboard (mean accuracy and timings per setting, best first) and
+    returns its rows.
+    """
+    folds = list(StratifiedKFold(n_splits=cv, shuffle=True, random_state=42).split(X_train, y_train))
+    keys = list(TFIDF_GRID)
+    tfidf_settings = [dict(zip(keys, values)) for values in itertools.product(*TFIDF_GRID.values())]
+    tasks = [(params, fold) for params in tfidf_settings for fold in range(cv)]
+    n_jobs = n_jobs or os.cpu_count()
+    print(f"Searching {len(tfidf_settings) * len(CLF_GRID)} settings x {cv} folds "
+          f"({len(tasks)} TF-IDF fits) on {n_jobs} processes...")
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_search_worker,
+                             initargs=(X_train, y_train, folds)) as pool:
+        futures = [pool.submit(_evaluate_tfidf_fold, params, fold) for params, fold in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            results.extend(future.result())
+            print(f"  {done}/{len(tasks)} tasks", end="\r", flush=True)
+    print(f"Search finished in {time.perf_counter() - start:.1f}s" + " " * 10)
+
+    grouped = {}
+    for row in results:
+        key = (row["ngram_range"], row["max_features"], row["clf"], row["param"])
+        grouped.setdefault(key, []).append(row)
+
+    leaderboard = []
+    for (ngram_range, max_features, clf, param), rows in grouped.items():
+        acc = [r["accuracy"] for r in rows]
+        leaderboard.append({
+            "ngram_range": f"{ngram_range[0]}-{ngram_range[1]}",
+            "max_features": max_features or "all",
+            "clf": clf,
+            "param": param,
+            "cv_accuracy": float(np.mean(acc)),
+            "cv_std": float(np.std(acc)),
+            "tfidf_ms": 1000 * float(np.mean([r["tfidf_s"] for r in rows])),
+            "fit_ms": 1000 * float(np.mean([r["fit_s"] for r in rows])),
+            "predict_ms": 1000 * float(np.mean([r["predict_s"] for r in rows])),
+            "_params": (ngram_range, max_features, clf, param),
+        })
+    leaderboard.sort(key=lambda r: (-r["cv_accuracy"], r["fit_ms"] + r["predict_ms"]))
+
+    columns = ["rank"] + [c for c in leaderboard[0] if not c.startswith("_")]
+    with open(leaderboard_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for rank, row in enumerate(leaderboard, 1):
+            writer.writerow(dict({c: (f"{v:.4f}" if isinstance(v, float) else v) for c, v in row.items()}, rank=rank))
+    print("Saved leaderboard to", leaderboard_path)
+
+    print(f"\n{'rank':>4} {'ngrams':>6} {'features':>8} {'clf':>3} {'param':>6} "
+          f"{'cv acc':>7} {'± std':>6} {'fit ms':>7} {'pred ms':>7}")
+    for rank, row in enumerate(leaderboard[:10], 1):
+        print(f"{rank:>4} {row['ngram_range']:>6} {str(row['max_features']):>8} {row['clf']:>3} "
+              f"{row['param']:>6} {row['cv_accuracy']:>7.3f} {row['cv_std']:>6.3f} "
+              f"{row['fit_ms']:>7.1f} {row['predict_ms']:>7.2f}")
+    return leaderboard
+
+def quick_select(X_train, y_train):
+    """Cross-validate the two default pipelines and return the better one (unfitted)."""
     # define pipelines
     pipe_nb = Pipeline([
         ('tfidf', TfidfVectorizer(ngram_range=(1,2), max_features=5000)),
@@ -66,29 +342,229 @@ def train_and_evaluate():
     print("LR CV accuracy:", np.mean(scores_lr), scores_lr)
 
     # choose best model (here we prefer LR if it's better)
-    chosen = pipe_lr if np.mean(scores_lr) >= np.mean(scores_nb) else pipe_nb
-    chosen.fit(X_train, y_train)
-    y_pred = chosen.predict(X_test)
+    return pipe_lr if np.mean(scores_lr) >= np.mean(scores_nb) else pipe_nb
 
-    print("\n--- Test set evaluation ---")
-    print("Accuracy:", accuracy_score(y_test, y_pred))
-    print(classification_report(y_test, y_pred, zero_division=0))
+def build_pipeline(ngram_range, max_features, clf, param):
+    return Pipeline([
+        ('tfidf', TfidfVectorizer(ngram_range=ngram_range, max_features=max_features)),
+        ('clf', make_classifier(clf, param))
+    ])
+
+# -----------------------------
+# Calibration
+# -----------------------------
+def softmax(logits, temperature=1.0):
+    z = logits / temperature
+    z = z - z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    return z / z.sum(axis=1, keepdims=True)
+
+def fit_temperature(log_probs, y_idx):
+    """Temperature minimizing the negative log-likelihood of softmax(log_probs / T)."""
+    rows = np.arange(len(y_idx))
+
+    def nll(log_t):
+        probs = softmax(log_probs, np.exp(log_t))
+        return -np.mean(np.log(probs[rows, y_idx] + 1e-12))
+
+    result = minimize_scalar(nll, bounds=(np.log(0.05), np.log(20.0)), method="bounded")
+    return float(np.exp(result.x))
+
+def expected_calibration_error(probs, y_idx, bins=10):
+    confidence = probs.max(axis=1)
+    correct = probs.argmax(axis=1) == y_idx
+    which = np.minimum((confidence * bins).astype(int), bins - 1)
+    ece = 0.0
+    for b in range(bins):
+        mask = which == b
+        if mask.any():
+            ece += mask.mean() * abs(correct[mask].mean() - confidence[mask].mean())
+    return float(ece)
+
+def precision_threshold(confidence, correct, target=TARGET_PRECISION):
+    """
+    Lowest confidence cut-off whose accepted predictions (confidence >= cut-off)
+    are at least `target` precise, or None if no cut-off is.
+    """
+    order = np.argsort(-confidence, kind="stable")
+    precision = np.cumsum(correct[order]) / np.arange(1, len(order) + 1)
+    ok = np.flatnonzero(precision >= target)
+    return float(confidence[order][ok[-1]]) if ok.size else None
+
+def calibrate(pipeline, X_train, y_train, target=TARGET_PRECISION, cv=5):
+    """
+    Temperature scaling and per-intent confidence thresholds, both fitted on
+    out-of-fold probabilities of the training set (the test split stays
+    untouched for evaluation).
+
+    Log-probabilities are the classifier's logits up to a per-row constant,
+    so softmax(log p / T) is exactly what chatbot.py computes from the
+    exported decision scores.
+    """
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
+    oof = cross_val_predict(pipeline, X_train, y_train, cv=folds, method="predict_proba")
+    classes = np.array(sorted(set(y_train)))
+    y_idx = np.searchsorted(classes, y_train)
+    log_probs = np.log(oof + 1e-12)
+
+    temperature = fit_temperature(log_probs, y_idx)
+    probs = softmax(log_probs, temperature)
+    predicted = probs.argmax(axis=1)
+    confidence = probs.max(axis=1)
+    correct = predicted == y_idx
+
+    default = precision_threshold(confidence, correct, target)
+    default = DEFAULT_THRESHOLD if default is None else min(default, MAX_THRESHOLD)
+    thresholds = {}
+    for i, tag in enumerate(classes):
+        mask = predicted == i
+        support = int(mask.sum())
+        cut = precision_threshold(confidence[mask], correct[mask], target) if support >= MIN_SUPPORT else None
+        cut = default if cut is None else cut
+        shrunk = (support * cut + PRIOR_WEIGHT * DEFAULT_THRESHOLD) / (support + PRIOR_WEIGHT)
+        thresholds[str(tag)] = min(shrunk, MAX_THRESHOLD)
+
+    print(f"Calibration: temperature {temperature:.3f}, "
+          f"ECE {expected_calibration_error(oof, y_idx):.3f} -> {expected_calibration_error(probs, y_idx):.3f}")
+    return {
+        "temperature": temperature,
+        "target_precision": target,
+        "default_threshold": default,
+        "thresholds": thresholds,
+    }
+
+def threshold_report(probs, y_true, classes, calibration):
+    """Fallback rate vs accuracy of the accepted predictions, per cut-off policy."""
+    y_idx = np.searchsorted(classes, y_true)
+    predicted = probs.argmax(axis=1)
+    confidence = probs.max(axis=1)
+    correct = predicted == y_idx
+
+    def row(policy, accepted):
+        n = int(accepted.sum())
+        return {
+            "policy": policy,
+            "fallback_rate": float(1 - accepted.mean()),
+            "accepted_accuracy": float(correct[accepted].mean()) if n else None,
+            # answered correctly by the classifier, as a share of all messages
+            "coverage_accuracy": float((correct & accepted).mean()),
+        }
+
+    rows = [row(f"global {t:.2f}", confidence >= t) for t in np.round(np.arange(0.0, 1.0, 0.05), 2)]
+    table = np.array([calibration["thresholds"].get(str(c), calibration["default_threshold"]) for c in classes])
+    rows.append(row("per-intent", confidence >= table[predicted]))
+    return rows
+
+def save_confusion_matrix(cm, labels, path, show=False):
+    import matplotlib
+    if not show:
+        # no display needed, so training never blocks on a plot window
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    # confusion matrix
-    labels = sorted(list(set(y)))
-    cm = confusion_matrix(y_test, y_pred, labels=labels)
     plt.figure(figsize=(10,8))
     sns.heatmap(cm, annot=True, fmt='d', xticklabels=labels, yticklabels=labels)
     plt.title("Confusion Matrix")
     plt.ylabel("True")
     plt.xlabel("Predicted")
     plt.tight_layout()
-    plt.show()
+    plt.savefig(path, dpi=120)
+    print("Saved confusion matrix to", path)
+    if show:
+        plt.show()
+    plt.close()
+
+def train_and_evaluate(preprocessor_name="fast", search_mode=False, n_jobs=None, headless=False,
+                       target_precision=TARGET_PRECISION):
+    X, y, preprocessor = load_data_cached(preprocessor_name)
+    print(f"Loaded {len(X)} samples, {len(set(y))} classes")
+
+    # split for final test
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.10, random_state=42)
+
+    if search_mode:
+        best = search(X_train, y_train, n_jobs=n_jobs)[0]
+        print("\nBest setting:", best["_params"])
+        chosen = build_pipeline(*best["_params"])
+    else:
+        chosen = quick_select(X_train, y_train)
+
+    calibration = calibrate(chosen, X_train, y_train, target=target_precision)
+
+    chosen.fit(X_train, y_train)
+    y_pred = chosen.predict(X_test)
+
+    accuracy = accuracy_score(y_test, y_pred)
+    report = classification_report(y_test, y_pred, zero_division=0)
+    print("\n--- Test set evaluation ---")
+    print("Accuracy:", accuracy)
+    print(report)
+
+    classes = chosen.classes_
+    test_probs = softmax(np.log(chosen.predict_proba(X_test) + 1e-12), calibration["temperature"])
+    thresholds = threshold_report(test_probs, y_test, classes, calibration)
+    lines = [f"{'policy':<12} | {'fallback':>8} | {'acc (accepted)':>14} | {'acc (all)':>9}", "-" * 52]
+    for r in thresholds:
+        acc = "-" if r["accepted_accuracy"] is None else f"{r['accepted_accuracy']:.3f}"
+        lines.append(f"{r['policy']:<12} | {r['fallback_rate']:>8.1%} | {acc:>14} | {r['coverage_accuracy']:>9.3f}")
+    print("--- Fallback rate vs accuracy (test set, calibrated) ---")
+    print("\n".join(lines))
+
+    REPORTS_DIR.mkdir(exist_ok=True)
+    with open(REPORTS_DIR / "classification_report.txt", "w", encoding="utf-8") as f:
+        f.write(f"Accuracy: {accuracy}\n\n{report}")
+    with open(REPORTS_DIR / "threshold_report.txt", "w", encoding="utf-8") as f:
+        f.write(f"Temperature: {calibration['temperature']:.4f}\n\n" + "\n".join(lines) + "\n\nPer-intent thresholds:\n")
+        for tag, t in calibration["thresholds"].items():
+            f.write(f"  {tag:<24} {t:.3f}\n")
+    with open(REPORTS_DIR / "training_summary.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+            "intents_sha256": _digest(DATA_PATH.read_bytes()),
+            "preprocessor": preprocessor_name,
+            "model": repr(chosen),
+            "samples": len(X),
+            "test_accuracy": accuracy,
+            "calibration": calibration,
+            "test_ece": {
+                "raw": expected_calibration_error(chosen.predict_proba(X_test), np.searchsorted(classes, y_test)),
+                "calibrated": expected_calibration_error(test_probs, np.searchsorted(classes, y_test)),
+            },
+            "thresholds": thresholds,
+        }, f, indent=2)
+    print("Saved reports to", REPORTS_DIR)
+
+    # confusion matrix
+    labels = sorted(list(set(y)))
+    cm = confusion_matrix(y_test, y_pred, labels=labels)
+    save_confusion_matrix(cm, labels, REPORTS_DIR / "confusion_matrix.png", show=not headless)
 
     # save the chosen pipeline
     with open(MODEL_OUT, 'wb') as f:
         pickle.dump(chosen, f)
     print("Saved model to", MODEL_OUT)
+    export_artifact(chosen, preprocessor=preprocessor, calibration=calibration)
 
 if __name__ == "__main__":
-    train_and_evaluate()
+    parser = argparse.ArgumentParser(description="Train the HealthMate intent classifier")
+    parser.add_argument("--export-only", action="store_true",
+                        help="Convert the existing healthmate_model.pkl to the artifact directory")
+    parser.add_argument("--preprocessor", choices=["fast", "nltk"], default="fast",
+                        help="Preprocessing engine to train with (recorded in the artifact)")
+    parser.add_argument("--search", action="store_true",
+                        help="Grid-search TF-IDF and classifier settings in parallel (writes leaderboard.csv)")
+    parser.add_argument("--jobs", type=int, default=None, help="Search processes (default: all cores)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Don't open plot windows; reports and plots are written to reports/")
+    parser.add_argument("--target-precision", type=float, default=TARGET_PRECISION,
+                        help="Precision each intent's confidence threshold is tuned for")
+    args = parser.parse_args()
+
+    if args.export_only:
+        # the pickle predates the artifact, so it was trained with the nltk engine
+        with open(MODEL_OUT, 'rb') as f:
+            export_artifact(pickle.load(f))
+    else:
+        train_and_evaluate(args.preprocessor, search_mode=args.search, n_jobs=args.jobs,
+                           headless=args.headless, target_precision=args.target_precision)